@@ -1,29 +1,5 @@
 # src/__init__.py
-from .chat_module import get_harmful_chat_categories_by_id
-from .site_module import get_harmful_site_categories_by_id
-from .quiz_pipeline import HarmfulContentPipeline
-from .append_to_chat_csv import append_row_to_chat_csv
-from .append_to_site_csv import append_row_to_site_csv
-from .site_aggregator import load_and_aggregate
-from .site_statistics import build_user_stats
-from .site_prompt_engine import generate_user_report
-from .chat_generator import generate_chat_report
-
-__all__ = [
-    "get_harmful_chat_categories_by_id",
-    "get_harmful_site_categories_by_id",
-    "HarmfulContentPipeline",
-    "append_row_to_chat_csv",
-    "append_row_to_site_csv",
-    "load_and_aggregate",
-    "build_user_stats",
-    "generate_user_report",
-    "generate_chat_report",
-]
-
-
-
-    """
+"""
     1. "get_harmful_chat_categories_by_id" : 채팅에 대해서 ID 마다 6개 범주에 각 컬럼의 유해성 평균을 뽑아주는것
         입력 parameter : chat_id
         출력 parameter : { category_id: harmful_score }
@@ -59,4 +35,62 @@ __all__ = [
     9. "generate_chat_report" : 채팅 보고서를 생성하는 함수
         입력 parameter : chat_data
         출력 parameter : chat_report
-    """
\ No newline at end of file
+
+    10. "BulkAppender" : 여러 행을 버퍼에 모아 한 번에 추가하는 context manager
+        입력 parameter : table ("chat" | "site"), flush_size
+        출력 parameter : None
+
+    11. "get_harmful_chat_categories_by_ids" / "get_harmful_site_categories_by_ids" : 여러 ID 를 한 번에 조회하는 버전
+        입력 parameter : id 목록
+        출력 parameter : { id: [유해 카테고리 이름] }
+
+    각 이름은 처음 사용할 때 해당 모듈을 import 합니다 (PEP 562). 패키지 import 만으로는
+    pandas · numpy · openai 를 불러오지 않습니다.
+"""
+
+import importlib
+
+# 공개 이름 → 정의된 하위 모듈
+_EXPORTS = {
+    "get_harmful_chat_categories_by_id": "chat_module",
+    "get_harmful_chat_categories_by_ids": "chat_module",
+    "get_harmful_site_categories_by_id": "site_module",
+    "get_harmful_site_categories_by_ids": "site_module",
+    "HarmfulContentPipeline": "quiz_pipeline",
+    "append_row_to_chat_csv": "append_to_chat_csv",
+    "append_row_to_site_csv": "append_to_site_csv",
+    "BulkAppender": "bulk_appender",
+    "load_and_aggregate": "site_aggregator",
+    "build_user_stats": "site_statistics",
+    "generate_user_report": "site_prompt_engine",
+    "generate_chat_report": "chat_generator",
+}
+
+__all__ = [
+    "get_harmful_chat_categories_by_id",
+    "get_harmful_site_categories_by_id",
+    "get_harmful_chat_categories_by_ids",
+    "get_harmful_site_categories_by_ids",
+    "HarmfulContentPipeline",
+    "append_row_to_chat_csv",
+    "append_row_to_site_csv",
+    "BulkAppender",
+    "load_and_aggregate",
+    "build_user_stats",
+    "generate_user_report",
+    "generate_chat_report",
+]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # 다음 조회부터는 일반 속성으로 바로 찾도록 캐시
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
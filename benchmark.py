@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+
+합성 데이터(synthetic_data.py)로 파이프라인 단계별 실행 시간과 최대 메모리를 측정해 JSON 으로 저장합니다.
+
+단계: CSV 로드(chat/site) → load_and_aggregate (한 번에 / 청크) → build_user_stats
+      → top_n_harmful_words → spend_receive_stats → 사용자별 채팅 통계 (1 프로세스 / --workers 프로세스)
+      → /process_chat_data 수집(ingest)
+
+- 크기마다 별도 프로세스에서 실행 (모듈 전역 캐시 · 최대 RSS 가 섞이지 않도록)
+- 시간은 --repeat 번 중 최솟값, 메모리는 tracemalloc 을 켠 한 번 더 실행한 최대 할당량
+- LLM 은 호출하지 않음 (ingest 는 KITTY_LLM_BACKEND=fake, 퀴즈/리포트 작업은 큐에 넣지 않음)
+- --baseline 을 주면 이전 결과보다 --tolerance 이상 느려진 단계를 [WARN] 으로 알리고 종료 코드 1
+
+    python benchmark.py --sizes 10k,1m --output benchmark_results.json
+    python benchmark.py --sizes 10k --baseline benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .synthetic_data import generate_dataset, parse_rows
+except ImportError:
+    from synthetic_data import generate_dataset, parse_rows
+
+DATA_DIR = "bench_data"
+OUTPUT_PATH = "benchmark_results.json"
+AGG_CHUNKSIZE = 1_000_000
+INGEST_REQUESTS = 1000
+INGEST_USERS = 1000
+
+
+def measure(fn: Callable, repeat: int = 1, memory: bool = True) -> dict:
+    """fn 을 repeat 번 실행한 최소 시간(초)과, tracemalloc 으로 한 번 더 실행한 최대 할당량(MB)."""
+    seconds = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    stats = {"seconds": round(min(seconds), 6), "result": result}
+    if memory:
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stats["peak_mb"] = round((peak - base) / 2**20, 3)
+    return stats
+
+
+def ingest_requests(n: int, seed: int) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    users = rng.integers(0, INGEST_USERS, n)
+    return [
+        {
+            "user_id": int(user_id),
+            "original_text": "어우 쓰레기 같은 인간!",
+            "processed_text": "문장 중 유해한 단어들: ['쓰레기 같은'] 대체 제안 형식: '완화' 대체 문장: '좀 더 부드럽게'",
+        }
+        for user_id in users
+    ]
+
+
+def run_ingest(n_requests: int, seed: int, repeat: int, memory: bool) -> dict:
+    """
+    chat_db.csv 복사본(ingest/)에 /process_chat_data 요청을 n_requests 번 보냅니다 (원본 데이터는 그대로).
+    첫 요청(색인 생성 포함)은 따로 warmup_seconds 로 기록합니다. 색인 스냅샷이 종료 시 ingest/ 에
+    저장되도록 작업 디렉터리는 되돌리지 않으며, ingest/ 는 부모 프로세스가 지웁니다.
+    """
+    from fastapi.testclient import TestClient
+
+    os.makedirs("ingest", exist_ok=True)
+    shutil.copyfile("chat_db.csv", os.path.join("ingest", "chat_db.csv"))
+    os.chdir("ingest")
+    os.environ.setdefault("X_API_KEY", "benchmark")
+    import main
+    # 수집 경로만 측정: 임계값을 넘어도 퀴즈/리포트 작업을 큐에 넣지 않음
+    main.HARMFUL_THRESHOLD = float("inf")
+
+    headers = {"x-api-key": os.environ["X_API_KEY"]}
+    bodies = ingest_requests(n_requests, seed)
+    with TestClient(main.app) as client:
+        start = time.perf_counter()
+        client.post("/process_chat_data", json=bodies[0], headers=headers).raise_for_status()
+        warmup = time.perf_counter() - start
+
+        def send_all():
+            for body in bodies:
+                client.post("/process_chat_data", json=body, headers=headers).raise_for_status()
+
+        stats = measure(send_all, repeat=repeat, memory=memory)
+    stats["requests"] = n_requests
+    stats["requests_per_s"] = round(n_requests / stats["seconds"], 1)
+    stats["warmup_seconds"] = round(warmup, 6)
+    return stats
+
+
+def run_size(size: str, data_dir: str, seed: int, repeat: int, memory: bool, n_ingest: int,
+             workers: int) -> List[dict]:
+    """한 크기의 모든 단계를 현재 프로세스에서 실행합니다 (--run-size 로 호출되는 자식 프로세스)."""
+    os.environ.setdefault("KITTY_LLM_BACKEND", "fake")
+    os.chdir(os.path.join(data_dir, size))
+    import chat_generator
+    import chat_report
+    import site_aggregator
+    from site_statistics import build_user_stats
+
+    results = []
+
+    def record(stage: str, stats: dict) -> object:
+        result = stats.pop("result", None)
+        results.append({"size": size, "rows": parse_rows(size), "stage": stage, **stats})
+        print(f"[INFO] {size} {stage}: {stats['seconds']:.3f}s"
+              + (f", peak {stats['peak_mb']:.1f}MB" if "peak_mb" in stats else ""))
+        return result
+
+    chat_df = record("csv_load_chat", measure(lambda: pd.read_csv("chat_db.csv"), repeat, memory))
+    record("csv_load_site", measure(lambda: pd.read_csv("site_db.csv"), repeat, memory))
+    agg_df = record("load_and_aggregate", measure(site_aggregator.load_and_aggregate, repeat, memory))
+    record("load_and_aggregate_chunked",
+           measure(lambda: site_aggregator.load_and_aggregate(chunksize=AGG_CHUNKSIZE), repeat, memory))
+    record("build_user_stats", measure(lambda: build_user_stats(agg_df), repeat, memory))
+    record("top_n_harmful_words", measure(lambda: chat_report.top_n_harmful_words(chat_df, 3), repeat, memory))
+    record("spend_receive_stats", measure(lambda: chat_report.spend_receive_stats(chat_df), repeat, memory))
+    words = chat_generator.load_word_table("chat_db.csv", len(chat_df))
+    top_words, words_by_row = words.top_words_by_user(3), words.words_by_row()
+    record("chat_user_stats", measure(
+        lambda: chat_generator.compute_user_entries(chat_df, top_words, words_by_row), repeat, memory))
+    if workers > 1:
+        # 작업 프로세스의 메모리는 tracemalloc 에 잡히지 않으므로 시간만 기록
+        record(f"chat_user_stats_workers{workers}", measure(
+            lambda: chat_generator.compute_user_entries(chat_df, top_words, words_by_row, workers), repeat, False))
+    del chat_df, agg_df, words, top_words, words_by_row
+    if n_ingest:
+        record("process_chat_data_ingest", run_ingest(n_ingest, seed, repeat, memory))
+
+    # 프로세스 전체 최대 RSS (Linux 는 KB 단위)
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for entry in results:
+        entry["process_max_rss_mb"] = round(max_rss_mb, 1)
+    return results
+
+
+def compare(results: List[dict], baseline_path: str, tolerance: float) -> int:
+    """baseline 보다 tolerance 비율 이상 느려진 (size, stage) 수."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["stage"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        base = baseline.get((r["size"], r["stage"]))
+        if base is None or not base["seconds"]:
+            continue
+        ratio = r["seconds"] / base["seconds"]
+        if ratio > 1 + tolerance:
+            regressions += 1
+            print(f"[WARN] {r['size']} {r['stage']}: {base['seconds']:.3f}s → {r['seconds']:.3f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="파이프라인 단계별 벤치마크")
+    parser.add_argument("--sizes", default="10k", help="쉼표로 구분한 데이터 크기: 10k,1m,10m (기본: 10k)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="합성 데이터 디렉터리 (없으면 생성)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="단계별 반복 횟수 (최소 시간 기록)")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 메모리 측정 생략")
+    parser.add_argument("--ingest-requests", type=int, default=INGEST_REQUESTS,
+                        help=f"/process_chat_data 요청 수 (기본: {INGEST_REQUESTS}, 0 이면 생략)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="사용자별 채팅 통계 병렬 단계의 프로세스 수 (기본: CPU 개수, 1 이면 생략)")
+    parser.add_argument("--output", default=OUTPUT_PATH, help=f"결과 JSON 경로 (기본: {OUTPUT_PATH})")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 속도 저하 비율 (기본: 0.25)")
+    parser.add_argument("--run-size", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    data_dir = os.path.abspath(args.data_dir)
+
+    if args.run_size:
+        results = run_size(args.run_size, data_dir, args.seed, args.repeat, not args.no_memory,
+                           args.ingest_requests, args.workers)
+        with open(args.child_output, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+        return
+
+    results = []
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        size_dir = os.path.join(data_dir, size)
+        if not all(os.path.isfile(os.path.join(size_dir, f"{t}_db.csv")) for t in ("chat", "site")):
+            generate_dataset(parse_rows(size), size_dir, seed=args.seed)
+
+        child_output = os.path.join(data_dir, f".{size}.results.json")
+        cmd = [sys.executable, os.path.abspath(__file__), "--run-size", size, "--data-dir", data_dir,
+               "--seed", str(args.seed), "--repeat", str(args.repeat),
+               "--ingest-requests", str(args.ingest_requests), "--workers", str(args.workers),
+               "--child-output", child_output]
+        if args.no_memory:
+            cmd.append("--no-memory")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            filter(None, [os.path.dirname(os.path.abspath(__file__)), os.environ.get("PYTHONPATH")])))
+        subprocess.run(cmd, check=True, env=env)
+        shutil.rmtree(os.path.join(size_dir, "ingest"), ignore_errors=True)
+        with open(child_output, "r", encoding="utf-8") as f:
+            results.extend(json.load(f))
+        os.remove(child_output)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"[INFO] 벤치마크 결과를 '{args.output}'에 저장했습니다.")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"[ERROR] {regressions}개 단계가 baseline 보다 {args.tolerance:.0%} 이상 느려졌습니다.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
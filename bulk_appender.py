@@ -0,0 +1,63 @@
+from typing import Iterable, List, Optional
+
+try:
+    from .storage import StorageBackend, check_columns, get_storage
+except ImportError:
+    from storage import StorageBackend, check_columns, get_storage
+
+DEFAULT_FLUSH_SIZE = 10_000
+
+
+class BulkAppender:
+    """
+    많은 행을 버퍼에 모았다가 한 번에 추가하는 context manager.
+
+    컬럼 검사는 헤더(스키마)를 처음 한 번만 읽어서 수행하고, 행은 flush_size 개마다
+    또는 with 블록이 끝날 때 한 번의 쓰기로 저장합니다. 블록 안에서 예외가 나면
+    아직 쓰지 않은 행은 버립니다.
+
+    사용 예:
+        with BulkAppender("site") as appender:
+            for row in rows:
+                appender.append(row)
+    """
+
+    def __init__(self, table: str, flush_size: int = DEFAULT_FLUSH_SIZE,
+                 storage: Optional[StorageBackend] = None):
+        self.table = table
+        self.flush_size = flush_size
+        self.storage = storage or get_storage()
+        self.columns: List[str] = self.storage.columns(table)
+        self.buffer: List[dict] = []
+        self.written = 0
+
+    def append(self, new_data: dict):
+        check_columns(self.columns, new_data)
+        if not self.columns:
+            # 빈 저장소: 첫 행의 키가 헤더가 됩니다.
+            self.columns = list(new_data.keys())
+        self.buffer.append(new_data)
+        if len(self.buffer) >= self.flush_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[dict]):
+        for row in rows:
+            self.append(row)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.storage.append_rows(self.table, self.buffer)
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def __enter__(self) -> "BulkAppender":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+            print(f"[INFO] {self.written}개 행이 '{self.table}' 저장소에 추가되었습니다.")
+        else:
+            self.buffer = []
+        return False
@@ -1,9 +1,15 @@
 import pandas as pd
-import os
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
+try:
+    from .metrics import CHAT_APPEND_SECONDS, HARMFUL_COUNT_SECONDS
+    from .storage import CHAT_TABLE, get_storage
+except ImportError:
+    from metrics import CHAT_APPEND_SECONDS, HARMFUL_COUNT_SECONDS
+    from storage import CHAT_TABLE, get_storage
+
 # --- Pydantic Models ---
 class ProcessedTextRequest(BaseModel):
     user_id: int
@@ -20,8 +26,6 @@ class ChatDataEntry(BaseModel):
     ai_harmfulness: int = 1 # Assuming 1 if it's processed harmful text
 
 # --- Chat Data Manager ---
-CHAT_DB_PATH = "chat_db.csv"
-
 def parse_processed_text(processed_text: str) -> Dict[str, Optional[str]]:
     harmful_words_match = re.search(r'문장 중 유해한 단어들: \[(.*?)]', processed_text)
     replacement_format_match = re.search(r"대체 제안 형식: '(.*?)'", processed_text)
@@ -37,9 +41,9 @@ def parse_processed_text(processed_text: str) -> Dict[str, Optional[str]]:
         "replacement_text": replacement_text
     }
 
-def append_chat_data(data: ProcessedTextRequest):
+def build_chat_entry(data: ProcessedTextRequest) -> ChatDataEntry:
     parsed_data = parse_processed_text(data.processed_text)
-    new_entry = ChatDataEntry(
+    return ChatDataEntry(
         id=data.user_id,
         original_text=data.original_text,
         processed_text=data.processed_text,
@@ -49,21 +53,21 @@ def append_chat_data(data: ProcessedTextRequest):
         ai_harmfulness=1
     )
 
-    df = pd.DataFrame([new_entry.dict()])
+def append_chat_data(data: ProcessedTextRequest):
+    append_chat_data_batch([data])
 
-    if not os.path.exists(CHAT_DB_PATH):
-        df.to_csv(CHAT_DB_PATH, index=False)
-    else:
-        df.to_csv(CHAT_DB_PATH, mode='a', header=False, index=False)
+def append_chat_data_batch(items: List[ProcessedTextRequest]):
+    """Append all entries to the chat store as a single batch (one WAL group commit for CSV)."""
+    if not items:
+        return
+    rows = [build_chat_entry(data).dict() for data in items]
+    with CHAT_APPEND_SECONDS.time():
+        get_storage().append_rows(CHAT_TABLE, rows)
 
 def get_user_harmful_chat_count(user_id: int) -> int:
-    if not os.path.exists(CHAT_DB_PATH):
-        return 0
-    df = pd.read_csv(CHAT_DB_PATH)
-    return len(df[(df['id'] == user_id) & (df['ai_harmfulness'] == 1)])
+    with HARMFUL_COUNT_SECONDS.time():
+        return get_storage().user_harmful_count(user_id)
 
 def get_user_harmful_chat_data(user_id: int) -> pd.DataFrame:
-    if not os.path.exists(CHAT_DB_PATH):
-        return pd.DataFrame()
-    df = pd.read_csv(CHAT_DB_PATH)
-    return df[(df['id'] == user_id) & (df['ai_harmfulness'] == 1)]
+    """Rows are indexed by a row key that increases with every append (CSV byte offset or SQLite rowid)."""
+    return get_storage().user_harmful_rows(user_id)
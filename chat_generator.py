@@ -3,13 +3,43 @@
 import os
 import sys
 import json
-import pandas as pd
-import openai
-
-HARMFUL_WORDS_COL = "harmful_words"
-
-def load_data(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+try:
+    from .llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from .llm_gateway import get_gateway
+    from .storage import CHAT_TABLE, get_storage
+except ImportError:
+    from llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from llm_gateway import get_gateway
+    from storage import CHAT_TABLE, get_storage
+
+# pandas · numpy 는 generate_chat_report 를 실제로 실행할 때 import
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from harmful_words import WordTable
+
+DEFAULT_WORKERS = 1
+# 사용자 수 · 행 수가 고르지 않아도 작업이 한 프로세스에 몰리지 않도록 프로세스당 여러 조각으로 나눔
+PARTITIONS_PER_WORKER = 4
+# 사용자별 통계에 필요한 컬럼만 작업 프로세스로 보냄 (+ harmful_words)
+STATS_COLUMNS = ["id", "text", "spend_receive"]
+
+def load_data(csv_path: Optional[str] = None) -> "pd.DataFrame":
+    """csv_path 가 없으면 설정된 저장소 백엔드(CSV 또는 SQLite)의 chat 테이블을 읽습니다."""
+    import pandas as pd
+    try:
+        from .harmful_words import HARMFUL_WORDS_COL
+    except ImportError:
+        from harmful_words import HARMFUL_WORDS_COL
+
+    if csv_path is None:
+        df = get_storage().read_table(CHAT_TABLE)
+    else:
+        df = pd.read_csv(csv_path)
     expected = [
         "text", "intensity", "id",
         "abuse", "censure", "discrimination",
@@ -25,26 +55,42 @@ def load_data(csv_path: str) -> pd.DataFrame:
     return df
 
 
-def top_n_harmful_words(df: pd.DataFrame, n: int = 3) -> list[dict]:
-    all_words = (
-        df[HARMFUL_WORDS_COL]
-        .fillna("")
-        .astype(str)
-        .str.split(",")
-        .explode()
-        .str.strip()
-    )
-    all_words = all_words[all_words != ""]
-    counts = all_words.value_counts().head(n)
-    return [{"word": w, "count": int(c)} for w, c in counts.items()]
+def top_n_harmful_words(df: "pd.DataFrame", n: int = 3) -> list[dict]:
+    try:
+        from .harmful_words import word_table_from_frame
+    except ImportError:
+        from harmful_words import word_table_from_frame
+
+    counts = word_table_from_frame(df).word_counts()
+    top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:n]
+    return [{"word": w, "count": c} for w, c in top]
+
 
+def load_word_table(input_path: Optional[str], n_rows: int) -> "WordTable":
+    """미리 파싱된 유해 단어 색인. load_data 이후에 추가된 행은 제외합니다."""
+    try:
+        from .harmful_words import get_word_index
+    except ImportError:
+        from harmful_words import get_word_index
+
+    if input_path is None:
+        words = get_storage().harmful_words()
+    else:
+        words = get_word_index(input_path).table()
+    return words.limit_rows(n_rows)
+
+
+def spend_receive_stats(df: "pd.DataFrame") -> dict:
+    try:
+        from .harmful_words import HARMFUL_WORDS_COL, has_harmful_words
+    except ImportError:
+        from harmful_words import HARMFUL_WORDS_COL, has_harmful_words
 
-def spend_receive_stats(df: pd.DataFrame) -> dict:
     stats = {}
     for val, label in [(1, "spend"), (0, "receive")]:
         grp = df[df["spend_receive"] == val]
         total = len(grp)
-        harmful = grp[grp[HARMFUL_WORDS_COL].fillna("").astype(str).str.strip() != ""].shape[0]
+        harmful = int(has_harmful_words(grp[HARMFUL_WORDS_COL]).sum())
         clean = total - harmful
         stats[label] = {
             "total_messages": total,
@@ -82,40 +128,103 @@ def make_prompt(user_id: int, top3: list, sr_stats: dict) -> str:
 
 
 def generate_report_with_gpt(prompt: str, model="gpt-4o-mini") -> str:
-    resp = openai.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=500
-    )
-    return resp.choices[0].message.content.strip()
+    return get_gateway().complete(prompt, model=model, temperature=0.7, max_tokens=500).strip()
 
 
-def generate_chat_report(input_path: str, output_path: str):
-    df = load_data(input_path)
-    output = []
-
+def user_entries(df: "pd.DataFrame", top_words: Dict[int, list], words_by_row: Dict[int, list]) -> List[dict]:
+    """df 에 있는 사용자별 리포트 항목(gpt_report 는 None)을 사용자 id 순서로 만듭니다."""
+    entries = []
     for user_id, user_df in df.groupby("id"):
-        print(f"[INFO] 사용자 {user_id} 처리 중...")
-        top3 = top_n_harmful_words(user_df)
-        sr_stats = spend_receive_stats(user_df)
-        bad_msgs = user_df[user_df[HARMFUL_WORDS_COL].fillna("").astype(str).str.strip() != ""]
         records = [
-            {"text": row["text"], "harmful_words": [w.strip() for w in str(row[HARMFUL_WORDS_COL]).split(",") if w.strip()]}
-            for _, row in bad_msgs.iterrows()
+            {"text": text, "harmful_words": words_by_row[row]}
+            for row, text in zip(user_df.index, user_df["text"])
+            if row in words_by_row
         ]
-        prompt = make_prompt(user_id, top3, sr_stats)
-        report_md = generate_report_with_gpt(prompt)
-
-        output.append({
+        entries.append({
             "user_id": user_id,
-            "top3_harmful_words": top3,
-            "spend_receive_stats": sr_stats,
+            "top3_harmful_words": top_words.get(int(user_id), []),
+            "spend_receive_stats": spend_receive_stats(user_df),
             "records": records,
-            "gpt_report": report_md
+            "gpt_report": None
         })
+    return entries
+
+
+def partition_by_user(df: "pd.DataFrame", n_parts: int) -> List["pd.DataFrame"]:
+    """
+    사용자 id 순서대로 행 수가 비슷한 n_parts 개 이하의 조각으로 나눕니다. 한 사용자의 행은 한 조각에만
+    들어가고 조각 안의 행 순서는 그대로라, 조각별 결과를 이어 붙이면 전체를 한 번에 처리한 결과와 같습니다.
+    """
+    sizes = df.groupby("id").size()
+    starts = sizes.cumsum() - sizes
+    part_of_user = (starts * n_parts // max(len(df), 1)).clip(upper=n_parts - 1)
+    return [part for _, part in df.groupby(df["id"].map(part_of_user), sort=True)]
+
+
+def compute_user_entries(df: "pd.DataFrame", top_words: Dict[int, list], words_by_row: Dict[int, list],
+                         workers: int = DEFAULT_WORKERS) -> List[dict]:
+    """
+    workers > 1 이면 사용자 단위로 나눈 조각을 프로세스 풀에서 계산합니다. 각 작업에는 조각의 행과
+    그 조각 사용자의 단어 색인만 넘기며, 결과는 workers=1 과 같습니다.
+    """
+    try:
+        from .harmful_words import HARMFUL_WORDS_COL
+    except ImportError:
+        from harmful_words import HARMFUL_WORDS_COL
+
+    if workers <= 1:
+        return user_entries(df, top_words, words_by_row)
+
+    parts = partition_by_user(df[STATS_COLUMNS + [HARMFUL_WORDS_COL]], workers * PARTITIONS_PER_WORKER)
+    part_top_words = [
+        {int(uid): top_words[int(uid)] for uid in part["id"].unique() if int(uid) in top_words}
+        for part in parts
+    ]
+    part_words_by_row = [{row: words_by_row[row] for row in part.index if row in words_by_row} for part in parts]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(user_entries, parts, part_top_words, part_words_by_row)
+        return [entry for entries in results for entry in entries]
+
+
+def generate_chat_report(input_path: Optional[str], output_path: str, concurrency: int = DEFAULT_CONCURRENCY,
+                         workers: int = DEFAULT_WORKERS):
+    """
+    concurrency > 1 이면 사용자별 GPT 호출을 그 수만큼 동시에 보냅니다(결과 순서는 사용자 id 순 그대로).
+    한 사용자의 호출이 실패해도 나머지는 계속 진행하고, 그 사용자의 gpt_report 는 None 으로 남깁니다.
+    workers > 1 이면 GPT 호출 전의 사용자별 통계를 그 수만큼의 프로세스에서 나눠 계산합니다.
+    """
+    df = load_data(input_path)
+    words = load_word_table(input_path, len(df))
+    output = compute_user_entries(df, words.top_words_by_user(3), words.words_by_row(), workers)
+    prompts = []
+    for entry in output:
+        print(f"[INFO] 사용자 {entry['user_id']} 처리 중...")
+        prompts.append((make_prompt(entry["user_id"], entry["top3_harmful_words"], entry["spend_receive_stats"]),))
+
+    reports = run_concurrently(generate_report_with_gpt, prompts, concurrency)
+    for entry, report in zip(output, reports):
+        if isinstance(report, Exception):
+            print(f"[ERROR] 사용자 {entry['user_id']} 보고서 생성 실패: {report}", file=sys.stderr)
+            continue
+        entry["gpt_report"] = report
 
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(output, f, ensure_ascii=False, indent=2)
     print(f"[INFO] 리포트를 '{output_path}'에 저장했습니다.")
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="채팅 유해성 리포트 생성")
+    parser.add_argument("--input", default=None,
+                        help="입력 CSV 경로 (기본: 설정된 저장소의 chat 테이블)")
+    parser.add_argument("--output", default="chat_report.json", help="출력 JSON 경로")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="동시에 보낼 GPT 요청 수 (기본: 1, 순차 실행)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="사용자별 통계를 계산할 프로세스 수 (기본: 1, 현재 프로세스에서 계산)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    generate_chat_report(args.input, args.output, concurrency=args.concurrency, workers=args.workers)
@@ -1,17 +1,17 @@
-import pandas as pd
+try:
+    from .storage import CHAT_TABLE, get_storage
+except ImportError:
+    from storage import CHAT_TABLE, get_storage
 
 # 파일 경로
-input_file = "./chat_db.csv"
 output_file = "./chat_harmfulness_by_id.csv"
 
-# CSV 읽기
-df = pd.read_csv(input_file)
-
 # 유해성 범주 컬럼 정의
 harmful_columns = ["abuse", "censure", "discrimination", "hate", "sexual", "violence"]
 
-# ID별로 평균 계산
-grouped_df = df.groupby("id")[harmful_columns].mean().round(4).reset_index()
+# ID별 평균: 전체 재계산 대신 append 시 갱신되는 누적 집계를 사용
+grouped_df = get_storage().harmfulness_table(CHAT_TABLE, ("id",))
+grouped_df[harmful_columns] = grouped_df[harmful_columns].round(4)
 
 # 컬럼명 변경
 grouped_df.columns = ["id"] + [f"mean_{col}" for col in harmful_columns]
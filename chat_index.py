@@ -0,0 +1,209 @@
+import io
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .csv_records import iter_records, parse_record, read_header, read_span
+    from .file_lock import file_lock
+except ImportError:
+    from csv_records import iter_records, parse_record, read_header, read_span
+    from file_lock import file_lock
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = "kitty-chat-index-v1"
+
+
+def _to_int(value: str) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class ChatIndex:
+    """
+    Persistent per-user index over chat_db.csv.
+
+    The index file (``<csv>.idx``) is an append-only log with one line per CSV record:
+    ``start,end,user_id,harmful,crc32``. In memory it keeps the harmful count and the
+    byte spans of the harmful records for every user, so the count check is a dict
+    lookup and fetching a user's rows seeks straight to that user's records.
+
+    The index covers the CSV up to ``covered_end``. Rows appended by any writer are
+    picked up by scanning only the uncovered tail. If the index is missing, or the CSV
+    was truncated or rewritten (header or last-record checksum mismatch), it rebuilds.
+    """
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.index_path = csv_path + INDEX_SUFFIX
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.columns: List[str] = []
+        self.header_end = 0
+        self.header_crc = 0
+        self.covered_end = 0
+        self.counts: Dict[int, int] = {}
+        self.spans: Dict[int, List[Tuple[int, int]]] = {}
+        self._last_record: Optional[Tuple[int, int, int]] = None
+        self._log_pos = 0
+        self._verified_stat: Optional[Tuple[int, int]] = None
+
+    # --- Queries ---
+    def harmful_count(self, user_id: int) -> int:
+        with self._lock:
+            self.refresh()
+            return self.counts.get(user_id, 0)
+
+    def harmful_spans(self, user_id: int) -> List[Tuple[int, int]]:
+        with self._lock:
+            self.refresh()
+            return list(self.spans.get(user_id, []))
+
+    def read_harmful_rows(self, user_id: int) -> pd.DataFrame:
+        """
+        Read only the given user's harmful records from the CSV.
+        The returned DataFrame is indexed by each record's byte offset in the CSV.
+        """
+        with self._lock:
+            self.refresh()
+            spans = list(self.spans.get(user_id, []))
+            if not spans:
+                return pd.DataFrame()
+            with open(self.csv_path, "rb") as f:
+                header = read_span(f, 0, self.header_end)
+                body = b"".join(read_span(f, start, end) for start, end in spans)
+        df = pd.read_csv(io.BytesIO(header + body))
+        df.index = pd.Index([start for start, _ in spans], name="offset")
+        return df
+
+    # --- Maintenance ---
+    def refresh(self):
+        """Bring the in-memory index up to date with the CSV, rebuilding it if stale."""
+        with self._lock:
+            if not os.path.isfile(self.csv_path):
+                if self.covered_end:
+                    self._reset()
+                return
+
+            st = os.stat(self.csv_path)
+            stat_key = (st.st_size, st.st_mtime_ns)
+            if stat_key == self._verified_stat:
+                return
+
+            # The index log is shared by all workers; maintain it under the chat_db writer lock
+            with file_lock(self.csv_path):
+                if not self.covered_end or not self._read_log():
+                    self._reset()
+                    self._load()
+
+                st = os.stat(self.csv_path)
+                if not self._is_consistent(st.st_size):
+                    self.rebuild()
+                elif st.st_size > self.covered_end:
+                    self._scan_tail()
+                self._verified_stat = (st.st_size, st.st_mtime_ns)
+
+    def rebuild(self):
+        with self._lock:
+            print(f"[INFO] Rebuilding chat index '{self.index_path}'.")
+            self._reset()
+            self.columns, self.header_end, self.header_crc = read_header(self.csv_path)
+            with open(self.index_path, "w", encoding="utf-8") as log:
+                log.write(f"#{INDEX_VERSION},{self.header_end},{self.header_crc}\n")
+                self._log_pos = log.tell()
+            self.covered_end = self.header_end
+            if self.header_end:
+                self._scan_tail()
+
+    def _is_consistent(self, csv_size: int) -> bool:
+        if not self.covered_end or csv_size < self.covered_end:
+            return False
+        columns, header_end, header_crc = read_header(self.csv_path)
+        if (header_end, header_crc) != (self.header_end, self.header_crc):
+            return False
+        self.columns = columns
+        if self._last_record is not None:
+            start, end, crc = self._last_record
+            with open(self.csv_path, "rb") as f:
+                if zlib.crc32(read_span(f, start, end)) != crc:
+                    return False
+        return True
+
+    def _scan_tail(self):
+        id_pos = self.columns.index("id") if "id" in self.columns else None
+        harm_pos = self.columns.index("ai_harmfulness") if "ai_harmfulness" in self.columns else None
+        lines = []
+        with open(self.csv_path, "rb") as f:
+            for start, end, raw in iter_records(f, self.covered_end, include_unterminated=True):
+                fields = parse_record(raw)
+                user_id = _to_int(fields[id_pos]) if id_pos is not None and id_pos < len(fields) else None
+                harm = _to_int(fields[harm_pos]) if harm_pos is not None and harm_pos < len(fields) else None
+                harmful = int(user_id is not None and harm == 1)
+                crc = zlib.crc32(raw)
+                self._apply(start, end, user_id, harmful, crc)
+                lines.append(f"{start},{end},{'' if user_id is None else user_id},{harmful},{crc}\n")
+        if lines:
+            with open(self.index_path, "r+b") as log:
+                log.truncate(self._log_pos)
+                log.seek(self._log_pos)
+                log.write("".join(lines).encode("utf-8"))
+                self._log_pos = log.tell()
+
+    def _apply(self, start: int, end: int, user_id: Optional[int], harmful: int, crc: int):
+        if harmful:
+            self.counts[user_id] = self.counts.get(user_id, 0) + 1
+            self.spans.setdefault(user_id, []).append((start, end))
+        self.covered_end = end
+        self._last_record = (start, end, crc)
+
+    def _load(self):
+        if not os.path.isfile(self.index_path):
+            return
+        with open(self.index_path, "rb") as log:
+            first = log.readline()
+            parts = first.decode("utf-8", errors="replace").strip().lstrip("#").split(",")
+            if len(parts) != 3 or parts[0] != INDEX_VERSION:
+                return
+            self.header_end, self.header_crc = int(parts[1]), int(parts[2])
+            self.covered_end = self.header_end
+            self._log_pos = log.tell()
+        if not self._read_log():
+            self._reset()
+
+    def _read_log(self) -> bool:
+        """
+        Apply log lines appended since the last read (e.g. by another process).
+        Returns False if the log was replaced underneath us and must be reloaded.
+        """
+        if not os.path.isfile(self.index_path) or os.path.getsize(self.index_path) < self._log_pos:
+            return False
+        with open(self.index_path, "rb") as log:
+            log.seek(self._log_pos)
+            data = log.read()
+        # A trailing fragment without a newline is a torn write; it is overwritten on the next append.
+        for line in data.split(b"\n")[:-1]:
+            parts = line.decode("utf-8", errors="replace").split(",")
+            if len(parts) != 5 or not parts[0].isdigit() or int(parts[0]) != self.covered_end:
+                return False
+            start, end, user_id, harmful, crc = parts
+            self._apply(int(start), int(end), int(user_id) if user_id else None, int(harmful), int(crc))
+            self._log_pos += len(line) + 1
+        return True
+
+_indexes: Dict[str, ChatIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_chat_index(csv_path: str) -> ChatIndex:
+    with _indexes_lock:
+        index = _indexes.get(csv_path)
+        if index is None:
+            index = _indexes[csv_path] = ChatIndex(csv_path)
+        return index
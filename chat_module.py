@@ -1,31 +1,31 @@
-import pandas as pd
+from typing import Dict, Iterable, List
 
-def get_harmful_chat_categories_by_id(target_id: int):
+try:
+    from .harmful_categories import get_category_lookup
+    from .storage import CHAT_TABLE
+except ImportError:
+    from harmful_categories import get_category_lookup
+    from storage import CHAT_TABLE
+
+def get_harmful_chat_categories_by_id(target_id: int) -> List[str]:
     """
-    주어진 CSV 파일에서 특정 id에 대해 0보다 큰 유해성 카테고리 이름을 리스트로 반환합니다.
+    특정 id 에 대해 0보다 큰 유해성 카테고리 이름을 리스트로 반환합니다.
+    id별 조회 테이블을 메모리에 캐시해 두고, 저장소 파일이 바뀌면(크기·수정 시각) 다시 만듭니다.
 
     Parameters:
-        csv_path (str): CSV 파일 경로
         target_id (int): 조회하고자 하는 id 값
 
     Returns:
-        List[str]: 유해성이 감지된 컬럼명 리스트 (0보다 큰 항목들)
+        List[str]: 유해성이 감지된 컬럼명 리스트 (0보다 큰 항목들, 예: "mean_abuse")
     """
-    # CSV 로드
-    CSV_PATH = "~/kitty/report-generator/chat_harmfulness_by_id.csv"
-    df = pd.read_csv(CSV_PATH)
-
-    # 해당 ID의 row 찾기
-    row = df[df["id"] == target_id]
-
-    if row.empty:
-        return []
-
-    # ID 열 제외한 유해성 평균 열만 추출
-    row_data = row.drop(columns=["id"]).iloc[0]
+    return get_category_lookup(CHAT_TABLE).get(target_id)
 
-    # 0보다 큰 값의 컬럼명을 리스트로 반환
-    harmful_categories = [col for col, val in row_data.items() if val > 0]
 
-    return harmful_categories
+def get_harmful_chat_categories_by_ids(target_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """
+    여러 id 를 한 번에 조회합니다. 없는 id 는 빈 리스트로 채워집니다.
 
+    Returns:
+        Dict[int, List[str]]: {id: 유해성이 감지된 컬럼명 리스트}
+    """
+    return get_category_lookup(CHAT_TABLE).get_many(target_ids)
@@ -8,28 +8,43 @@ chat_report_generator.py
     3) 유해 단어가 있는 메시지의 'text'와 'harmful_words'만 추출
     4) GPT‑4o‑mini 프롬프트 엔지니어링을 통한 Markdown 요약 보고서
   결과를 chat_report.json 으로 저장
+
+배치 모드 (llm_batch.py 참고):
+    python chat_report.py --batch-requests chat_requests.jsonl   # 1) 통계 + 요청 파일 저장
+    python chat_report.py --batch-results chat_results.jsonl     # 2) 결과를 chat_report.json 에 반영
+
+여러 머신에 나눠 실행 (report_shards.py 참고):
+    python chat_report.py --shard 0/4                           # → chat_report.shard-0-of-4.json
+    python chat_report.py --merge chat_report.shard-*.json      # → chat_report.json
 """
 
 import os
 import sys
 import json
+import argparse
 import pandas as pd
-import openai
 
-# ─── 설정 ──────────────────────────────────────────────────────────────────────
+try:
+    from .harmful_words import HARMFUL_WORDS_COL, get_word_index, has_harmful_words, word_table_from_frame
+    from .llm_batch import apply_batch_results, batch_request, read_batch_results, write_batch_requests
+    from .llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from .llm_gateway import get_gateway
+    from .metrics import METRICS_FILE, REPORT_GENERATION_SECONDS, dump_at_exit
+    from .report_shards import add_arguments as add_shard_arguments, in_selection, merge_outputs, shard_output_path
+except ImportError:
+    from harmful_words import HARMFUL_WORDS_COL, get_word_index, has_harmful_words, word_table_from_frame
+    from llm_batch import apply_batch_results, batch_request, read_batch_results, write_batch_requests
+    from llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from llm_gateway import get_gateway
+    from metrics import METRICS_FILE, REPORT_GENERATION_SECONDS, dump_at_exit
+    from report_shards import add_arguments as add_shard_arguments, in_selection, merge_outputs, shard_output_path
 
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    print("Error: 환경변수 OPENAI_API_KEY가 설정되어 있지 않습니다.", file=sys.stderr)
-    sys.exit(1)
-openai.api_key = API_KEY
+# ─── 설정 ──────────────────────────────────────────────────────────────────────
 
 MODEL_NAME       = "gpt-4o-mini"
 RAW_CSV_PATH     = "chat_db.csv"
 OUTPUT_JSON_PATH = "chat_report.json"
 
-HARMFUL_WORDS_COL = "harmful_words"
-
 
 # ─── 1) 데이터 로드 ────────────────────────────────────────────────────────────
 
@@ -54,17 +69,9 @@ def load_data() -> pd.DataFrame:
 # ─── 2) 유해 단어 Top 3 집계 ────────────────────────────────────────────────────
 
 def top_n_harmful_words(df: pd.DataFrame, n: int = 3) -> list[dict]:
-    all_words = (
-        df[HARMFUL_WORDS_COL]
-        .fillna("")
-        .astype(str)
-        .str.split(",")
-        .explode()
-        .str.strip()
-    )
-    all_words = all_words[all_words != ""]
-    counts = all_words.value_counts().head(n)
-    return [{"word": w, "count": int(c)} for w, c in counts.items()]
+    counts = word_table_from_frame(df).word_counts()
+    top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:n]
+    return [{"word": w, "count": c} for w, c in top]
 
 
 # ─── 3) spend_receive별 통계 ───────────────────────────────────────────────────
@@ -74,9 +81,7 @@ def spend_receive_stats(df: pd.DataFrame) -> dict[str, dict]:
     for val, label in [(1, "spend"), (0, "receive")]:
         grp = df[df["spend_receive"] == val]
         total = len(grp)
-        harmful = grp[grp[HARMFUL_WORDS_COL]
-                       .fillna("").astype(str)
-                       .str.strip() != ""].shape[0]
+        harmful = int(has_harmful_words(grp[HARMFUL_WORDS_COL]).sum())
         clean = total - harmful
         stats[label] = {
             "total_messages": total,
@@ -118,53 +123,114 @@ def make_prompt(user_id: int,
 
 
 def generate_report_with_gpt(prompt: str) -> str:
-    resp = openai.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=500
-    )
-    return resp.choices[0].message.content.strip()
+    with REPORT_GENERATION_SECONDS.time(generator="chat_report"):
+        return get_gateway().complete(prompt, model=MODEL_NAME, temperature=0.7, max_tokens=500).strip()
+
+
+def batch_custom_id(user_id) -> str:
+    return f"chat-report-{user_id}"
 
 
 # ─── 5) 메인 실행 ─────────────────────────────────────────────────────────────
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="채팅 유해성 리포트 생성")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="동시에 보낼 GPT 요청 수 (기본: 1, 순차 실행)")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="종료 시 Prometheus 형식 지표를 저장할 경로 (기본: 환경변수 KITTY_METRICS_FILE)")
+    add_shard_arguments(parser, OUTPUT_JSON_PATH)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch-requests", metavar="PATH",
+                      help="GPT 를 호출하지 않고 프롬프트를 배치 요청 JSONL 로 저장 (배치 1단계)")
+    mode.add_argument("--batch-results", metavar="PATH",
+                      help=f"배치 결과 JSONL 을 '{OUTPUT_JSON_PATH}' 의 보고서에 반영 (배치 2단계, "
+                           f"--shard 를 주면 그 shard 의 부분 결과에 반영)")
+    mode.add_argument("--merge", nargs="+", metavar="PARTIAL",
+                      help=f"--shard 로 만든 부분 결과들을 '{OUTPUT_JSON_PATH}' 로 합침")
+    return parser.parse_args()
+
+
+def save_report(output: list[dict], output_path: str = OUTPUT_JSON_PATH):
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+
+def ingest_batch_results(results_path: str, output_path: str = OUTPUT_JSON_PATH):
+    """1단계에서 저장한 chat_report.json (또는 shard 부분 결과)에 배치 결과의 gpt_report 를 채웁니다."""
+    if not os.path.isfile(output_path):
+        print(f"Error: '{output_path}' 가 없습니다. 먼저 --batch-requests 로 실행하세요.", file=sys.stderr)
+        sys.exit(1)
+    with open(output_path, "r", encoding="utf-8") as f:
+        output = json.load(f)
+    filled = apply_batch_results(output, read_batch_results(results_path), "gpt_report", batch_custom_id)
+    save_report(output, output_path)
+    print(f"[INFO] {len(output)}명 중 {filled}명의 보고서를 '{output_path}'에 반영했습니다.")
+
+
 def main():
+    args = parse_args()
+    dump_at_exit(args.metrics_file)
+    if args.merge:
+        count = merge_outputs(args.merge, OUTPUT_JSON_PATH)
+        print(f"[INFO] 부분 결과 {len(args.merge)}개({count}명)를 '{OUTPUT_JSON_PATH}'에 합쳤습니다.")
+        return
+    output_path = shard_output_path(OUTPUT_JSON_PATH, args.shard)
+    if args.batch_results:
+        ingest_batch_results(args.batch_results, output_path)
+        return
+
     df = load_data()
+    # 미리 파싱된 유해 단어 색인 (load_data 이후 추가된 행 제외)
+    words = get_word_index(RAW_CSV_PATH).table().limit_rows(len(df))
+    top_words = words.top_words_by_user(3)
+    words_by_row = words.words_by_row()
     output = []
+    prompts = []
 
     for user_id, user_df in df.groupby("id"):
+        if not in_selection(user_id, args.shard, args.users):
+            continue
         print(f"[INFO] 사용자 {user_id} 처리 중...")
         # Top 3 유해 단어
-        top3 = top_n_harmful_words(user_df, n=3)
+        top3 = top_words.get(int(user_id), [])
         # spend/receive 통계
         sr_stats = spend_receive_stats(user_df)
         # 유해 단어가 있는 메시지만 추출
-        bad_msgs = user_df[user_df[HARMFUL_WORDS_COL]
-                           .fillna("").astype(str)
-                           .str.strip() != ""]
         records = [
-            {"text": row["text"],
-             "harmful_words": [w.strip() for w in str(row[HARMFUL_WORDS_COL]).split(",") if w.strip()]}
-            for _, row in bad_msgs.iterrows()
+            {"text": text, "harmful_words": words_by_row[row]}
+            for row, text in zip(user_df.index, user_df["text"])
+            if row in words_by_row
         ]
 
-        # GPT 보고서
-        prompt = make_prompt(user_id, top3, sr_stats)
-        report_md = generate_report_with_gpt(prompt)
+        # GPT 보고서 프롬프트 (호출은 아래에서 한꺼번에)
+        prompts.append((make_prompt(user_id, top3, sr_stats),))
 
         output.append({
             "user_id": user_id,
             "top3_harmful_words": top3,
             "spend_receive_stats": sr_stats,
             "records": records,
-            "gpt_report": report_md
+            "gpt_report": None
         })
 
-    with open(OUTPUT_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-
-    print(f"[INFO] 사용자별 리포트를 '{OUTPUT_JSON_PATH}'에 저장했습니다.")
+    if args.batch_requests:
+        # 배치 1단계: gpt_report 는 비워 두고, 2단계(--batch-results)에서 채움
+        write_batch_requests(args.batch_requests, (
+            batch_request(batch_custom_id(entry["user_id"]), prompt, model=MODEL_NAME, max_tokens=500)
+            for entry, (prompt,) in zip(output, prompts)
+        ))
+    else:
+        # GPT 보고서: --concurrency 개씩 동시에 호출, 결과는 사용자 순서대로
+        reports = run_concurrently(generate_report_with_gpt, prompts, args.concurrency)
+        for entry, report in zip(output, reports):
+            if isinstance(report, Exception):
+                print(f"[ERROR] 사용자 {entry['user_id']} 보고서 생성 실패: {report}", file=sys.stderr)
+                continue
+            entry["gpt_report"] = report
+
+    save_report(output, output_path)
+    print(f"[INFO] 사용자별 리포트를 '{output_path}'에 저장했습니다.")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,9 @@
 import pandas as pd
-from collections import Counter
+
+try:
+    from .harmful_words import word_table_from_frame
+except ImportError:
+    from harmful_words import word_table_from_frame
 
 def generate_chat_statistics(user_data: pd.DataFrame) -> dict:
     stats = {
@@ -13,15 +17,9 @@ def generate_chat_statistics(user_data: pd.DataFrame) -> dict:
 
     stats["total_harmful_entries"] = len(user_data)
 
-    all_harmful_words = []
-    for _, row in user_data.iterrows():
-        if row['harmful_words']:
-            # Assuming harmful_words can be a comma-separated string
-            words = [word.strip() for word in row['harmful_words'].split(',')]
-            all_harmful_words.extend(words)
-
-    word_counts = Counter(all_harmful_words)
-    stats["harmful_word_counts"] = dict(word_counts)
+    # harmful_words 는 "['단어1', '단어2']" 형태의 리스트 리터럴 → 파싱 후 정수 id 로 group-count
+    word_counts = word_table_from_frame(user_data).word_counts()
+    stats["harmful_word_counts"] = word_counts
 
     # Get top 5 harmful words
     stats["top_5_harmful_words"] = sorted(word_counts.items(), key=lambda item: item[1], reverse=True)[:5]
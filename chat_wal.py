@@ -0,0 +1,258 @@
+import io
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .csv_records import read_header
+    from .file_lock import file_lock
+except ImportError:
+    from csv_records import read_header
+    from file_lock import file_lock
+
+WAL_SUFFIX = ".wal"
+CHECKPOINT_SUFFIX = ".wal.ckpt"
+FRAME_HEADER_SIZE = 18  # "%08x %08x " : payload length, crc32
+
+# Group commit window: a batch is made durable after FLUSH_MS or MAX_BATCH rows, whichever comes first
+WAL_FLUSH_MS = float(os.getenv("CHAT_WAL_FLUSH_MS", "5"))
+WAL_MAX_BATCH = int(os.getenv("CHAT_WAL_MAX_BATCH", "256"))
+# Applied frames are dropped from the WAL once it grows past this size
+WAL_COMPACT_BYTES = int(os.getenv("CHAT_WAL_COMPACT_BYTES", str(16 * 1024 * 1024)))
+
+
+def _plain_value(value):
+    """numpy/pandas scalars -> plain Python values that survive a JSON round trip (as in storage._sql_value)."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if hasattr(value, "item"):  # numpy scalar
+        return value.item()
+    if hasattr(value, "isoformat"):  # datetime / date
+        return value.isoformat()
+    return value
+
+
+def _plain_rows(rows: List[dict]) -> List[dict]:
+    return [{key: _plain_value(value) for key, value in row.items()} for row in rows]
+
+
+def _json_default(value):
+    plain = _plain_value(value)
+    if plain is value:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return plain
+
+
+def _encode_frame(rows: List[dict]) -> bytes:
+    payload = json.dumps({"rows": rows}, ensure_ascii=False, default=_json_default).encode("utf-8")
+    return b"%08x %08x " % (len(payload), zlib.crc32(payload)) + payload + b"\n"
+
+
+def _read_frames(f, start: int) -> Tuple[List[List[dict]], int]:
+    """Read valid frames from `start`. Returns (row batches, offset after the last valid frame)."""
+    f.seek(start)
+    batches = []
+    pos = start
+    while True:
+        header = f.read(FRAME_HEADER_SIZE)
+        if len(header) < FRAME_HEADER_SIZE:
+            break
+        try:
+            length, crc = int(header[0:8], 16), int(header[9:17], 16)
+        except ValueError:
+            break
+        payload = f.read(length + 1)
+        if len(payload) < length + 1 or payload[-1:] != b"\n" or zlib.crc32(payload[:-1]) != crc:
+            break
+        batches.append(json.loads(payload[:-1].decode("utf-8"))["rows"])
+        pos += FRAME_HEADER_SIZE + length + 1
+    return batches, pos
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class ChatAppendLog:
+    """
+    Write-ahead log in front of chat_db.csv.
+
+    All appends in a process go through one writer thread, and writers in different
+    processes are serialized with a file lock, so rows never interleave and only the
+    first writer ever emits the header. The writer groups appends that arrive within
+    a short window into one WAL frame, fsyncs once for the whole group, applies the
+    rows to the CSV and records a checkpoint (WAL offset and CSV size after apply).
+
+    Recovery runs on startup and before every commit: a torn trailing WAL frame is
+    truncated, and frames past the checkpoint are replayed after cutting the CSV back
+    to the checkpointed size, which also removes a partially written row.
+    """
+
+    def __init__(self, csv_path: str, flush_ms: float = WAL_FLUSH_MS, max_batch: int = WAL_MAX_BATCH):
+        self.csv_path = csv_path
+        self.wal_path = csv_path + WAL_SUFFIX
+        self.checkpoint_path = csv_path + CHECKPOINT_SUFFIX
+        self.flush_interval = flush_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[List[dict], Future]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_guard = threading.Lock()
+        with file_lock(self.csv_path):
+            self.recover()
+
+    # --- Public API ---
+    def append(self, rows: List[dict], timeout: Optional[float] = None):
+        """Append rows and block until they are durable in the WAL and applied to the CSV."""
+        if not rows:
+            return
+        self._ensure_writer()
+        future: Future = Future()
+        self._queue.put((rows, future))
+        future.result(timeout=timeout)
+
+    def recover(self):
+        """Truncate a torn WAL tail and replay committed frames missing from the CSV. Caller holds the lock."""
+        checkpoint = self._read_checkpoint()
+        if not os.path.isfile(self.wal_path):
+            return
+        wal_size = os.path.getsize(self.wal_path)
+        if checkpoint is None or checkpoint["wal_offset"] > wal_size:
+            # No checkpoint to replay from, or the WAL was compacted: everything in it is applied
+            self._write_checkpoint(wal_size, self._csv_size())
+            return
+
+        with open(self.wal_path, "r+b") as wal:
+            batches, valid_end = _read_frames(wal, checkpoint["wal_offset"])
+            if valid_end < wal_size:
+                print(f"[WARN] Truncating torn WAL record at offset {valid_end} in '{self.wal_path}'.")
+                wal.truncate(valid_end)
+                _fsync(wal)
+
+        if not batches:
+            return
+        print(f"[INFO] Replaying {sum(len(b) for b in batches)} chat rows from '{self.wal_path}'.")
+        csv_size = self._csv_size()
+        if csv_size > checkpoint["csv_size"]:
+            with open(self.csv_path, "r+b") as f:
+                f.truncate(checkpoint["csv_size"])
+        self._apply([row for batch in batches for row in batch])
+        self._write_checkpoint(valid_end, self._csv_size())
+
+    # --- Writer ---
+    def _ensure_writer(self):
+        with self._writer_guard:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="chat-wal-writer", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            rows = len(group[0][0])
+            deadline = time.monotonic() + self.flush_interval
+            while rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                group.append(item)
+                rows += len(item[0])
+
+            try:
+                self._commit([row for item_rows, _ in group for row in item_rows])
+            except Exception as e:
+                for _, future in group:
+                    future.set_exception(e)
+            else:
+                for _, future in group:
+                    future.set_result(None)
+
+    def _commit(self, rows: List[dict]):
+        # The CSV is written from the same plain values the WAL holds, so recovery replays identical rows
+        rows = _plain_rows(rows)
+        with file_lock(self.csv_path):
+            self.recover()
+            if self._read_checkpoint() is None:
+                self._write_checkpoint(self._wal_size(), self._csv_size())
+
+            with open(self.wal_path, "ab") as wal:
+                wal.write(_encode_frame(rows))
+                _fsync(wal)
+                wal_end = wal.tell()
+
+            self._apply(rows)
+            self._write_checkpoint(wal_end, self._csv_size())
+
+            if wal_end > WAL_COMPACT_BYTES:
+                # Truncate first: a crash before the new checkpoint leaves offset > size, which recover() treats as applied
+                with open(self.wal_path, "r+b") as wal:
+                    wal.truncate(0)
+                    _fsync(wal)
+                self._write_checkpoint(0, self._csv_size())
+
+    def _apply(self, rows: List[dict]):
+        write_header = self._csv_size() == 0
+        df = pd.DataFrame(rows)
+        if not write_header:
+            # Line rows up with the existing header when they use its column names
+            columns = read_header(self.csv_path)[0]
+            if set(df.columns) <= set(columns):
+                df = df.reindex(columns=columns)
+        buf = io.StringIO()
+        df.to_csv(buf, header=write_header, index=False)
+        data = buf.getvalue().encode("utf-8")
+        with open(self.csv_path, "a+b") as f:
+            if not write_header:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            _fsync(f)
+
+    # --- Checkpoint ---
+    def _read_checkpoint(self) -> Optional[Dict[str, int]]:
+        if not os.path.isfile(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_checkpoint(self, wal_offset: int, csv_size: int):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"wal_offset": wal_offset, "csv_size": csv_size}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _csv_size(self) -> int:
+        return os.path.getsize(self.csv_path) if os.path.isfile(self.csv_path) else 0
+
+    def _wal_size(self) -> int:
+        return os.path.getsize(self.wal_path) if os.path.isfile(self.wal_path) else 0
+
+
+_logs: Dict[str, ChatAppendLog] = {}
+_logs_guard = threading.Lock()
+
+
+def get_append_log(csv_path: str) -> ChatAppendLog:
+    with _logs_guard:
+        log = _logs.get(csv_path)
+        if log is None:
+            log = _logs[csv_path] = ChatAppendLog(csv_path)
+        return log
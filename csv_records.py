@@ -0,0 +1,74 @@
+import csv
+import io
+import os
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+READ_BLOCK_SIZE = 1 << 20
+
+
+def read_header(path: str) -> Tuple[List[str], int, int]:
+    """
+    CSV 첫 줄(헤더)을 읽습니다.
+
+    Returns:
+        (컬럼 리스트, 헤더 끝 바이트 오프셋, 헤더 crc32). 파일이 없거나 비어 있으면 ([], 0, 0)
+    """
+    if not os.path.isfile(path):
+        return [], 0, 0
+    with open(path, "rb") as f:
+        for _, end, raw in iter_records(f, 0):
+            return parse_record(raw), end, zlib.crc32(raw)
+    return [], 0, 0
+
+
+def parse_record(raw: bytes) -> List[str]:
+    """한 레코드(줄바꿈 포함 원본 바이트)를 필드 리스트로 파싱합니다."""
+    return next(csv.reader(io.StringIO(raw.decode("utf-8"), newline="")), [])
+
+
+def iter_records(f, start: int, end: Optional[int] = None,
+                 include_unterminated: bool = False) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    바이너리 파일 객체 f의 start 오프셋부터 완전한 CSV 레코드를 (시작, 끝, 원본 바이트)로 순회합니다.
+
+    따옴표 안의 줄바꿈은 레코드를 끝내지 않습니다(따옴표 개수 홀짝으로 판별).
+    끝에 줄바꿈이 없는 마지막 레코드는 쓰는 중일 수 있으므로 기본적으로 반환하지 않습니다.
+    include_unterminated=True 이면 따옴표가 닫혀 있는 경우에 한해 반환합니다.
+    """
+    f.seek(start)
+    pos = start
+    record_start = start
+    pending = b""
+    partial_line = b""
+    quotes = 0
+    while end is None or pos < end:
+        block = f.read(READ_BLOCK_SIZE if end is None else min(READ_BLOCK_SIZE, end - pos))
+        if not block:
+            break
+        lines = block.split(b"\n")
+        for i, line in enumerate(lines):
+            if i == len(lines) - 1:
+                # 블록 경계에 걸친 조각은 다음 블록과 합칩니다.
+                partial_line += line
+                break
+            line = partial_line + line
+            partial_line = b""
+            pending += line + b"\n"
+            quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                record_end = record_start + len(pending)
+                yield record_start, record_end, pending
+                record_start = record_end
+                pending = b""
+                quotes = 0
+        pos += len(block)
+
+    pending += partial_line
+    if include_unterminated and pending and (quotes + partial_line.count(b'"')) % 2 == 0:
+        yield record_start, record_start + len(pending), pending
+
+
+def read_span(f, start: int, end: int) -> bytes:
+    f.seek(start)
+    return f.read(end - start)
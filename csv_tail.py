@@ -0,0 +1,176 @@
+import atexit
+import io
+import os
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .csv_records import read_header, read_span
+    from .file_lock import file_lock
+except ImportError:
+    from csv_records import read_header, read_span
+    from file_lock import file_lock
+
+# The snapshot is rewritten after this many new rows (and at exit); rows past it are replayed from the CSV tail
+SNAPSHOT_EVERY_ROWS = int(os.getenv("KITTY_AGG_SNAPSHOT_ROWS", "1000"))
+READ_CHUNK_SIZE = 100_000
+# Bytes before covered_end whose checksum detects a rewritten CSV
+CHECK_WINDOW = 256
+
+
+class CsvTailFollower:
+    """
+    Base for state derived from an append-only CSV (aggregates, indexes).
+
+    The state covers the CSV up to ``covered_end``. ``refresh()`` folds in rows appended
+    by any writer by parsing only the new tail, and rebuilds from scratch if the header
+    changed or the bytes just before ``covered_end`` no longer match (file rewritten).
+    Subclasses implement ``_reset_data``, ``_update(chunk)``, ``_write_snapshot`` and
+    ``_read_snapshot``; the position fields are persisted via ``_position_state``.
+    """
+
+    rebuild_message = "CSV 파생 데이터를 다시 계산합니다"
+
+    def __init__(self, csv_path: str, snapshot_path: str):
+        self.csv_path = csv_path
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+        _followers.append(self)
+
+    def _reset(self):
+        self.header_end = 0
+        self.header_crc = 0
+        self.covered_end = 0
+        self.window_crc = 0
+        self._unsaved_rows = 0
+        self._verified_stat: Optional[Tuple[int, int]] = None
+        self._reset_data()
+
+    # --- Subclass hooks ---
+    def _reset_data(self):
+        raise NotImplementedError
+
+    def _update(self, chunk: pd.DataFrame):
+        raise NotImplementedError
+
+    def _write_snapshot(self, path: str):
+        raise NotImplementedError
+
+    def _read_snapshot(self) -> bool:
+        """Restore data and position from the snapshot. Returns False if it is missing or unusable."""
+        raise NotImplementedError
+
+    def _snapshot_due(self) -> bool:
+        return self._unsaved_rows >= SNAPSHOT_EVERY_ROWS
+
+    # --- Maintenance ---
+    def refresh(self):
+        with self._lock:
+            if not os.path.isfile(self.csv_path):
+                return
+            st = os.stat(self.csv_path)
+            if (st.st_size, st.st_mtime_ns) == self._verified_stat:
+                return
+
+            with file_lock(self.csv_path):
+                if not self._loaded:
+                    if not self._read_snapshot():
+                        self._reset()
+                    self._loaded = True
+
+                size = os.path.getsize(self.csv_path)
+                _, header_end, header_crc = read_header(self.csv_path)
+                if not self._is_consistent(size, header_end, header_crc):
+                    self._rebuild(header_end, header_crc)
+                elif size > self.covered_end:
+                    self._read_tail(size)
+
+                st = os.stat(self.csv_path)
+                self._verified_stat = (st.st_size, st.st_mtime_ns)
+
+            if self._snapshot_due():
+                self.save()
+
+    def _is_consistent(self, size: int, header_end: int, header_crc: int) -> bool:
+        if not self.covered_end or size < self.covered_end:
+            return False
+        if (header_end, header_crc) != (self.header_end, self.header_crc):
+            return False
+        return self._window_crc(self.covered_end) == self.window_crc
+
+    def _window_crc(self, end: int) -> int:
+        start = max(self.header_end, end - CHECK_WINDOW)
+        with open(self.csv_path, "rb") as f:
+            return zlib.crc32(read_span(f, start, end))
+
+    def _rebuild(self, header_end: int, header_crc: int):
+        print(f"[INFO] {self.rebuild_message}: '{self.csv_path}'")
+        self._reset()
+        self.header_end, self.header_crc = header_end, header_crc
+        self.covered_end = header_end
+        if not header_end:
+            return
+        size = os.path.getsize(self.csv_path)
+        self._read_chunks(self.csv_path)
+        self._mark_covered(size)
+        self._unsaved_rows = SNAPSHOT_EVERY_ROWS
+
+    def _read_tail(self, size: int):
+        with open(self.csv_path, "rb") as f:
+            header = read_span(f, 0, self.header_end)
+            tail = read_span(f, self.covered_end, size)
+        if tail.strip():
+            self._read_chunks(io.BytesIO(header + tail))
+        self._mark_covered(size)
+
+    def _read_chunks(self, source):
+        with pd.read_csv(source, chunksize=READ_CHUNK_SIZE, on_bad_lines="skip") as reader:
+            for chunk in reader:
+                self._update(chunk)
+                self._unsaved_rows += len(chunk)
+
+    def _mark_covered(self, end: int):
+        self.covered_end = end
+        self.window_crc = self._window_crc(end)
+
+    # --- Persistence ---
+    def _position_state(self) -> dict:
+        return {
+            "header_end": self.header_end,
+            "header_crc": self.header_crc,
+            "covered_end": self.covered_end,
+            "window_crc": self.window_crc,
+        }
+
+    def _restore_position(self, state: dict):
+        self.header_end = state["header_end"]
+        self.header_crc = state["header_crc"]
+        self.covered_end = state["covered_end"]
+        self.window_crc = state["window_crc"]
+
+    def save(self):
+        with self._lock:
+            if not self.covered_end:
+                return
+            tmp_path = self.snapshot_path + ".tmp"
+            self._write_snapshot(tmp_path)
+            os.replace(tmp_path, self.snapshot_path)
+            self._unsaved_rows = 0
+
+
+_followers: List[CsvTailFollower] = []
+
+
+@atexit.register
+def _save_all():
+    for follower in _followers:
+        if follower._unsaved_rows:
+            try:
+                follower.save()
+            except OSError:
+                pass
@@ -0,0 +1,46 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+_thread_locks: Dict[str, threading.RLock] = {}
+_thread_locks_guard = threading.Lock()
+_held = threading.local()
+
+
+def _thread_lock(path: str) -> threading.RLock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(os.path.abspath(path), threading.RLock())
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive lock for writers of `path`, shared by threads and processes (uvicorn workers).
+    The lock is taken on a sidecar `<path>.lock` file, so the data file itself can be replaced.
+    Re-entering the lock from the thread that holds it is allowed.
+    """
+    lock = _thread_lock(path)
+    with lock:
+        held = getattr(_held, "paths", None)
+        if held is None:
+            held = _held.paths = set()
+        key = os.path.abspath(path)
+        if fcntl is None or key in held:
+            yield
+            return
+        with open(path + LOCK_SUFFIX, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            held.add(key)
+            try:
+                yield
+            finally:
+                held.discard(key)
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
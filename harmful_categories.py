@@ -0,0 +1,65 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .storage import HARM_COLUMNS, StorageBackend, get_storage
+except ImportError:
+    from storage import HARM_COLUMNS, StorageBackend, get_storage
+
+CATEGORY_PREFIX = "mean_"
+
+
+class HarmfulCategoryLookup:
+    """
+    id → 유해성이 감지된 카테고리 이름 목록을 메모리에 들고 있는 조회 테이블.
+
+    저장소의 id별 평균 집계로 한 번에 만들고, 이후 조회는 dict 조회입니다.
+    저장소의 data_version(파일 크기·수정 시각)이 바뀌면 다음 조회 때 다시 만듭니다.
+    """
+
+    def __init__(self, table: str, storage: Optional[StorageBackend] = None):
+        self.table = table
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple] = None
+        self._categories: Dict[int, Tuple[str, ...]] = {}
+
+    def _backend(self) -> StorageBackend:
+        return self.storage or get_storage()
+
+    def _refresh(self) -> Dict[int, Tuple[str, ...]]:
+        backend = self._backend()
+        version = (id(backend), backend.data_version(self.table))
+        with self._lock:
+            if version != self._version:
+                self._categories = self._build(backend) if version[1] is not None else {}
+                self._version = version
+            return self._categories
+
+    def _build(self, backend: StorageBackend) -> Dict[int, Tuple[str, ...]]:
+        table = backend.harmfulness_table(self.table, ("id",))
+        names = [f"{CATEGORY_PREFIX}{col}" for col in HARM_COLUMNS]
+        categories = {}
+        # *_harmfulness_by_id.csv 와 같이 소수점 4자리 평균 기준으로 0보다 큰 컬럼만 남김 (NaN 은 제외)
+        for user_id, values in zip(table["id"].tolist(), table[HARM_COLUMNS].to_numpy().tolist()):
+            categories[user_id] = tuple(name for name, val in zip(names, values) if round(val, 4) > 0)
+        return categories
+
+    def get(self, target_id: int) -> List[str]:
+        return list(self._refresh().get(target_id, ()))
+
+    def get_many(self, target_ids: Iterable[int]) -> Dict[int, List[str]]:
+        categories = self._refresh()
+        return {target_id: list(categories.get(target_id, ())) for target_id in target_ids}
+
+
+_lookups: Dict[str, HarmfulCategoryLookup] = {}
+_lookups_guard = threading.Lock()
+
+
+def get_category_lookup(table: str) -> HarmfulCategoryLookup:
+    with _lookups_guard:
+        lookup = _lookups.get(table)
+        if lookup is None:
+            lookup = _lookups[table] = HarmfulCategoryLookup(table)
+        return lookup
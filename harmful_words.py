@@ -0,0 +1,243 @@
+import ast
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .csv_tail import SNAPSHOT_EVERY_ROWS, CsvTailFollower
+except ImportError:
+    from csv_tail import SNAPSHOT_EVERY_ROWS, CsvTailFollower
+
+HARMFUL_WORDS_COL = "harmful_words"
+WORDS_SUFFIX = ".words.npz"
+SNAPSHOT_VERSION = 1
+
+
+@lru_cache(maxsize=65536)
+def _parse_text(text: str) -> Tuple[str, ...]:
+    text = text.strip()
+    if not text:
+        return ()
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        # 리터럴이 아닌 값(예: API 로 들어온 "단어1, 단어2")은 쉼표로 나눔
+        value = text.strip("[]").split(",")
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    words = (str(w).strip().strip("'\"").strip() for w in value)
+    return tuple(w for w in words if w)
+
+
+def parse_harmful_words(value) -> Tuple[str, ...]:
+    """
+    harmful_words 값(예: "['짱깨들', '사라졌으면 좋겠다']")을 단어 튜플로 파싱합니다.
+    파이썬 리스트 리터럴은 ast.literal_eval 로, 그 밖의 문자열은 쉼표로 나눕니다.
+    NaN/None/빈 리스트는 빈 튜플입니다. 같은 문자열은 캐시된 결과를 돌려줍니다.
+    """
+    if not isinstance(value, str):
+        return ()
+    return _parse_text(value)
+
+
+class WordTable:
+    """
+    행 번호(row_ids) · 사용자 id(user_ids) · 단어 id(word_ids) 로 펼친 유해 단어 테이블과 단어 사전(vocab).
+    행 번호는 CSV 데이터 행 순서(0부터, pd.read_csv 의 기본 index 와 같음)이며, 한 행 안의 단어 순서를 유지합니다.
+    """
+
+    def __init__(self, vocab: List[str], row_ids: np.ndarray, user_ids: np.ndarray, word_ids: np.ndarray):
+        self.vocab = vocab
+        self.row_ids = row_ids
+        self.user_ids = user_ids
+        self.word_ids = word_ids
+
+    def limit_rows(self, n_rows: int) -> "WordTable":
+        """앞쪽 n_rows 개 행만 남깁니다(DataFrame 을 읽은 뒤 추가된 행 제외)."""
+        keep = self.row_ids < n_rows
+        return WordTable(self.vocab, self.row_ids[keep], self.user_ids[keep], self.word_ids[keep])
+
+    def words_by_row(self) -> Dict[int, List[str]]:
+        """{행 번호: [단어, ...]}. 단어가 없는 행은 포함하지 않습니다."""
+        out: Dict[int, List[str]] = {}
+        vocab = self.vocab
+        for row, word in zip(self.row_ids.tolist(), self.word_ids.tolist()):
+            out.setdefault(row, []).append(vocab[word])
+        return out
+
+    def top_words_by_user(self, n: int) -> Dict[int, List[dict]]:
+        """
+        사용자별 가장 많이 쓴 단어 n개 [{"word", "count"}]. 전체 사용자를 정수 group-count 한 번으로 계산합니다.
+        횟수가 같으면 먼저 나온 단어가 앞에 옵니다.
+        """
+        if not len(self.word_ids):
+            return {}
+        width = max(len(self.vocab), 1)
+        keys = self.user_ids * width + self.word_ids
+        uniq, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        users = uniq // width
+        order = np.lexsort((first, -counts, users))
+        users, words, counts = users[order], (uniq % width)[order], counts[order]
+        starts = np.r_[0, np.flatnonzero(users[1:] != users[:-1]) + 1]
+        rank = np.arange(len(users)) - np.repeat(starts, np.diff(np.r_[starts, len(users)]))
+        keep = rank < n
+
+        out: Dict[int, List[dict]] = {}
+        vocab = self.vocab
+        for user, word, count in zip(users[keep].tolist(), words[keep].tolist(), counts[keep].tolist()):
+            out.setdefault(user, []).append({"word": vocab[word], "count": count})
+        return out
+
+    def word_counts(self, user_id: Optional[int] = None) -> Dict[str, int]:
+        """단어별 사용 횟수(먼저 나온 순서). user_id 를 주면 그 사용자만."""
+        words = self.word_ids if user_id is None else self.word_ids[self.user_ids == user_id]
+        uniq, first, counts = np.unique(words, return_index=True, return_counts=True)
+        order = np.argsort(first, kind="stable")
+        return {self.vocab[w]: c for w, c in zip(uniq[order].tolist(), counts[order].tolist())}
+
+
+class WordTableBuilder:
+    """DataFrame 청크를 받아 단어를 정수 id 로 interning 하며 WordTable 을 쌓습니다."""
+
+    def __init__(self, vocab: Optional[List[str]] = None):
+        self.vocab: List[str] = list(vocab or [])
+        self.word_index: Dict[str, int] = {w: i for i, w in enumerate(self.vocab)}
+        self.n_rows = 0
+        self._parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def _intern(self, word: str) -> int:
+        word_id = self.word_index.get(word)
+        if word_id is None:
+            word_id = self.word_index[word] = len(self.vocab)
+            self.vocab.append(word)
+        return word_id
+
+    def add_arrays(self, row_ids: np.ndarray, user_ids: np.ndarray, word_ids: np.ndarray):
+        self._parts.append((row_ids, user_ids, word_ids))
+
+    def add_frame(self, chunk: pd.DataFrame):
+        """청크의 행은 n_rows 번부터 번호가 매겨집니다. 문자열 값마다 한 번만 파싱합니다."""
+        n = len(chunk)
+        if n and HARMFUL_WORDS_COL in chunk.columns:
+            codes, uniques = pd.factorize(chunk[HARMFUL_WORDS_COL])
+            parsed = [[self._intern(w) for w in parse_harmful_words(u)] for u in uniques]
+            lengths = np.array([len(p) for p in parsed] + [0], dtype=np.int64)  # code -1(NaN) → 0
+            flat = np.array([w for p in parsed for w in p], dtype=np.int64)
+            offsets = np.r_[0, np.cumsum(lengths[:-1])]
+
+            if "id" in chunk.columns:
+                ids = pd.to_numeric(chunk["id"], errors="coerce").to_numpy(dtype=np.float64)
+            else:
+                ids = np.full(n, -1.0)
+            row_lengths = lengths[codes]
+            row_lengths[np.isnan(ids)] = 0
+            total = int(row_lengths.sum())
+            if total:
+                row_starts = np.cumsum(row_lengths) - row_lengths
+                within = np.arange(total) - np.repeat(row_starts, row_lengths)
+                self._parts.append((
+                    np.repeat(np.arange(self.n_rows, self.n_rows + n, dtype=np.int64), row_lengths),
+                    np.repeat(ids, row_lengths).astype(np.int64),
+                    flat[np.repeat(offsets[codes], row_lengths) + within],
+                ))
+        self.n_rows += n
+
+    def table(self) -> WordTable:
+        if len(self._parts) != 1:
+            parts = self._parts or [(np.empty(0, np.int64),) * 3]
+            self._parts = [tuple(np.concatenate(cols) for cols in zip(*parts))]
+        rows, users, words = self._parts[0]
+        return WordTable(self.vocab, rows, users, words)
+
+
+def has_harmful_words(values: pd.Series) -> pd.Series:
+    """파싱한 유해 단어가 하나 이상 있는 행이면 True ("[]"·빈 값은 False)."""
+    return values.map(parse_harmful_words).map(bool).astype(bool)
+
+
+def word_table_from_frame(df: pd.DataFrame) -> WordTable:
+    """메모리에 있는 DataFrame 으로 WordTable 을 만듭니다(행 번호 = 위치 순서)."""
+    builder = WordTableBuilder()
+    builder.add_frame(df)
+    return builder.table()
+
+
+class HarmfulWordIndex(CsvTailFollower):
+    """
+    chat_db.csv 의 harmful_words 를 미리 파싱해 둔 사이드카 색인(``<csv>.words.npz``).
+
+    처음 한 번 전체를 파싱해 (행 번호, 사용자 id, 단어 id) 배열과 단어 사전을 만들고,
+    이후에는 CSV 끝에 추가된 행만 읽어 이어 붙입니다. 파일이 다시 쓰이면 새로 만듭니다.
+    """
+
+    rebuild_message = "유해 단어 색인을 다시 만듭니다"
+
+    def __init__(self, csv_path: str):
+        super().__init__(csv_path, csv_path + WORDS_SUFFIX)
+
+    def _reset_data(self):
+        self.builder = WordTableBuilder()
+
+    def _update(self, chunk: pd.DataFrame):
+        self.builder.add_frame(chunk)
+
+    def _snapshot_due(self) -> bool:
+        # 스냅샷은 전체 배열을 다시 쓰므로 색인 크기에 비례해 간격을 늘림
+        return self._unsaved_rows >= max(SNAPSHOT_EVERY_ROWS, self.builder.n_rows // 10)
+
+    def table(self) -> WordTable:
+        with self._lock:
+            self.refresh()
+            return self.builder.table()
+
+    # --- Persistence ---
+    def _write_snapshot(self, path: str):
+        table = self.builder.table()
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            **self._position_state(),
+            "n_rows": self.builder.n_rows,
+            "vocab": table.vocab,
+        }
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+                row_ids=table.row_ids, user_ids=table.user_ids, word_ids=table.word_ids,
+            )
+
+    def _read_snapshot(self) -> bool:
+        if not os.path.isfile(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                arrays = data["row_ids"], data["user_ids"], data["word_ids"]
+        except (OSError, ValueError, KeyError):
+            return False
+        if meta.get("version") != SNAPSHOT_VERSION:
+            return False
+        self.builder = WordTableBuilder(meta["vocab"])
+        self.builder.n_rows = meta["n_rows"]
+        self.builder.add_arrays(*arrays)
+        self._restore_position(meta)
+        return True
+
+
+_indexes: Dict[str, HarmfulWordIndex] = {}
+_indexes_guard = threading.Lock()
+
+
+def get_word_index(csv_path: str) -> HarmfulWordIndex:
+    with _indexes_guard:
+        index = _indexes.get(csv_path)
+        if index is None:
+            index = _indexes[csv_path] = HarmfulWordIndex(csv_path)
+        return index
@@ -0,0 +1,93 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .csv_tail import CsvTailFollower
+    from .running_aggregates import RunningMeanAggregator
+    from .storage import HARM_COLUMNS
+except ImportError:
+    from csv_tail import CsvTailFollower
+    from running_aggregates import RunningMeanAggregator
+    from storage import HARM_COLUMNS
+
+SNAPSHOT_SUFFIX = ".agg.json"
+SNAPSHOT_VERSION = 1
+
+
+class CsvHarmfulnessAggregates(CsvTailFollower):
+    """
+    Materialized per-key running sums and counts of the six harm categories for one CSV.
+
+    Each key set (e.g. ["id"] or ["id", "site"]) is a RunningMeanAggregator, so the means
+    equal a full groupby().mean() over the file. The aggregates cover the CSV up to
+    ``covered_end``; rows appended by any writer are folded in by reading only the new
+    tail, so an append costs O(rows appended). State is persisted to ``<csv>.agg.json``
+    and rebuilt from the CSV if the snapshot is missing or the file was rewritten.
+    """
+
+    rebuild_message = "유해성 집계를 다시 계산합니다"
+
+    def __init__(self, csv_path: str, key_sets: List[List[str]]):
+        self.key_sets = key_sets
+        super().__init__(csv_path, csv_path + SNAPSHOT_SUFFIX)
+
+    def _reset_data(self):
+        self.aggregators = {tuple(keys): RunningMeanAggregator(list(keys)) for keys in self.key_sets}
+
+    # --- Queries ---
+    def means(self, key_columns: Tuple[str, ...], key: Tuple) -> Optional[Dict[str, float]]:
+        with self._lock:
+            self.refresh()
+            return self.aggregators[key_columns].means(key)
+
+    def table(self, key_columns: Tuple[str, ...]) -> pd.DataFrame:
+        with self._lock:
+            self.refresh()
+            return self.aggregators[key_columns].result()
+
+    # --- Maintenance ---
+    def _update(self, chunk: pd.DataFrame):
+        if "id" not in chunk.columns:
+            return
+        chunk = chunk.copy()
+        chunk["id"] = pd.to_numeric(chunk["id"], errors="coerce")
+        chunk = chunk.dropna(subset=["id"])
+        chunk["id"] = chunk["id"].astype("int64")
+        for col in HARM_COLUMNS:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce") if col in chunk.columns else float("nan")
+        for keys, aggregator in self.aggregators.items():
+            if all(k in chunk.columns for k in keys):
+                aggregator.update(chunk)
+
+    # --- Persistence ---
+    def _write_snapshot(self, path: str):
+        state = {
+            "version": SNAPSHOT_VERSION,
+            **self._position_state(),
+            "aggregates": [agg.to_state() for agg in self.aggregators.values()],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def _read_snapshot(self) -> bool:
+        if not os.path.isfile(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("version") != SNAPSHOT_VERSION:
+            return False
+        aggregators = {}
+        for agg_state in state["aggregates"]:
+            agg = RunningMeanAggregator.from_state(agg_state)
+            aggregators[tuple(agg.key_columns)] = agg
+        if set(aggregators) != set(self.aggregators):
+            return False
+        self.aggregators = aggregators
+        self._restore_position(state)
+        return True
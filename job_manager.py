@@ -0,0 +1,146 @@
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# --- Job States ---
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, user_id: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.status = QUEUED
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "user_id": self.user_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    In-process background job engine.
+
+    Jobs run on a bounded thread pool so blocking work (CSV reads, OpenAI calls)
+    never runs on the event loop. A user with a job that has not started yet is
+    not queued twice: the queued job reads the latest data when it starts.
+    """
+
+    def __init__(self, max_workers: int = 4, max_jobs: int = 1000):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kitty-job")
+        self._max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._latest_job: Dict[int, str] = {}
+        # Tracked apart from _latest_job, which start() also updates
+        self._queued_job: Dict[int, str] = {}
+        # Latest successful job per user, least recently updated first; capped at max_jobs users
+        self._latest_success: "OrderedDict[int, Job]" = OrderedDict()
+
+    def submit(self, user_id: int, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        with self._lock:
+            queued_id = self._queued_job.get(user_id)
+            queued = self._jobs.get(queued_id) if queued_id else None
+            if queued is not None and queued.status == QUEUED:
+                return queued
+
+            job = Job(user_id)
+            self._jobs[job.id] = job
+            self._latest_job[user_id] = job.id
+            self._queued_job[user_id] = job.id
+            self._evict()
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def start(self, user_id: int) -> Job:
+        """
+        Registers a job the caller runs itself (e.g. a streamed report) as running.
+        The caller must end it with complete() or fail().
+        """
+        job = Job(user_id)
+        job.status = RUNNING
+        job.started_at = time.time()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._latest_job[user_id] = job.id
+            self._evict()
+        return job
+
+    def complete(self, job: Job, result: Any):
+        with self._lock:
+            job.status = SUCCEEDED
+            job.result = result
+            job.finished_at = time.time()
+            self._latest_success[job.user_id] = job
+            self._latest_success.move_to_end(job.user_id)
+            while len(self._latest_success) > self._max_jobs:
+                self._latest_success.popitem(last=False)
+
+    def fail(self, job: Job, error: str):
+        with self._lock:
+            job.status = FAILED
+            job.error = error
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for_user(self, user_id: int) -> Optional[Job]:
+        with self._lock:
+            job_id = self._latest_job.get(user_id)
+            return self._jobs.get(job_id) if job_id else None
+
+    def latest_success_for_user(self, user_id: int) -> Optional[Job]:
+        with self._lock:
+            return self._latest_success.get(user_id)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        with self._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+            if self._queued_job.get(job.user_id) == job.id:
+                del self._queued_job[job.user_id]
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            print(f"[ERROR] Job {job.id} for user {job.user_id} failed: {e}")
+            traceback.print_exc()
+            self.fail(job, str(e))
+            return
+
+        self.complete(job, result)
+
+    def _evict(self):
+        # Drop the oldest finished jobs once the table is full; in-flight jobs are kept.
+        if len(self._jobs) <= self._max_jobs:
+            return
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self._max_jobs:
+                break
+            if self._jobs[job_id].status in (SUCCEEDED, FAILED):
+                del self._jobs[job_id]
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# openai(기본) | fake
+BACKEND_NAME = os.getenv("KITTY_LLM_BACKEND", "openai")
+
+
+class Completion:
+    """응답 본문 (스트리밍이면 한 조각)과 총 토큰 수. 스트리밍에서는 마지막 조각에만 total_tokens 가 있음."""
+
+    def __init__(self, content: str, total_tokens: Optional[int] = None):
+        self.content = content
+        self.total_tokens = total_tokens
+
+
+class LLMBackend:
+    """
+    chat.completions 한 번을 보내는 인터페이스. 재시도 · 속도 제한 · 캐시는 LLMGateway 가 맡습니다.
+
+    stream() 은 요청을 보낸 뒤(오류는 이때 발생) 조각을 돌려줄 iterator 를 반환합니다.
+    """
+
+    name = "base"
+
+    def complete(self, model: str, messages: List[dict], temperature: float, max_tokens: int) -> Completion:
+        raise NotImplementedError
+
+    def stream(self, model: str, messages: List[dict], temperature: float, max_tokens: int) -> Iterator[Completion]:
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    # 작업 스레드에서도 잡을 수 있도록 sys.exit 대신 예외
+                    raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다. (API 없이 실행하려면 KITTY_LLM_BACKEND=fake)")
+                from openai import OpenAI
+                # 재시도는 RateLimiter 가 맡으므로 SDK 자체 재시도는 끔
+                self._client = OpenAI(api_key=api_key, max_retries=0)
+            return self._client
+
+    def complete(self, model, messages, temperature, max_tokens) -> Completion:
+        resp = self.client.chat.completions.create(model=model, messages=messages,
+                                                   temperature=temperature, max_tokens=max_tokens)
+        usage = getattr(resp, "usage", None)
+        return Completion(resp.choices[0].message.content or "", getattr(usage, "total_tokens", None))
+
+    def stream(self, model, messages, temperature, max_tokens) -> Iterator[Completion]:
+        chunks = self.client.chat.completions.create(model=model, messages=messages, temperature=temperature,
+                                                     max_tokens=max_tokens, stream=True,
+                                                     stream_options={"include_usage": True})
+
+        def pieces():
+            for chunk in chunks:
+                usage = getattr(chunk, "usage", None)
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content or usage is not None:
+                    yield Completion(content or "", getattr(usage, "total_tokens", None))
+
+        return pieces()
+
+
+# ─── 로컬 가짜 백엔드 (오프라인 벤치마크 · 부하 테스트용) ────────────────────────
+
+FAKE_LATENCY_MS = float(os.getenv("KITTY_FAKE_LATENCY_MS", "300"))
+# fixed | uniform (0 ~ 2배) | lognormal (중앙값 = FAKE_LATENCY_MS)
+FAKE_LATENCY_DIST = os.getenv("KITTY_FAKE_LATENCY_DIST", "lognormal")
+FAKE_LATENCY_SIGMA = float(os.getenv("KITTY_FAKE_LATENCY_SIGMA", "0.5"))
+FAKE_ERROR_RATE = float(os.getenv("KITTY_FAKE_ERROR_RATE", "0"))
+FAKE_ERROR_STATUS = int(os.getenv("KITTY_FAKE_ERROR_STATUS", "429"))
+FAKE_COMPLETION_TOKENS = int(os.getenv("KITTY_FAKE_TOKENS", "200"))
+FAKE_SEED = os.getenv("KITTY_FAKE_SEED", "0")
+
+_PACKED_ITEM = re.compile(r"^\[(\d+)\] ", re.MULTILINE)
+
+
+class FakeAPIError(Exception):
+    """FakeBackend 가 일부러 내는 오류. status_code 로 재시도 여부가 정해집니다 (429 · 5xx 는 재시도)."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"fake backend error {status_code}")
+        self.status_code = status_code
+
+
+class FakeBackend(LLMBackend):
+    """
+    네트워크 없이 chat.completions 를 흉내 내는 백엔드.
+
+    지연 시간 분포 · 오류 비율 · 응답 토큰 수를 설정할 수 있고, 프롬프트 종류에 맞춰
+    퀴즈({reason, quiz}, 묶음이면 id 가 붙은 배열) · 리포트({summary, advice}) JSON 이나
+    Markdown 보고서를 돌려줍니다. 난수는 (seed, 메시지, 같은 메시지의 호출 순번) 으로 정해지므로
+    같은 입력 순서면 지연 · 오류가 매번 같게 재현됩니다.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = FAKE_LATENCY_MS, latency_dist: str = FAKE_LATENCY_DIST,
+                 latency_sigma: float = FAKE_LATENCY_SIGMA, error_rate: float = FAKE_ERROR_RATE,
+                 error_status: int = FAKE_ERROR_STATUS, completion_tokens: int = FAKE_COMPLETION_TOKENS,
+                 seed: str = FAKE_SEED):
+        if latency_dist not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency_dist}")
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.completion_tokens = completion_tokens
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+
+    def _rng(self, messages: List[dict]) -> random.Random:
+        digest = hashlib.sha256(json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def _latency(self, rng: random.Random) -> float:
+        base = self.latency_ms / 1000
+        if self.latency_dist == "fixed":
+            return base
+        if self.latency_dist == "uniform":
+            return rng.uniform(0, 2 * base)
+        return base * math.exp(rng.gauss(0, self.latency_sigma))
+
+    def _tokens(self, messages: List[dict], content: str, max_tokens: int) -> int:
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+        return prompt_chars // 2 + min(max_tokens, max(self.completion_tokens, len(content) // 2))
+
+    def _content(self, messages: List[dict]) -> str:
+        prompt = str(messages[-1].get("content", ""))
+        filler = "가" * max(0, self.completion_tokens - 20)
+        if "reason:" in prompt and "quiz:" in prompt:
+            ids = _PACKED_ITEM.findall(prompt)
+            quiz = {"reason": f"가짜 설명입니다. {filler}", "quiz": "1) 가짜 퀴즈 문항입니다. 정답: 1"}
+            if ids:
+                return json.dumps([{"id": int(i), **quiz} for i in ids], ensure_ascii=False)
+            return json.dumps(quiz, ensure_ascii=False)
+        if "summary:" in prompt and "advice:" in prompt:
+            return json.dumps({"summary": f"가짜 요약입니다. {filler}", "advice": "가짜 조언입니다."},
+                              ensure_ascii=False)
+        return f"## 가짜 보고서\n\n{filler}"
+
+    def _start(self, messages: List[dict], max_tokens: int):
+        """오류 여부와 지연 시간을 정하고, 응답과 총 토큰 수를 반환."""
+        rng = self._rng(messages)
+        latency = self._latency(rng)
+        if rng.random() < self.error_rate:
+            time.sleep(latency * 0.1)
+            raise FakeAPIError(self.error_status)
+        content = self._content(messages)
+        return latency, content, self._tokens(messages, content, max_tokens)
+
+    def complete(self, model, messages, temperature, max_tokens) -> Completion:
+        latency, content, tokens = self._start(messages, max_tokens)
+        time.sleep(latency)
+        return Completion(content, tokens)
+
+    def stream(self, model, messages, temperature, max_tokens) -> Iterator[Completion]:
+        latency, content, tokens = self._start(messages, max_tokens)
+        # 첫 조각까지 지연의 20%, 나머지는 조각마다 나눠서
+        time.sleep(latency * 0.2)
+        size = 16
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+
+        def chunks():
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(latency * 0.8 / len(pieces))
+                yield Completion(piece, tokens if i == len(pieces) - 1 else None)
+
+        return chunks()
+
+
+def create_backend(name: str = BACKEND_NAME) -> LLMBackend:
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"Unknown LLM backend: {name} (expected 'openai' or 'fake')")
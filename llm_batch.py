@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+llm_batch.py
+
+대량 리포트 생성을 위한 오프라인 배치 파일 도구 (chat-completions batch JSONL 형식).
+
+1단계: 각 CLI 가 프롬프트를 요청 파일로 저장
+    python chat_report.py --batch-requests chat_requests.jsonl
+2단계: 공급자 batch API (또는 아래 로컬 stub) 로 결과 파일을 만든 뒤 리포트에 반영
+    python llm_batch.py stub chat_requests.jsonl chat_results.jsonl
+    python chat_report.py --batch-results chat_results.jsonl
+
+stub 은 기본적으로 API 를 호출하지 않고 고정된 응답을 만들며, --live 를 주면 요청마다 gateway 로 실제 호출합니다.
+"""
+
+import argparse
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Union
+
+try:
+    from .quiz_config import MODEL_NAME
+except ImportError:
+    from quiz_config import MODEL_NAME
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def batch_request(custom_id: str, prompt: Union[str, List[dict]], model: str = MODEL_NAME,
+                  temperature: float = 0.7, max_tokens: int = 500) -> dict:
+    """요청 파일의 한 줄. custom_id 는 파일 안에서 유일해야 합니다."""
+    messages = [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+    }
+
+
+def _write_jsonl(path: str, rows: Iterable[dict]) -> int:
+    count = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_batch_requests(path: str, requests: Iterable[dict]) -> int:
+    count = _write_jsonl(path, requests)
+    print(f"[INFO] 배치 요청 {count}건을 '{path}'에 저장했습니다.")
+    return count
+
+
+def read_batch_results(path: str) -> Dict[str, str]:
+    """결과 파일 → {custom_id: 응답 본문}. 실패한 요청은 [WARN] 을 남기고 빠집니다."""
+    results = {}
+    for row in _read_jsonl(path):
+        custom_id = row.get("custom_id")
+        response = row.get("response") or {}
+        if row.get("error") or response.get("status_code") != 200:
+            print(f"[WARN] 배치 요청 '{custom_id}' 실패: {row.get('error') or response.get('status_code')}")
+            continue
+        choices = response.get("body", {}).get("choices") or [{}]
+        results[custom_id] = choices[0].get("message", {}).get("content") or ""
+    return results
+
+
+def apply_batch_results(entries: List[dict], results: Dict[str, str], field: str,
+                        custom_id: Callable[[object], str]) -> int:
+    """entries 의 각 사용자(user_id)에 해당하는 결과를 field 에 채웁니다. 채운 개수를 반환."""
+    filled = 0
+    for entry in entries:
+        content = results.get(custom_id(entry["user_id"]))
+        if content is None:
+            print(f"[ERROR] 사용자 {entry['user_id']} 의 배치 결과가 없습니다.")
+            continue
+        entry[field] = content.strip()
+        filled += 1
+    return filled
+
+
+def _result_row(index: int, request: dict, content: str) -> dict:
+    return {
+        "id": f"batch_req_{index}",
+        "custom_id": request["custom_id"],
+        "response": {
+            "status_code": 200,
+            "request_id": f"stub-{index}",
+            "body": {
+                "object": "chat.completion",
+                "model": request["body"]["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+            },
+        },
+        "error": None,
+    }
+
+
+def run_stub(requests_path: str, results_path: str, live: bool = False) -> int:
+    """요청 파일을 결과 파일로 바꿉니다. live=False 면 API 를 호출하지 않는 고정 응답."""
+    requests = _read_jsonl(requests_path)
+    if live:
+        try:
+            from .llm_gateway import get_gateway
+        except ImportError:
+            from llm_gateway import get_gateway
+        gateway = get_gateway()
+
+    def respond(request: dict) -> str:
+        body = request["body"]
+        if live:
+            return gateway.complete(body["messages"], model=body["model"],
+                                    temperature=body.get("temperature", 0.7), max_tokens=body.get("max_tokens", 500))
+        return f"[stub] {request['custom_id']} 에 대한 보고서"
+
+    count = _write_jsonl(results_path, (_result_row(i, req, respond(req)) for i, req in enumerate(requests)))
+    print(f"[INFO] 배치 결과 {count}건을 '{results_path}'에 저장했습니다.")
+    return count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="배치 요청 파일 → 결과 파일 (로컬 stub)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stub = sub.add_parser("stub", help="요청 JSONL 로부터 결과 JSONL 생성")
+    stub.add_argument("requests", help="요청 JSONL 경로")
+    stub.add_argument("results", help="결과 JSONL 경로")
+    stub.add_argument("--live", action="store_true", help="고정 응답 대신 gateway 로 실제 호출")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "stub":
+        run_stub(args.requests, args.results, live=args.live)
+
+
+if __name__ == "__main__":
+    main()
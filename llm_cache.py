@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+CACHE_PATH = os.getenv("KITTY_LLM_CACHE_PATH", "llm_cache.db")
+CACHE_MAX_BYTES = int(float(os.getenv("KITTY_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# 0 이면 만료 없음
+CACHE_TTL_SECONDS = float(os.getenv("KITTY_LLM_CACHE_TTL", "0"))
+# 조회 때마다 쓰지 않도록, 마지막 사용 시각은 이 간격보다 오래됐을 때만 갱신 (LRU 정밀도)
+TOUCH_INTERVAL_SECONDS = 60.0
+# 전체 크기(SUM) 확인은 이 횟수의 put 마다 한 번
+EVICT_CHECK_EVERY = 64
+
+
+def cache_key(model: str, messages: list, params: dict) -> str:
+    """model · messages · 생성 파라미터로 만든 내용 기반 키(sha256)."""
+    payload = json.dumps({"model": model, "messages": messages, "params": params},
+                         sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LLM 응답을 디스크(SQLite)에 저장하는 캐시.
+
+    전체 크기가 max_bytes 를 넘으면 가장 오래 사용되지 않은 항목부터 지우고(LRU),
+    ttl_seconds 가 있으면 그보다 오래된 항목은 없는 것으로 봅니다.
+    여러 프로세스가 같은 파일을 함께 써도 됩니다.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES,
+                 ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._write_lock, self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT response, created, accessed FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+            with self._write_lock:
+                self.misses += 1
+            return None
+        with self._write_lock:
+            self.hits += 1
+            if now - row[2] > TOUCH_INTERVAL_SECONDS:
+                with self._conn() as conn:
+                    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, response: dict):
+        data = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._write_lock, self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, data, now, now, len(data.encode("utf-8"))),
+            )
+            self._puts += 1
+            if self._puts % EVICT_CHECK_EVERY == 1:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        if self.ttl_seconds:
+            cur = conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+            self.evictions += cur.rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 한 번에 여유(10%)를 두고 지워서 매 put 마다 정리하지 않게 함
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        with self._write_lock, self._conn() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": entries, "bytes": size}
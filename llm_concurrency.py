@@ -0,0 +1,48 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+DEFAULT_CONCURRENCY = 1
+
+
+def run_concurrently(fn: Callable[..., Any], arg_list: Sequence[tuple], concurrency: int = DEFAULT_CONCURRENCY,
+                     on_done: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+    """
+    arg_list 의 각 항목에 대해 fn(*args) 를 실행하고, 결과를 입력 순서대로 반환합니다.
+
+    실패한 항목은 그 자리에 예외 객체가 들어가고 나머지 항목은 계속 실행됩니다.
+    concurrency <= 1 이면 하나씩 순서대로, 그보다 크면 asyncio 이벤트 루프에서 최대
+    concurrency 개의 호출을 동시에 실행합니다(네트워크 대기 시간이 겹치도록).
+    on_done(index, result) 는 항목이 끝날 때마다 완료 순서대로 호출됩니다.
+    """
+    if concurrency <= 1 or len(arg_list) <= 1:
+        results = []
+        for index, args in enumerate(arg_list):
+            results.append(_call(fn, args))
+            if on_done:
+                on_done(index, results[-1])
+        return results
+    return asyncio.run(_run_async(fn, arg_list, concurrency, on_done))
+
+
+def _call(fn: Callable[..., Any], args: tuple) -> Any:
+    try:
+        return fn(*args)
+    except Exception as e:
+        return e
+
+
+async def _run_async(fn, arg_list, concurrency, on_done) -> List[Any]:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    # 기본 executor 는 스레드 수가 CPU 개수에 묶이므로 동시 실행 수만큼 따로 만듦
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm") as executor:
+
+        async def run_one(index: int, args: tuple) -> Any:
+            async with semaphore:
+                result = await loop.run_in_executor(executor, _call, fn, args)
+            if on_done:
+                on_done(index, result)
+            return result
+
+        return await asyncio.gather(*(run_one(i, args) for i, args in enumerate(arg_list)))
@@ -0,0 +1,145 @@
+import os
+import threading
+from typing import Iterator, List, Optional, Union
+
+try:
+    from .llm_backend import LLMBackend, create_backend
+    from .llm_cache import ResponseCache, cache_key
+    from .metrics import LLM_CACHE_HITS, LLM_CALLS, LLM_REQUEST_SECONDS, LLM_TOKENS
+    from .llm_rate_limit import RateLimiter, estimate_tokens, get_rate_limiter
+    from .quiz_config import MODEL_NAME
+except ImportError:
+    from llm_backend import LLMBackend, create_backend
+    from llm_cache import ResponseCache, cache_key
+    from metrics import LLM_CACHE_HITS, LLM_CALLS, LLM_REQUEST_SECONDS, LLM_TOKENS
+    from llm_rate_limit import RateLimiter, estimate_tokens, get_rate_limiter
+    from quiz_config import MODEL_NAME
+
+# KITTY_LLM_CACHE=0 이면 캐시를 건너뛰고 항상 API 를 호출
+CACHE_ENABLED = os.getenv("KITTY_LLM_CACHE", "1") != "0"
+
+
+class LLMGateway:
+    """
+    모든 chat.completions 호출이 지나가는 공용 창구.
+
+    (model, messages, 생성 파라미터) 의 해시를 키로 응답을 디스크 캐시(ResponseCache)에 저장해,
+    같은 프롬프트를 다시 보내면 API 를 호출하지 않고 저장된 응답을 돌려줍니다.
+    캐시에 없는 호출은 공용 RateLimiter 를 거쳐 RPM/TPM 할당량 안에서 보내고, 429 · 일시적인 오류는 재시도합니다.
+    실제 호출은 LLMBackend(KITTY_LLM_BACKEND: openai | fake)가 보냅니다. fake 백엔드는 기본으로 캐시를 쓰지 않습니다.
+    캐시 파일은 처음 필요할 때 만듭니다.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, use_cache: Optional[bool] = None,
+                 limiter: Optional[RateLimiter] = None, backend: Optional[LLMBackend] = None):
+        self.backend = backend or create_backend()
+        if use_cache is None:
+            use_cache = CACHE_ENABLED and self.backend.name == "openai"
+        self.use_cache = use_cache
+        self._cache = cache
+        self.limiter = limiter or get_rate_limiter()
+        self._init_lock = threading.Lock()
+        self.calls = 0
+
+    @property
+    def cache(self) -> ResponseCache:
+        with self._init_lock:
+            if self._cache is None:
+                self._cache = ResponseCache()
+            return self._cache
+
+    def _prepare(self, prompt: Union[str, List[dict]], model: str, temperature: float, max_tokens: int,
+                 use_cache: Optional[bool]):
+        messages = [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+        params = {"temperature": temperature, "max_tokens": max_tokens}
+        if use_cache is None:
+            use_cache = self.use_cache
+        key = cache_key(model, messages, params) if use_cache else None
+        return messages, params, key
+
+    def _send(self, send, model: str, messages: List[dict], params: dict):
+        with self._init_lock:
+            self.calls += 1
+        backend = self.backend.name
+        try:
+            with LLM_REQUEST_SECONDS.time(backend=backend):
+                result = send(model, messages, params["temperature"], params["max_tokens"])
+        except Exception:
+            LLM_CALLS.inc(backend=backend, outcome="error")
+            raise
+        LLM_CALLS.inc(backend=backend, outcome="ok")
+        return result
+
+    def _count_tokens(self, total_tokens: Optional[int]):
+        if total_tokens:
+            LLM_TOKENS.inc(total_tokens, backend=self.backend.name)
+
+    def complete(self, prompt: Union[str, List[dict]], model: str = MODEL_NAME, temperature: float = 0.7,
+                 max_tokens: int = 500, use_cache: Optional[bool] = None) -> str:
+        """
+        prompt(문자열이면 user 메시지 하나)에 대한 응답 본문을 반환합니다.
+        use_cache=False 이면 이번 호출만 캐시를 건너뜁니다(응답도 저장하지 않음).
+        """
+        messages, params, key = self._prepare(prompt, model, temperature, max_tokens, use_cache)
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                LLM_CACHE_HITS.inc()
+                return cached["content"]
+
+        resp = self.limiter.call(lambda: self._send(self.backend.complete, model, messages, params),
+                                 estimate_tokens(messages, max_tokens), tokens_used=lambda r: r.total_tokens)
+        self._count_tokens(resp.total_tokens)
+        if key:
+            self.cache.put(key, {"content": resp.content, "total_tokens": resp.total_tokens})
+        return resp.content
+
+    def stream(self, prompt: Union[str, List[dict]], model: str = MODEL_NAME, temperature: float = 0.7,
+               max_tokens: int = 500, use_cache: Optional[bool] = None) -> Iterator[str]:
+        """
+        complete 와 같지만 응답 본문을 생성되는 대로 조각(delta)씩 돌려줍니다.
+        캐시에 있으면 저장된 응답을 한 조각으로, 끝까지 받은 응답은 complete 와 같은 키로 캐시에 저장합니다.
+        재시도는 첫 조각을 받기 전(요청 생성 단계)까지만 합니다.
+        """
+        messages, params, key = self._prepare(prompt, model, temperature, max_tokens, use_cache)
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                LLM_CACHE_HITS.inc()
+                yield cached["content"]
+                return
+
+        estimated = estimate_tokens(messages, max_tokens)
+        chunks = self.limiter.call(lambda: self._send(self.backend.stream, model, messages, params), estimated)
+        parts = []
+        total_tokens = None
+        for chunk in chunks:
+            if chunk.total_tokens is not None:
+                total_tokens = chunk.total_tokens
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        self.limiter.settle(estimated, total_tokens)
+        self._count_tokens(total_tokens)
+        if key:
+            self.cache.put(key, {"content": "".join(parts), "total_tokens": total_tokens})
+
+    def stats(self) -> dict:
+        """API 호출 수(재시도 포함), 재시도 · 대기 시간, 캐시 적중/미적중 수."""
+        stats = {"backend": self.backend.name, "calls": self.calls, "cache_enabled": self.use_cache,
+                 **self.limiter.stats()}
+        if self._cache is not None:
+            stats.update(self._cache.stats())
+        return stats
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -0,0 +1,185 @@
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+try:
+    from .metrics import LLM_RETRIES
+except ImportError:
+    from metrics import LLM_RETRIES
+
+T = TypeVar("T")
+
+# 공급자 할당량(분당 요청 수 / 분당 토큰 수). 0 이면 제한하지 않음
+RPM_LIMIT = float(os.getenv("KITTY_LLM_RPM", "500"))
+TPM_LIMIT = float(os.getenv("KITTY_LLM_TPM", "200000"))
+MAX_ATTEMPTS = int(os.getenv("KITTY_LLM_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+# 한국어 위주 프롬프트 기준의 대략적인 문자/토큰 비율 (응답 후 실제 사용량으로 보정)
+CHARS_PER_TOKEN = 2.0
+
+RETRYABLE_STATUS = {408, 409, 429}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+
+class TokenBucket:
+    """분당 rate_per_minute 만큼 채워지는 토큰 버킷. 용량은 1분 치."""
+
+    def __init__(self, rate_per_minute: float, now: Optional[float] = None):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.level = rate_per_minute
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount 를 꺼낼 수 있을 때까지 남은 시간. 용량보다 큰 요청은 가득 찼을 때 통과."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    모든 LLM 호출이 함께 쓰는 스케줄러.
+
+    요청 수(RPM)와 예상 토큰 수(TPM) 두 개의 토큰 버킷으로 호출 속도를 할당량 안에 맞추고,
+    429 · 5xx · 연결 오류는 Retry-After 를 따르거나 지수 백오프(+지터)로 max_attempts 번까지 재시도합니다.
+    한 호출이 429 를 받으면 그 대기 시간 동안 다른 스레드의 호출도 함께 멈춥니다.
+    clock · sleep 은 테스트에서 가짜 시계로 바꿀 수 있습니다.
+    """
+
+    def __init__(self, rpm: float = RPM_LIMIT, tpm: float = TPM_LIMIT, max_attempts: int = MAX_ATTEMPTS,
+                 backoff_base: float = BACKOFF_BASE_SECONDS, backoff_max: float = BACKOFF_MAX_SECONDS,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.requests = TokenBucket(rpm, clock()) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, clock()) if tpm > 0 else None
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.retries = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self, estimated_tokens: float):
+        """요청 1개와 estimated_tokens 만큼의 할당량이 생길 때까지 기다린 뒤 차감합니다."""
+        while True:
+            with self._lock:
+                now = self.clock()
+                wait = self._paused_until - now
+                if self.requests is not None:
+                    wait = max(wait, self.requests.wait_time(1, now))
+                if self.tokens is not None:
+                    wait = max(wait, self.tokens.wait_time(estimated_tokens, now))
+                if wait <= 0:
+                    if self.requests is not None:
+                        self.requests.take(1)
+                    if self.tokens is not None:
+                        self.tokens.take(estimated_tokens)
+                    return
+                self.waited_seconds += wait
+            self.sleep(wait)
+
+    def settle(self, estimated_tokens: float, actual_tokens: Optional[int]):
+        """응답의 실제 토큰 사용량으로 예상치와의 차이를 보정합니다."""
+        if self.tokens is None or actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Retry-After 가 있으면 그 값, 없으면 base * 2^(attempt-1) 범위의 full jitter."""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def call(self, fn: Callable[[], T], estimated_tokens: float,
+             tokens_used: Callable[[T], Optional[int]] = lambda result: None) -> T:
+        """할당량 안에서 fn 을 호출하고, 일시적인 오류는 재시도합니다. 마지막 오류는 그대로 올립니다."""
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire(estimated_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                with self._lock:
+                    self.retries += 1
+                LLM_RETRIES.inc()
+                if status_code(e) == 429:
+                    self.pause(delay)
+                print(f"[WARN] LLM 호출 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도 "
+                      f"({attempt}/{self.max_attempts})")
+                self.sleep(delay)
+                continue
+            self.settle(estimated_tokens, tokens_used(result))
+            return result
+        raise AssertionError("unreachable")
+
+    def stats(self) -> dict:
+        return {"retries": self.retries, "rate_limit_wait_seconds": round(self.waited_seconds, 3)}
+
+
+def status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS or code >= 500
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """오류 응답의 retry-after-ms / retry-after(초) 헤더. HTTP 날짜 형식은 무시합니다."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
+
+
+def estimate_tokens(messages: list, max_tokens: int) -> float:
+    """프롬프트 길이로 어림한 입력 토큰 + 최대 출력 토큰."""
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars / CHARS_PER_TOKEN + max_tokens
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
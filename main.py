@@ -1,21 +1,48 @@
-from fastapi import FastAPI, HTTPException, Header, Depends, status
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Header, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, ValidationError
 import pandas as pd
 import os
 import re
 import json
-from typing import List, Dict, Optional
+import time
+from typing import Iterator, List, Dict, Optional
 
-from chat_data_manager import append_chat_data, get_user_harmful_chat_count, get_user_harmful_chat_data, ProcessedTextRequest
-from quiz_generator import QuizGenerator
-from chat_statistics import generate_chat_statistics
-from report_generator import ReportGenerator
+try:
+    from .chat_data_manager import append_chat_data, append_chat_data_batch, get_user_harmful_chat_count, get_user_harmful_chat_data, ProcessedTextRequest
+    from .quiz_generator import QuizGenerator
+    from .chat_statistics import generate_chat_statistics
+    from .report_generator import ReportGenerator
+    from .job_manager import JobManager
+    from .quiz_store import QuizStore
+    from . import metrics
+except ImportError:
+    from chat_data_manager import append_chat_data, append_chat_data_batch, get_user_harmful_chat_count, get_user_harmful_chat_data, ProcessedTextRequest
+    from quiz_generator import QuizGenerator
+    from chat_statistics import generate_chat_statistics
+    from report_generator import ReportGenerator
+    from job_manager import JobManager
+    from quiz_store import QuizStore
+    import metrics
 
-app = FastAPI()
+HARMFUL_THRESHOLD = 10
 
 # Initialize generators
 quiz_gen = QuizGenerator()
 report_gen = ReportGenerator()
+quiz_store = QuizStore()
+
+# Background jobs: quiz/report generation runs off the event loop with bounded concurrency
+job_manager = JobManager(max_workers=int(os.getenv("JOB_MAX_WORKERS", "4")))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    job_manager.shutdown(wait=False)
+
+app = FastAPI(lifespan=lifespan)
 
 # --- API Key Authentication ---
 API_KEY = os.getenv("X_API_KEY")
@@ -27,34 +54,209 @@ async def verify_api_key(x_api_key: str = Header(...)):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API Key")
     return x_api_key
 
+# --- Background Work ---
+def log_chat_data(request: ProcessedTextRequest) -> int:
+    append_chat_data(request)
+    return get_user_harmful_chat_count(request.user_id)
+
+def log_chat_data_batch(requests: List[ProcessedTextRequest]) -> Dict[int, int]:
+    append_chat_data_batch(requests)
+    return {user_id: get_user_harmful_chat_count(user_id) for user_id in {r.user_id for r in requests}}
+
+def parse_batch_body(body: bytes) -> List[object]:
+    """
+    Accepts a JSON array or NDJSON (one request object per line).
+    Items that fail to parse are returned as exceptions so they can be reported per item.
+    """
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Request body is not valid UTF-8: {e}")
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        items = None
+    if isinstance(items, list):
+        return items
+    if isinstance(items, dict):
+        return [items]
+
+    items = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            items.append(e)
+    return items
+
+def queue_generation_if_needed(user_id: int, user_harmful_count: int):
+    if user_harmful_count < HARMFUL_THRESHOLD:
+        return None
+    print(f"User {user_id} has accumulated {HARMFUL_THRESHOLD} or more harmful entries. Queueing quiz and report generation.")
+    return job_manager.submit(user_id, generate_quiz_and_report, user_id)
+
+def generate_quiz_and_report(user_id: int) -> dict:
+    user_data = get_user_harmful_chat_data(user_id)
+
+    # Generate quiz only for rows added since the last run, then merge with the stored ones
+    with quiz_store.user_lock(user_id):
+        quiz_state = quiz_store.load(user_id)
+        new_rows = quiz_store.pending_rows(quiz_state, user_data)
+        new_quizzes = quiz_gen.generate_quizzes_from_data(new_rows)
+        quiz_results = quiz_store.advance(user_id, quiz_state, new_rows, new_quizzes)
+
+    # Generate statistics
+    with metrics.CHAT_STATISTICS_SECONDS.time():
+        chat_stats = generate_chat_statistics(user_data)
+
+    # Generate report
+    report_results = report_gen.generate_report(chat_stats)
+
+    return {
+        "quiz_results": quiz_results,
+        "report_results": report_results
+    }
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def load_report_stats(user_id: int) -> Optional[dict]:
+    user_data = get_user_harmful_chat_data(user_id)
+    if user_data.empty:
+        return None
+    with metrics.CHAT_STATISTICS_SECONDS.time():
+        return generate_chat_statistics(user_data)
+
+def stream_report_events(user_id: int, chat_stats: dict) -> Iterator[str]:
+    """
+    Server-sent events for a streamed report: "stats" first, then one "delta" per chunk of
+    model output, then "done" with the parsed report. The finished report is stored as a job
+    result (with the user's stored quizzes), so /users/{user_id}/latest returns it.
+    """
+    job = job_manager.start(user_id)
+    finished = False
+    started = time.perf_counter()
+    try:
+        yield format_sse("stats", {"job_id": job.id, "statistics": chat_stats})
+        parts = []
+        for delta in report_gen.stream_report(chat_stats):
+            parts.append(delta)
+            yield format_sse("delta", {"text": delta})
+        report_results = report_gen.parse_report("".join(parts))
+        metrics.REPORT_GENERATION_SECONDS.observe(time.perf_counter() - started, generator="report_stream")
+        job_manager.complete(job, {
+            "quiz_results": quiz_store.load(user_id)["quizzes"],
+            "report_results": report_results
+        })
+        finished = True
+        yield format_sse("done", {"job_id": job.id, "report_results": report_results})
+    except Exception as e:
+        print(f"[ERROR] Report stream for user {user_id} failed: {e}")
+        job_manager.fail(job, str(e))
+        finished = True
+        yield format_sse("error", {"job_id": job.id, "detail": str(e)})
+    finally:
+        if not finished:
+            job_manager.fail(job, "Client disconnected before the report stream completed.")
+
 # --- API Endpoint ---
 @app.post("/process_chat_data", dependencies=[Depends(verify_api_key)])
 async def process_chat_data(request: ProcessedTextRequest):
-    append_chat_data(request)
-    
-    user_harmful_count = get_user_harmful_chat_count(request.user_id)
-    
+    user_harmful_count = await run_in_threadpool(log_chat_data, request)
+
     response_message = f"Chat data logged for user {request.user_id}. Harmful count: {user_harmful_count}."
-    quiz_results = []
-    report_results = {}
-
-    if user_harmful_count >= 10:
-        print(f"User {request.user_id} has accumulated 10 or more harmful entries. Triggering quiz and report generation.")
-        user_data = get_user_harmful_chat_data(request.user_id)
-        
-        # Generate quiz
-        quiz_results = quiz_gen.generate_quizzes_from_data(user_data)
-        
-        # Generate statistics
-        chat_stats = generate_chat_statistics(user_data)
-        
-        # Generate report
-        report_results = report_gen.generate_report(chat_stats)
-        
-        response_message += " Quiz and report generation triggered."
-        
+    job = queue_generation_if_needed(request.user_id, user_harmful_count)
+    if job is not None:
+        response_message += f" Quiz and report generation queued (job {job.id})."
+
     return {
         "message": response_message,
-        "quiz_results": quiz_results,
-        "report_results": report_results
-    }
\ No newline at end of file
+        "harmful_count": user_harmful_count,
+        "job_id": job.id if job else None,
+        "job_status": job.status if job else None
+    }
+
+@app.post("/process_chat_data/batch", dependencies=[Depends(verify_api_key)])
+async def process_chat_data_batch(request: Request):
+    items = parse_batch_body(await request.body())
+
+    valid_requests = []
+    errors = {}
+    for i, item in enumerate(items):
+        if isinstance(item, Exception):
+            errors[i] = f"Invalid JSON: {item}"
+            continue
+        try:
+            valid_requests.append((i, ProcessedTextRequest(**item)))
+        except (TypeError, ValidationError) as e:
+            errors[i] = str(e)
+
+    # One write for the whole batch, then one threshold check per affected user
+    harmful_counts = {}
+    if valid_requests:
+        harmful_counts = await run_in_threadpool(log_chat_data_batch, [r for _, r in valid_requests])
+    jobs = {user_id: queue_generation_if_needed(user_id, count) for user_id, count in harmful_counts.items()}
+
+    results = [None] * len(items)
+    for i, error in errors.items():
+        results[i] = {"index": i, "status": "invalid", "error": error}
+    for i, r in valid_requests:
+        user_harmful_count = harmful_counts[r.user_id]
+        job = jobs[r.user_id]
+        message = f"Chat data logged for user {r.user_id}. Harmful count: {user_harmful_count}."
+        if job is not None:
+            message += f" Quiz and report generation queued (job {job.id})."
+        results[i] = {
+            "index": i,
+            "status": "logged",
+            "message": message,
+            "user_id": r.user_id,
+            "harmful_count": user_harmful_count,
+            "job_id": job.id if job else None,
+            "job_status": job.status if job else None
+        }
+
+    return {
+        "message": f"Logged {len(valid_requests)} of {len(items)} chat entries for {len(harmful_counts)} users.",
+        "results": results
+    }
+
+@app.get("/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@app.get("/users/{user_id}/latest", dependencies=[Depends(verify_api_key)])
+async def get_user_latest(user_id: int):
+    latest = job_manager.latest_for_user(user_id)
+    success = job_manager.latest_success_for_user(user_id)
+    if latest is None and success is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No jobs for user {user_id}")
+    return {
+        "user_id": user_id,
+        "latest_job": latest.to_dict() if latest else None,
+        "latest_results": success.result if success else None,
+        "latest_results_job_id": success.id if success else None
+    }
+
+@app.get("/users/{user_id}/report/stream", dependencies=[Depends(verify_api_key)])
+async def stream_user_report(user_id: int):
+    chat_stats = await run_in_threadpool(load_report_stats, user_id)
+    if chat_stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No harmful chat data for user {user_id}")
+    # The sync generator runs in the threadpool, so blocking model reads stay off the event loop
+    return StreamingResponse(
+        stream_report_events(user_id, chat_stats),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Unauthenticated like a standard Prometheus scrape target; it exposes only aggregate timings and counts
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
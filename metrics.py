@@ -0,0 +1,208 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 이 경로가 있으면 프로세스 종료 시 지표를 파일로 저장 (배치 CLI 는 --metrics-file 로도 지정)
+METRICS_FILE = os.getenv("KITTY_METRICS_FILE")
+
+# 초 단위. CSV I/O(ms) 부터 LLM 호출(수십 초)까지
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_str(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.label_names:
+            # 레이블 없는 지표는 처음부터 0 으로 노출
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (버킷별 개수, 합, 개수)
+        self._values: Dict[Tuple[str, ...], list] = {}
+        if not self.label_names:
+            self._values[()] = self._new_state()
+
+    def _new_state(self) -> list:
+        return [[0] * len(self.buckets), 0.0, 0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._new_state()
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간을 기록 (예외로 끝나도 기록)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts + [count - sum(counts)]):
+                    cumulative += n
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{self.name}_bucket{_label_str(self.label_names, key, le)} {cumulative}")
+                labels = _label_str(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_number(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets))
+
+
+# ─── 공용 지표 ────────────────────────────────────────────────────────────────
+
+CHAT_APPEND_SECONDS = histogram("kitty_chat_append_seconds", "채팅 행 추가(저장소 쓰기) 시간")
+HARMFUL_COUNT_SECONDS = histogram("kitty_harmful_count_query_seconds", "사용자 유해 채팅 수 조회 시간")
+CHAT_STATISTICS_SECONDS = histogram("kitty_chat_statistics_seconds", "사용자 채팅 통계 계산 시간")
+QUIZ_GENERATION_SECONDS = histogram("kitty_quiz_generation_seconds", "퀴즈 생성 시간 (요청 묶음 단위)")
+REPORT_GENERATION_SECONDS = histogram("kitty_report_generation_seconds", "리포트 생성 시간", ["generator"])
+LLM_REQUEST_SECONDS = histogram("kitty_llm_request_seconds", "LLM 백엔드 호출 시간 (재시도 한 번 단위)",
+                                ["backend"])
+LLM_CALLS = counter("kitty_llm_calls_total", "LLM 백엔드 호출 수 (재시도 포함)", ["backend", "outcome"])
+LLM_RETRIES = counter("kitty_llm_retries_total", "일시적인 오류로 인한 LLM 재시도 수")
+LLM_CACHE_HITS = counter("kitty_llm_cache_hits_total", "응답 캐시 적중 수")
+LLM_TOKENS = counter("kitty_llm_tokens_total", "LLM 응답이 보고한 총 토큰 수", ["backend"])
+LLM_PARSE_FAILURES = counter("kitty_llm_parse_failures_total", "LLM 응답 JSON 파싱 실패 수", ["source"])
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def dump(path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+_dump_paths: List[str] = []
+
+
+def dump_at_exit(path: Optional[str]):
+    """프로세스 종료 시 지표를 path 에 저장 (None 이면 무시)."""
+    if path and path not in _dump_paths:
+        _dump_paths.append(path)
+
+
+@atexit.register
+def _dump_all():
+    for path in _dump_paths:
+        try:
+            dump(path)
+        except OSError as e:
+            print(f"[WARN] 지표 파일 '{path}' 저장 실패: {e}")
+
+
+dump_at_exit(METRICS_FILE)
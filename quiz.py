@@ -2,23 +2,25 @@
 import os
 import sys
 import json
+import argparse
 import pandas as pd
-from openai import OpenAI
+
+try:
+    from .llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from .llm_gateway import get_gateway
+    from .metrics import LLM_PARSE_FAILURES, METRICS_FILE, QUIZ_GENERATION_SECONDS, dump_at_exit
+except ImportError:
+    from llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from llm_gateway import get_gateway
+    from metrics import LLM_PARSE_FAILURES, METRICS_FILE, QUIZ_GENERATION_SECONDS, dump_at_exit
 
 # ─── Configuration ────────────────────────────────────────────────────────────
 MODEL_NAME        = "gpt-4o-mini"
 DEFAULT_CSV_PATH  = "replace_dataset_output.csv"
 DEFAULT_OUT_PATH  = "harmful_output.json"
 
-def get_api_key() -> str:
-    key = os.getenv("OPENAI_API_KEY")
-    if not key:
-        print("Error: OPENAI_API_KEY가 설정되어 있지 않습니다.", file=sys.stderr)
-        sys.exit(1)
-    return key
-
-# OpenAI client
-client = OpenAI(api_key=get_api_key())
+# OpenAI 호출은 공용 gateway(응답 캐시 포함)를 거칩니다
+gateway = get_gateway()
 
 PROMPT_TEMPLATE = """\
 다음 문장에서 유해한 단어 '{bad_word}'에 대해 아래 JSON 형식으로 응답하세요:
@@ -52,16 +54,12 @@ class HarmfulContentPipeline:
 
     def generate_for_row(self, sentence: str, bad_word: str) -> dict:
         prompt = PROMPT_TEMPLATE.format(bad_word=bad_word, sentence=sentence)
-        resp = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=500
-        )
-        text = resp.choices[0].message.content.strip()
+        with QUIZ_GENERATION_SECONDS.time():
+            text = gateway.complete(prompt, model=MODEL_NAME, temperature=0.7, max_tokens=500).strip()
         try:
             data = json.loads(text)
         except json.JSONDecodeError:
+            LLM_PARSE_FAILURES.inc(source="quiz")
             print(f"[WARN] JSON 파싱 실패: {text[:100]}...", file=sys.stderr)
             data = {}
 
@@ -71,28 +69,40 @@ class HarmfulContentPipeline:
             "quiz":     data.get("quiz", "")
         }
 
-    def process_all(self) -> list[dict]:
-        results = []
-        total = len(self.df)
-        for idx, row in self.df.iterrows():
-            try:
-                entry = self.generate_for_row(row["text"], row["유해_단어"])
-                results.append(entry)
-                print(f"[{idx+1}/{total}] 생성 완료: '{row['유해_단어']}'")
-            except Exception as e:
-                print(f"[{idx+1}/{total}] 오류 발생: {e}", file=sys.stderr)
-        return results
+    def process_all(self, concurrency: int = DEFAULT_CONCURRENCY) -> list[dict]:
+        """concurrency > 1 이면 행별 GPT 호출을 동시에 보냅니다. 결과는 행 순서대로, 실패한 행은 빠집니다."""
+        rows = list(zip(self.df["text"], self.df["유해_단어"]))
+        total = len(rows)
+
+        def on_done(idx, result):
+            if isinstance(result, Exception):
+                print(f"[{idx+1}/{total}] 오류 발생: {result}", file=sys.stderr)
+            else:
+                print(f"[{idx+1}/{total}] 생성 완료: '{rows[idx][1]}'")
+
+        results = run_concurrently(self.generate_for_row, rows, concurrency, on_done=on_done)
+        return [entry for entry in results if not isinstance(entry, Exception)]
 
     def save_json(self, results: list[dict]):
         with open(self.output_path, "w", encoding="utf-8") as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
         print(f"[INFO] 결과가 '{self.output_path}'에 저장되었습니다.")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="유해 단어 퀴즈 생성")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="동시에 보낼 GPT 요청 수 (기본: 1, 순차 실행)")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="종료 시 Prometheus 형식 지표를 저장할 경로 (기본: 환경변수 KITTY_METRICS_FILE)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    dump_at_exit(args.metrics_file)
     pipeline = HarmfulContentPipeline(DEFAULT_CSV_PATH, DEFAULT_OUT_PATH)
     pipeline.load_data()
     pipeline.df = pipeline.df.head(5)
-    results = pipeline.process_all()
+    results = pipeline.process_all(concurrency=args.concurrency)
     pipeline.save_json(results)
 
 if __name__ == "__main__":
@@ -1,48 +1,165 @@
 import json
+import os
+from contextlib import ExitStack
+from typing import List, Optional, Tuple
 import pandas as pd
-from openai import OpenAI
-from quiz_config import get_api_key, MODEL_NAME
-from quiz_prompt_templates import PROMPT_TEMPLATE
+try:
+    from .quiz_config import MODEL_NAME
+    from .quiz_prompt_templates import PACKED_ITEM_TEMPLATE, PACKED_PROMPT_TEMPLATE, PROMPT_TEMPLATE
+    from .harmful_words import parse_harmful_words
+    from .llm_gateway import get_gateway
+    from .quiz_library import QuizLibrary, normalize_word
+    from .metrics import LLM_PARSE_FAILURES, QUIZ_GENERATION_SECONDS
+except ImportError:
+    from quiz_config import MODEL_NAME
+    from quiz_prompt_templates import PACKED_ITEM_TEMPLATE, PACKED_PROMPT_TEMPLATE, PROMPT_TEMPLATE
+    from harmful_words import parse_harmful_words
+    from llm_gateway import get_gateway
+    from quiz_library import QuizLibrary, normalize_word
+    from metrics import LLM_PARSE_FAILURES, QUIZ_GENERATION_SECONDS
+
+# Number of (sentence, word) pairs sent in one packed request; 1 sends one request per word
+QUIZ_PACK_SIZE = int(os.getenv("KITTY_QUIZ_PACK_SIZE", "8"))
+MAX_TOKENS_PER_ITEM = 500
 
 class QuizGenerator:
-    def __init__(self):
-        self.client = OpenAI(api_key=get_api_key())
+    def __init__(self, library: Optional[QuizLibrary] = None):
+        self.gateway = get_gateway()
+        self.library = library if library is not None else QuizLibrary()
 
     def generate_quiz_for_entry(self, sentence: str, bad_word: str) -> dict:
+        # The reason/quiz are about the word, so a library entry for any variant of it is reused
+        entry = self.library.get(bad_word)
+        if entry is None:
+            with self.library.word_lock(bad_word):
+                entry = self.library.get(bad_word)
+                if entry is None:
+                    entry = self._generate(sentence, bad_word)
+                    if entry["reason"] or entry["quiz"]:
+                        self.library.put(bad_word, entry["reason"], entry["quiz"])
+        return self._result(bad_word, entry)
+
+    @staticmethod
+    def _result(bad_word: str, entry: dict) -> dict:
+        return {
+            "bad_word": bad_word,
+            "reason": entry["reason"],
+            "quiz": entry["quiz"]
+        }
+
+    def _generate(self, sentence: str, bad_word: str) -> dict:
         prompt = PROMPT_TEMPLATE.format(bad_word=bad_word, sentence=sentence)
-        resp = self.client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=500
-        )
-        text = resp.choices[0].message.content.strip()
+        text = self.gateway.complete(prompt, model=MODEL_NAME, temperature=0.7, max_tokens=MAX_TOKENS_PER_ITEM).strip()
         try:
             data = json.loads(text)
         except json.JSONDecodeError:
+            LLM_PARSE_FAILURES.inc(source="quiz")
             print(f"[WARN] JSON 파싱 실패: {text[:100]}...")
             data = {}
 
         return {
-            "bad_word": bad_word,
             "reason": data.get("reason", ""),
             "quiz": data.get("quiz", "")
         }
 
-    def generate_quizzes_from_data(self, user_data: pd.DataFrame) -> list[dict]:
-        results = []
+    def _generate_packed(self, pairs: List[Tuple[str, str]]) -> List[Optional[dict]]:
+        """
+        One request for several (sentence, bad_word) pairs. The response is a JSON array keyed by
+        item id; an item that is missing or empty comes back as None.
+        """
+        items = "\n".join(
+            PACKED_ITEM_TEMPLATE.format(id=i, bad_word=bad_word, sentence=sentence)
+            for i, (sentence, bad_word) in enumerate(pairs, 1)
+        )
+        prompt = PACKED_PROMPT_TEMPLATE.format(count=len(pairs), items=items)
+        text = self.gateway.complete(prompt, model=MODEL_NAME, temperature=0.7,
+                                     max_tokens=MAX_TOKENS_PER_ITEM * len(pairs)).strip()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            LLM_PARSE_FAILURES.inc(source="quiz_packed")
+            print(f"[WARN] JSON 파싱 실패 (묶음 {len(pairs)}개): {text[:100]}...")
+            data = []
+        if isinstance(data, dict):
+            data = data.get("items", [])
+
+        by_id = {}
+        for item in data if isinstance(data, list) else []:
+            if isinstance(item, dict) and (item.get("reason") or item.get("quiz")):
+                by_id[str(item.get("id"))] = {"reason": item.get("reason", ""), "quiz": item.get("quiz", "")}
+        return [by_id.get(str(i)) for i in range(1, len(pairs) + 1)]
+
+    def generate_quizzes(self, pairs: List[Tuple[str, str]], pack_size: int = QUIZ_PACK_SIZE) -> list[dict]:
+        """
+        Quizzes for (sentence, bad_word) pairs, in order. Words missing from the library are
+        requested pack_size at a time (one pair per normalized word); entries that a packed
+        response does not cover fall back to a single-item call.
+        """
+        with QUIZ_GENERATION_SECONDS.time():
+            return self._generate_quizzes(pairs, pack_size)
+
+    def _generate_quizzes(self, pairs: List[Tuple[str, str]], pack_size: int) -> list[dict]:
+        results: List[Optional[dict]] = [None] * len(pairs)
+        pending: dict[str, list[int]] = {}
+        for i, (_, bad_word) in enumerate(pairs):
+            entry = self.library.get(bad_word)
+            if entry is not None:
+                results[i] = self._result(bad_word, entry)
+            elif normalize_word(bad_word):
+                pending.setdefault(normalize_word(bad_word), []).append(i)
+
+        if pack_size > 1:
+            groups = list(pending.items())
+            for start in range(0, len(groups), pack_size):
+                self._generate_pack(pairs, groups[start:start + pack_size], results)
+
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self.generate_quiz_for_entry(*pairs[i])
+        return results
+
+    def _generate_pack(self, pairs: List[Tuple[str, str]], pack: List[Tuple[str, List[int]]],
+                       results: List[Optional[dict]]):
+        """
+        One packed request for the (normalized word, pair indices) groups in pack. The word locks are
+        held until the entries are in the library, so concurrent jobs request each word once.
+        """
+        with ExitStack() as stack:
+            # Sorted order, so jobs with overlapping packs cannot deadlock
+            for _, group in sorted(pack):
+                stack.enter_context(self.library.word_lock(pairs[group[0]][1]))
+
+            missing = []
+            for _, group in pack:
+                # Another job may have filled the word while we waited for its lock
+                entry = self.library.get(pairs[group[0]][1])
+                if entry is None:
+                    missing.append(group)
+                    continue
+                for i in group:
+                    results[i] = self._result(pairs[i][1], entry)
+            if not missing:
+                return
+
+            entries = self._generate_packed([pairs[group[0]] for group in missing])
+            for group, entry in zip(missing, entries):
+                if entry is None:
+                    continue
+                self.library.put(pairs[group[0]][1], entry["reason"], entry["quiz"])
+                for i in group:
+                    results[i] = self._result(pairs[i][1], entry)
+
+    def generate_quizzes_from_data(self, user_data: pd.DataFrame, pack_size: int = QUIZ_PACK_SIZE) -> list[dict]:
+        pairs = []
         for _, row in user_data.iterrows():
             # Assuming user_data DataFrame has 'original_text' and 'harmful_words' columns
             # You might need to adjust column names based on your chat_db.csv structure
             sentence = row['original_text']
-            bad_word = row['harmful_words']
-            
-            # Handle cases where harmful_words might be a comma-separated string
-            if isinstance(bad_word, str) and ',' in bad_word:
-                # For simplicity, let's just take the first harmful word for quiz generation
-                # Or you could iterate through all of them and generate multiple quizzes
-                bad_word = bad_word.split(',')[0].strip()
+            # harmful_words is a list literal such as "['word1', 'word2']"
+            # For simplicity, let's just take the first harmful word for quiz generation
+            words = parse_harmful_words(row['harmful_words'])
+            bad_word = words[0] if words else None
 
             if sentence and bad_word:
-                results.append(self.generate_quiz_for_entry(sentence, bad_word))
-        return results
+                pairs.append((sentence, bad_word))
+        return self.generate_quizzes(pairs, pack_size=pack_size)
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, Optional
+
+try:
+    from .file_lock import file_lock
+except ImportError:
+    from file_lock import file_lock
+
+QUIZ_LIBRARY_PATH = os.getenv("KITTY_QUIZ_LIBRARY", "quiz_library.json")
+
+# Trailing particles (조사), by what the word they attach to must end with. Only real particles are
+# listed: stripping endings such as 네/니/지/다 would merge distinct words ("노인네", "할머니").
+_AFTER_CONSONANT = "consonant"   # 받침 있는 음절 뒤 ("병신이")
+_AFTER_VOWEL = "vowel"           # 받침 없는 음절 뒤 ("새끼가")
+_AFTER_VOWEL_OR_RIEUL = "rieul"  # 받침 없거나 ㄹ 받침인 음절 뒤 ("새끼로", "들로")
+_AFTER_ANY = "any"
+_PARTICLES = sorted({
+    "은": _AFTER_CONSONANT, "이": _AFTER_CONSONANT, "을": _AFTER_CONSONANT, "과": _AFTER_CONSONANT,
+    "아": _AFTER_CONSONANT, "이랑": _AFTER_CONSONANT, "이야": _AFTER_CONSONANT,
+    "으로": _AFTER_CONSONANT, "으로서": _AFTER_CONSONANT, "으로써": _AFTER_CONSONANT,
+    "는": _AFTER_VOWEL, "가": _AFTER_VOWEL, "를": _AFTER_VOWEL, "와": _AFTER_VOWEL,
+    "야": _AFTER_VOWEL, "랑": _AFTER_VOWEL,
+    "로": _AFTER_VOWEL_OR_RIEUL, "로서": _AFTER_VOWEL_OR_RIEUL, "로써": _AFTER_VOWEL_OR_RIEUL,
+    "에": _AFTER_ANY, "에게": _AFTER_ANY, "에서": _AFTER_ANY, "에게서": _AFTER_ANY, "한테": _AFTER_ANY,
+    "한테서": _AFTER_ANY, "까지": _AFTER_ANY, "부터": _AFTER_ANY, "처럼": _AFTER_ANY, "보다": _AFTER_ANY,
+    "도": _AFTER_ANY, "만": _AFTER_ANY, "의": _AFTER_ANY,
+}.items(), key=lambda item: len(item[0]), reverse=True)
+_PLURAL = "들"
+_RIEUL = 8  # index of ㄹ among the final consonants (종성)
+MIN_STEM_LENGTH = 2
+_NON_WORD = re.compile(r"[\s\W_]+")
+
+
+def _final_consonant(char: str) -> Optional[int]:
+    """Index of the final consonant of a Hangul syllable (0 = none), or None for other characters."""
+    if "가" <= char <= "힣":
+        return (ord(char) - ord("가")) % 28
+    return None
+
+
+def _particle_fits(stem: str, rule: str) -> bool:
+    final = _final_consonant(stem[-1])
+    if final is None or rule == _AFTER_ANY:
+        return True
+    if rule == _AFTER_CONSONANT:
+        return final != 0
+    if rule == _AFTER_VOWEL:
+        return final == 0
+    return final in (0, _RIEUL)
+
+
+def normalize_word(word: str) -> str:
+    """
+    Library key for a harmful word: NFC, lower case, no spaces or punctuation
+    ("짐승만도 못한" == "짐승만도못한"), then at most one trailing particle and the plural
+    suffix 들 stripped while at least MIN_STEM_LENGTH characters remain
+    ("짱깨들이" -> "짱깨", "또라이야" -> "또라이", but "노인네" and "할머니" are kept).
+    """
+    text = _NON_WORD.sub("", unicodedata.normalize("NFC", str(word)).lower())
+    for particle, rule in _PARTICLES:
+        stem = text[:-len(particle)]
+        if text.endswith(particle) and len(stem) >= MIN_STEM_LENGTH and _particle_fits(stem, rule):
+            text = stem
+            break
+    if text.endswith(_PLURAL) and len(text) - len(_PLURAL) >= MIN_STEM_LENGTH:
+        text = text[:-len(_PLURAL)]
+    return text
+
+
+class QuizLibrary:
+    """
+    Persistent per-word quiz library (reason + quiz), keyed by normalized word.
+
+    The educational content in PROMPT_TEMPLATE is about the word rather than the sentence,
+    so one generated entry is reused for every sentence and spelling variant of that word.
+    Entries are filled lazily by QuizGenerator and can be pre-generated with quiz_warmup.py.
+    The JSON file is shared across processes: writes merge with entries other processes
+    added and replace the file atomically.
+    """
+
+    def __init__(self, path: str = QUIZ_LIBRARY_PATH):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        self._mtime: Optional[int] = None
+        self._lock = threading.RLock()
+        self._word_locks: Dict[str, threading.Lock] = {}
+
+    def word_lock(self, word: str) -> threading.Lock:
+        """Lock held while generating an entry, so concurrent misses for one word call the LLM once."""
+        with self._lock:
+            return self._word_locks.setdefault(normalize_word(word), threading.Lock())
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Could not read quiz library '{self.path}': {e}")
+            return
+        self._mtime = mtime
+
+    def get(self, word: str) -> Optional[dict]:
+        key = normalize_word(word)
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._reload_if_changed()
+                entry = self._entries.get(key)
+            return entry
+
+    def put(self, word: str, reason: str, quiz: str):
+        key = normalize_word(word)
+        if not key:
+            return
+        with self._lock, file_lock(self.path):
+            self._reload_if_changed()
+            self._entries[key] = {"word": word, "reason": reason, "quiz": quiz}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return len(self._entries)
@@ -6,3 +6,16 @@ PROMPT_TEMPLATE = """\
 문장: "{sentence}"
 """
 
+
+# 여러 (문장, 단어) 쌍을 한 번에 요청할 때 쓰는 템플릿. 지시문은 PROMPT_TEMPLATE 과 같고 한 번만 들어갑니다.
+PACKED_PROMPT_TEMPLATE = """\
+다음 {count}개 항목 각각에 대해, 문장 속 유해한 단어를 아래 내용으로 설명하세요:
+1. reason: 왜 이 단어가 유해한지 어린아이도 알 수 있게 설명하고 , 유래가 있줘면 이 단어의 유래도 설명해줘.
+2. quiz: 교육용 객관식 퀴즈 문항으로 앞뒤에 번호 를 붙여서 정답을 번호로 나오게 두문제 정도 부탁해.
+
+다른 설명 없이 JSON 배열 하나로만 응답하고, 각 원소는 {{"id": 항목 번호, "reason": ..., "quiz": ...}} 형식으로 작성하세요.
+
+{items}
+"""
+
+PACKED_ITEM_TEMPLATE = "[{id}] 유해한 단어: '{bad_word}' / 문장: \"{sentence}\""
@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+from typing import Dict, List
+
+import pandas as pd
+
+QUIZ_STORE_DIR = "quiz_store"
+
+
+class QuizStore:
+    """
+    Per-user store of generated quizzes with a watermark.
+
+    Chat rows are identified by their key in chat_db (the DataFrame index returned by
+    get_user_harmful_chat_data), which grows with every append. The watermark is the
+    largest row key that already went through quiz generation, so only rows above it
+    need new LLM calls. The number of rows covered is kept alongside the watermark;
+    if chat_db was rewritten and the keys no longer line up, the user starts over.
+    """
+
+    def __init__(self, store_dir: str = QUIZ_STORE_DIR):
+        self.store_dir = store_dir
+        self._locks: Dict[int, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def user_lock(self, user_id: int) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    def _path(self, user_id: int) -> str:
+        return os.path.join(self.store_dir, f"{user_id}.json")
+
+    def load(self, user_id: int) -> dict:
+        path = self._path(user_id)
+        if not os.path.isfile(path):
+            return {"watermark": None, "rows": 0, "quizzes": []}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, user_id: int, state: dict):
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self._path(user_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def pending_rows(self, state: dict, user_data: pd.DataFrame) -> pd.DataFrame:
+        """Rows of user_data above the stored watermark (all rows if the store is stale)."""
+        watermark = state["watermark"]
+        if watermark is None or user_data.empty:
+            return user_data
+        if int((user_data.index <= watermark).sum()) != state["rows"]:
+            print("[WARN] Quiz watermark does not match chat data. Regenerating all quizzes.")
+            state.update({"watermark": None, "rows": 0, "quizzes": []})
+            return user_data
+        return user_data[user_data.index > watermark]
+
+    def advance(self, user_id: int, state: dict, new_rows: pd.DataFrame, new_quizzes: List[dict]) -> List[dict]:
+        """Merge new quizzes into the stored ones, move the watermark past new_rows and persist."""
+        if new_rows.empty:
+            return state["quizzes"]
+        state["quizzes"] = state["quizzes"] + new_quizzes
+        state["watermark"] = int(new_rows.index.max())
+        state["rows"] += len(new_rows)
+        self.save(user_id, state)
+        return state["quizzes"]
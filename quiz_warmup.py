@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+quiz_warmup.py
+
+chat_db 에서 가장 많이 쓰인 유해 단어 top-N 에 대해 퀴즈 라이브러리를 미리 채웁니다.
+변형(띄어쓰기·조사·복수 접미사 들)은 정규화된 단어 하나로 합쳐 세고, 이미 라이브러리에 있는 단어는 건너뜁니다.
+
+    python quiz_warmup.py --top 300 --concurrency 8 --pack-size 8
+"""
+
+import argparse
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .harmful_words import get_word_index
+    from .llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from .metrics import METRICS_FILE, dump_at_exit
+    from .quiz_generator import QUIZ_PACK_SIZE, QuizGenerator
+    from .quiz_library import normalize_word
+    from .storage import CHAT_TABLE, get_storage
+except ImportError:
+    from harmful_words import get_word_index
+    from llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from metrics import METRICS_FILE, dump_at_exit
+    from quiz_generator import QUIZ_PACK_SIZE, QuizGenerator
+    from quiz_library import normalize_word
+    from storage import CHAT_TABLE, get_storage
+
+
+def top_normalized_words(csv_path: Optional[str], top_n: int) -> list[tuple[str, str, int]]:
+    """정규화 단어 기준 사용 횟수 상위 top_n 개의 (대표 표기, 예문, 횟수). 대표 표기는 가장 많이 쓰인 변형."""
+    if csv_path is None:
+        words = get_storage().harmful_words()
+        texts = get_storage().read_table(CHAT_TABLE)["text"]
+    else:
+        words = get_word_index(csv_path).table()
+        texts = pd.read_csv(csv_path, usecols=["text"])["text"]
+
+    counts = np.bincount(words.word_ids, minlength=len(words.vocab))
+    used, first = np.unique(words.word_ids, return_index=True)
+    first_row = dict(zip(used.tolist(), words.row_ids[first].tolist()))
+
+    groups: dict[str, dict] = {}
+    for word_id in np.flatnonzero(counts).tolist():
+        word = words.vocab[word_id]
+        key = normalize_word(word)
+        if not key:
+            continue
+        group = groups.setdefault(key, {"count": 0, "best": word_id})
+        group["count"] += int(counts[word_id])
+        if counts[word_id] > counts[group["best"]]:
+            group["best"] = word_id
+
+    ranked = sorted(groups.values(), key=lambda g: g["count"], reverse=True)[:top_n]
+    return [
+        (words.vocab[g["best"]], str(texts.iloc[first_row[g["best"]]]), g["count"])
+        for g in ranked
+    ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="퀴즈 라이브러리 미리 채우기")
+    parser.add_argument("--top", type=int, default=300, help="미리 생성할 단어 수 (기본: 300)")
+    parser.add_argument("--csv", default=None, help="chat_db CSV 경로 (기본: 설정된 저장소의 chat 테이블)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="동시에 보낼 GPT 요청 수 (기본: 1, 순차 실행)")
+    parser.add_argument("--pack-size", type=int, default=QUIZ_PACK_SIZE,
+                        help=f"한 요청에 묶을 단어 수 (기본: {QUIZ_PACK_SIZE}, 1 이면 단어마다 요청)")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="종료 시 Prometheus 형식 지표를 저장할 경로 (기본: 환경변수 KITTY_METRICS_FILE)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    dump_at_exit(args.metrics_file)
+    generator = QuizGenerator()
+    candidates = top_normalized_words(args.csv, args.top)
+    todo = [(sentence, word) for word, sentence, _ in candidates if word not in generator.library]
+    print(f"[INFO] 상위 {len(candidates)}개 단어 중 {len(todo)}개의 퀴즈를 생성합니다.")
+
+    pack_size = max(1, args.pack_size)
+    packs = [todo[i:i + pack_size] for i in range(0, len(todo), pack_size)]
+
+    def on_done(i, result):
+        words = ", ".join(f"'{word}'" for _, word in packs[i])
+        if isinstance(result, Exception):
+            print(f"[ERROR] {words} 퀴즈 생성 실패: {result}")
+        else:
+            print(f"[{i+1}/{len(packs)}] {words} 완료")
+
+    run_concurrently(generator.generate_quizzes, [(pack, pack_size) for pack in packs],
+                     args.concurrency, on_done=on_done)
+    print(f"[INFO] 퀴즈 라이브러리 항목 수: {len(generator.library)}")
+
+
+if __name__ == "__main__":
+    main()
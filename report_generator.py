@@ -1,6 +1,13 @@
 import json
-from openai import OpenAI
-from quiz_config import get_api_key, MODEL_NAME
+from typing import Iterator
+try:
+    from .quiz_config import MODEL_NAME
+    from .llm_gateway import get_gateway
+    from .metrics import LLM_PARSE_FAILURES, REPORT_GENERATION_SECONDS
+except ImportError:
+    from quiz_config import MODEL_NAME
+    from llm_gateway import get_gateway
+    from metrics import LLM_PARSE_FAILURES, REPORT_GENERATION_SECONDS
 
 PROMPT_TEMPLATE = """
 다음은 사용자의 유해 콘텐츠 접촉 통계입니다. 이 데이터를 바탕으로 사용자가 이해하기 쉬운 요약 리포트를 생성해주세요.
@@ -14,20 +21,28 @@ PROMPT_TEMPLATE = """
 
 class ReportGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=get_api_key())
+        self.gateway = get_gateway()
 
-    def generate_report(self, stats_data: dict) -> dict:
-        prompt = PROMPT_TEMPLATE.format(statistics=json.dumps(stats_data, indent=2, ensure_ascii=False))
-        resp = self.client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        text = resp.choices[0].message.content.strip()
+    @staticmethod
+    def make_prompt(stats_data: dict) -> str:
+        return PROMPT_TEMPLATE.format(statistics=json.dumps(stats_data, indent=2, ensure_ascii=False))
+
+    @staticmethod
+    def parse_report(text: str) -> dict:
         try:
-            data = json.loads(text)
+            data = json.loads(text.strip())
         except json.JSONDecodeError:
-            print(f"[WARN] JSON 파싱 실패: {text[:100]}...")
+            LLM_PARSE_FAILURES.inc(source="report")
+            print(f"[WARN] JSON 파싱 실패: {text.strip()[:100]}...")
             data = {}
         return data
+
+    def generate_report(self, stats_data: dict) -> dict:
+        with REPORT_GENERATION_SECONDS.time(generator="report_generator"):
+            text = self.gateway.complete(self.make_prompt(stats_data), model=MODEL_NAME, temperature=0.7,
+                                         max_tokens=1000)
+            return self.parse_report(text)
+
+    def stream_report(self, stats_data: dict) -> Iterator[str]:
+        """generate_report 와 같은 프롬프트의 응답을 생성되는 대로 조각씩 돌려줍니다. 파싱은 parse_report 로."""
+        return self.gateway.stream(self.make_prompt(stats_data), model=MODEL_NAME, temperature=0.7, max_tokens=1000)
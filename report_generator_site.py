@@ -11,96 +11,44 @@ report_generator_site.py
     3) 카테고리별 평균값
     4) GPT-4o Mini 프롬프트 엔지니어링을 통해 유해성 리포트 작성
   결과를 site_report.json 으로 저장
-  * 테스트용: 처음 두 사용자만 처리
+  * 일부 사용자만 처리하려면 --users 1,2 (테스트용)
+
+배치 모드 (llm_batch.py 참고):
+    python report_generator_site.py --batch-requests site_requests.jsonl   # 1) 통계 + 요청 파일 저장
+    python report_generator_site.py --batch-results site_results.jsonl     # 2) 결과를 site_report.json 에 반영
+
+여러 머신에 나눠 실행 (report_shards.py 참고):
+    python report_generator_site.py --shard 0/4                           # → site_report.shard-0-of-4.json
+    python report_generator_site.py --merge site_report.shard-*.json      # → site_report.json
 """
 
 import os
 import sys
 import json
-import pandas as pd
-import openai
+import argparse
+
+try:
+    from .llm_batch import apply_batch_results, batch_request, read_batch_results, write_batch_requests
+    from .llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from .llm_gateway import get_gateway
+    from .metrics import METRICS_FILE, REPORT_GENERATION_SECONDS, dump_at_exit
+    from .report_shards import add_arguments as add_shard_arguments, merge_outputs, select_users, shard_output_path
+    from .site_aggregator import AGG_CSV_PATH, load_and_aggregate
+    from .site_statistics import build_user_stats
+except ImportError:
+    from llm_batch import apply_batch_results, batch_request, read_batch_results, write_batch_requests
+    from llm_concurrency import DEFAULT_CONCURRENCY, run_concurrently
+    from llm_gateway import get_gateway
+    from metrics import METRICS_FILE, REPORT_GENERATION_SECONDS, dump_at_exit
+    from report_shards import add_arguments as add_shard_arguments, merge_outputs, select_users, shard_output_path
+    from site_aggregator import AGG_CSV_PATH, load_and_aggregate
+    from site_statistics import build_user_stats
 
 # ─── 설정 ──────────────────────────────────────────────────────────────────────
 
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    print("Error: 환경변수 OPENAI_API_KEY가 설정되어 있지 않습니다.", file=sys.stderr)
-    sys.exit(1)
-openai.api_key = API_KEY
-
 MODEL_NAME       = "gpt-4o-mini"
-RAW_CSV_PATH     = "site_db.csv"
-AGG_CSV_PATH     = "site_harmfulness_by_id.csv"
 OUTPUT_JSON_PATH = "site_report.json"
 
-HARM_COLUMNS = [
-    "abuse", "censure", "discrimination",
-    "hate", "sexual", "violence"
-]
-
-
-# ─── 데이터 집계 ──────────────────────────────────────────────────────────────
-
-def load_and_aggregate() -> pd.DataFrame:
-    """site_db.csv → id·site별 평균 유해도 계산 → 저장 → DataFrame 반환"""
-    if not os.path.isfile(RAW_CSV_PATH):
-        print(f"Error: '{RAW_CSV_PATH}' 파일을 찾을 수 없습니다.", file=sys.stderr)
-        sys.exit(1)
-
-    df = pd.read_csv(RAW_CSV_PATH)
-    for col in ["id", "site"] + HARM_COLUMNS:
-        if col not in df.columns:
-            print(f"Error: '{col}' 컬럼이 없습니다.", file=sys.stderr)
-            sys.exit(1)
-
-    agg = df.groupby(["id", "site"], as_index=False)[HARM_COLUMNS].mean()
-    agg.to_csv(AGG_CSV_PATH, index=False, encoding="utf-8")
-    print(f"[INFO] 평균 유해도 결과를 '{AGG_CSV_PATH}'에 저장했습니다.")
-    return agg
-
-
-# ─── 사용자별 통계 계산 ────────────────────────────────────────────────────────
-
-def build_user_stats(agg_df: pd.DataFrame) -> dict[int, dict]:
-    """
-    사용자별로 다음 통계를 계산하여 dict로 반환:
-      1) highest_avg_category: 카테고리별 평균이 가장 높은 항목
-      2) top5_sites_by_sum: 사이트별 유해성 합(sum_harm)이 가장 높은 사이트 5개
-      3) category_means: 6개 카테고리별 평균값
-    """
-    stats = {}
-
-    for uid, sub in agg_df.groupby("id"):
-        uid = int(uid)
-
-        # 1) 카테고리별 평균 across 모든 방문 사이트
-        cat_means = sub[HARM_COLUMNS].mean()
-        highest_avg_cat = cat_means.idxmax()
-        highest_avg_val = float(cat_means.max())
-
-        # 2) 사이트별 유해성 합(sum_harm) 계산 → Top 5 추출
-        tmp = sub.copy()
-        tmp["sum_harm"] = tmp[HARM_COLUMNS].sum(axis=1)
-        top5 = tmp.nlargest(5, "sum_harm")[["site", "sum_harm"]]
-        top5_list = [
-            {"site": row["site"], "sum": float(row["sum_harm"])}
-            for _, row in top5.iterrows()
-        ]
-
-        # 3) 카테고리별 평균값 딕셔너리
-        means_dict = {cat: float(cat_means[cat]) for cat in HARM_COLUMNS}
-
-        stats[uid] = {
-            "highest_avg_category": {
-                "category": highest_avg_cat,
-                "average": highest_avg_val
-            },
-            "top5_sites_by_sum": top5_list,
-            "category_means": means_dict
-        }
-
-    return stats
-
 
 # ─── 프롬프트 생성 & GPT 호출 ─────────────────────────────────────────────────
 
@@ -130,39 +78,102 @@ def make_prompt(uid: int, stat: dict) -> str:
 
 def generate_user_report(uid: int, stat: dict) -> str:
     prompt = make_prompt(uid, stat)
-    # OpenAI v1.x 호출 방식
-    resp = openai.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=512
-    )
-    return resp.choices[0].message.content.strip()
+    # 공용 gateway 경유 (같은 프롬프트는 디스크 캐시에서 응답)
+    with REPORT_GENERATION_SECONDS.time(generator="site_report"):
+        return get_gateway().complete(prompt, model=MODEL_NAME, temperature=0.7, max_tokens=512).strip()
+
+
+def batch_custom_id(uid) -> str:
+    return f"site-report-{uid}"
 
 
 # ─── 메인 ─────────────────────────────────────────────────────────────────────
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="사이트 유해성 리포트 생성")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="site_db.csv 를 이 행 수만큼씩 스트리밍 집계 (기본: 한 번에 로드)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="동시에 보낼 GPT 요청 수 (기본: 1, 순차 실행)")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="종료 시 Prometheus 형식 지표를 저장할 경로 (기본: 환경변수 KITTY_METRICS_FILE)")
+    add_shard_arguments(parser, OUTPUT_JSON_PATH)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch-requests", metavar="PATH",
+                      help="GPT 를 호출하지 않고 프롬프트를 배치 요청 JSONL 로 저장 (배치 1단계)")
+    mode.add_argument("--batch-results", metavar="PATH",
+                      help=f"배치 결과 JSONL 을 '{OUTPUT_JSON_PATH}' 의 리포트에 반영 (배치 2단계, "
+                           f"--shard 를 주면 그 shard 의 부분 결과에 반영)")
+    mode.add_argument("--merge", nargs="+", metavar="PARTIAL",
+                      help=f"--shard 로 만든 부분 결과들을 '{OUTPUT_JSON_PATH}' 로 합침")
+    return parser.parse_args()
+
+
+def save_report(output: list[dict], output_path: str = OUTPUT_JSON_PATH):
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+
+def ingest_batch_results(results_path: str, output_path: str = OUTPUT_JSON_PATH):
+    """1단계에서 저장한 site_report.json (또는 shard 부분 결과)에 배치 결과의 report 를 채웁니다."""
+    if not os.path.isfile(output_path):
+        print(f"Error: '{output_path}' 가 없습니다. 먼저 --batch-requests 로 실행하세요.", file=sys.stderr)
+        sys.exit(1)
+    with open(output_path, "r", encoding="utf-8") as f:
+        output = json.load(f)
+    filled = apply_batch_results(output, read_batch_results(results_path), "report", batch_custom_id)
+    save_report(output, output_path)
+    print(f"[INFO] {len(output)}명 중 {filled}명의 리포트를 '{output_path}'에 반영했습니다.")
+
+
 def main():
+    args = parse_args()
+    dump_at_exit(args.metrics_file)
+    if args.merge:
+        count = merge_outputs(args.merge, OUTPUT_JSON_PATH)
+        print(f"[INFO] 부분 결과 {len(args.merge)}개({count}명)를 '{OUTPUT_JSON_PATH}'에 합쳤습니다.")
+        return
+    output_path = shard_output_path(OUTPUT_JSON_PATH, args.shard)
+    if args.batch_results:
+        ingest_batch_results(args.batch_results, output_path)
+        return
+
     # 1) 집계
-    agg_df = load_and_aggregate()
+    agg_df = load_and_aggregate(chunksize=args.chunksize)
+    print(f"[INFO] 평균 유해도 결과를 '{AGG_CSV_PATH}'에 저장했습니다.")
 
     # 2) 사용자별 통계
     stats = build_user_stats(agg_df)
 
-    # 3) 테스트용: 처음 두 사용자만 처리
-    sample_ids = list(stats.keys())[:2]
-
+    # 3) --shard / --users 로 선택한 사용자 (기본: 전체)
+    user_ids = select_users(stats.keys(), args.shard, args.users)
+
+    if args.batch_requests:
+        # 배치 1단계: report 는 비워 두고, 2단계(--batch-results)에서 채움
+        reports = [None] * len(user_ids)
+        write_batch_requests(args.batch_requests, (
+            batch_request(batch_custom_id(uid), make_prompt(uid, stats[uid]), model=MODEL_NAME, max_tokens=512)
+            for uid in user_ids
+        ))
+    else:
+        def on_done(i, result):
+            if isinstance(result, Exception):
+                print(f"[ERROR] 사용자 {user_ids[i]} 보고서 생성 실패: {result}", file=sys.stderr)
+            else:
+                print(f"[INFO] 사용자 {user_ids[i]} 보고서 생성 완료")
+
+        # --concurrency 개씩 동시에 호출, 결과는 사용자 순서대로
+        reports = run_concurrently(generate_user_report, [(uid, stats[uid]) for uid in user_ids],
+                                   args.concurrency, on_done=on_done)
     output = []
-    for uid in sample_ids:
-        print(f"[INFO] 사용자 {uid} 보고서 생성 중...")
+    for uid, report in zip(user_ids, reports):
         entry = {"user_id": uid, **stats[uid]}
-        entry["report"] = generate_user_report(uid, stats[uid])
+        entry["report"] = None if isinstance(report, Exception) else report
         output.append(entry)
 
     # 4) JSON 저장
-    with open(OUTPUT_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-    print(f"[INFO] 최종 리포트를 '{OUTPUT_JSON_PATH}'에 저장했습니다.")
+    save_report(output, output_path)
+    print(f"[INFO] 최종 리포트를 '{output_path}'에 저장했습니다.")
 
 
 if __name__ == "__main__":
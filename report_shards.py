@@ -0,0 +1,132 @@
+"""
+report_shards.py
+
+chat_report.py / report_generator_site.py 를 여러 머신에 나눠 실행하기 위한 사용자 분할 · 병합 도구.
+
+- --shard i/N : 사용자 id 의 안정 해시(crc32)로 N개 중 i번째(0부터) 몫만 처리
+                (프로세스 · 머신 · Python 버전이 달라도 같은 사용자는 같은 shard)
+- --users     : 쉼표로 구분한 사용자 id 만 처리 (--shard 와 함께 쓰면 둘 다 만족하는 사용자)
+- shard 결과는 '<출력>.shard-i-of-N.json' 에 따로 저장되고, --merge 로 최종 파일에 합칩니다.
+  합친 결과는 user_id 순서로, 한 프로세스에서 전체를 처리한 결과와 같은 형식입니다.
+
+    python chat_report.py --shard 0/4          # 머신 0 → chat_report.shard-0-of-4.json
+    python chat_report.py --shard 3/4          # 머신 3 (실패하면 이 shard 만 다시 실행)
+    python chat_report.py --merge chat_report.shard-*.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import zlib
+from typing import Iterable, List, NamedTuple, Optional, Set
+
+SHARD_PATTERN = re.compile(r"\.shard-(\d+)-of-(\d+)\.json$")
+
+
+class Shard(NamedTuple):
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(value: str) -> Shard:
+    """'i/N' (0 <= i < N). argparse type 으로 씁니다."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"'{value}': i/N 형식이어야 합니다 (예: 0/4)")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index >= count:
+        raise argparse.ArgumentTypeError(f"'{value}': 0 <= i < N 이어야 합니다")
+    return Shard(index, count)
+
+
+def parse_users(value: str) -> Set[int]:
+    """'1,2,17' → {1, 2, 17}. argparse type 으로 씁니다."""
+    try:
+        users = {int(v) for v in value.split(",") if v.strip()}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}': 쉼표로 구분한 정수 id 여야 합니다")
+    if not users:
+        raise argparse.ArgumentTypeError("사용자 id 가 비어 있습니다")
+    return users
+
+
+def shard_of(user_id, count: int) -> int:
+    """사용자 id 가 속한 shard 번호. hash() 와 달리 실행마다 바뀌지 않습니다."""
+    return zlib.crc32(str(int(user_id)).encode("ascii")) % count
+
+
+def in_selection(user_id, shard: Optional[Shard], users: Optional[Set[int]]) -> bool:
+    if users is not None and int(user_id) not in users:
+        return False
+    return shard is None or shard_of(user_id, shard.count) == shard.index
+
+
+def select_users(user_ids: Iterable, shard: Optional[Shard], users: Optional[Set[int]]) -> list:
+    """user_ids 중 선택된 사용자 (순서 유지)."""
+    return [uid for uid in user_ids if in_selection(uid, shard, users)]
+
+
+def add_arguments(parser: argparse.ArgumentParser, output_path: str):
+    """--shard / --users 옵션을 parser 에 추가합니다. --merge 는 각 CLI 의 모드 그룹에 둡니다."""
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                        help=f"사용자 id 해시로 N개로 나눈 것 중 i번째(0부터)만 처리, "
+                             f"결과는 '{os.path.splitext(output_path)[0]}.shard-i-of-N.json' 에 저장")
+    parser.add_argument("--users", type=parse_users, default=None, metavar="ID,ID,...",
+                        help="쉼표로 구분한 사용자 id 만 처리")
+
+
+def shard_output_path(path: str, shard: Optional[Shard]) -> str:
+    """shard 의 부분 결과 경로. shard 가 없으면 path 그대로."""
+    if shard is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{shard.index}-of-{shard.count}{ext or '.json'}"
+
+
+def check_complete(paths: List[str]):
+    """파일 이름의 shard 번호로 빠진 shard 가 없는지 확인합니다. 빠졌으면 종료 코드 1."""
+    found = {}
+    for path in paths:
+        match = SHARD_PATTERN.search(path)
+        if match:
+            found.setdefault(int(match.group(2)), set()).add(int(match.group(1)))
+    if len(found) > 1:
+        print(f"Error: shard 개수(N)가 서로 다른 부분 결과가 섞여 있습니다: {sorted(found)}", file=sys.stderr)
+        sys.exit(1)
+    for count, indexes in found.items():
+        missing = sorted(set(range(count)) - indexes)
+        if missing:
+            print(f"Error: {count}개 중 shard {missing} 의 부분 결과가 없습니다.", file=sys.stderr)
+            sys.exit(1)
+
+
+def merge_outputs(paths: List[str], output_path: str) -> int:
+    """
+    부분 결과(JSON 목록)들을 user_id 순서로 합쳐 output_path 에 저장하고 사용자 수를 반환합니다.
+    같은 사용자가 여러 파일에 있으면 뒤에 주어진 파일의 항목을 씁니다.
+    """
+    check_complete(paths)
+    merged = {}
+    for path in paths:
+        if not os.path.isfile(path):
+            print(f"Error: '{path}' 파일을 찾을 수 없습니다.", file=sys.stderr)
+            sys.exit(1)
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            uid = int(entry["user_id"])
+            if uid in merged:
+                print(f"[WARN] 사용자 {uid} 가 여러 부분 결과에 있습니다. '{path}' 의 항목을 사용합니다.")
+            merged[uid] = entry
+
+    output = [merged[uid] for uid in sorted(merged)]
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_path)
+    return len(output)
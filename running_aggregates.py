@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .storage import HARM_COLUMNS
+except ImportError:
+    from storage import HARM_COLUMNS
+
+
+class RunningMeanAggregator:
+    """
+    청크 단위로 키(예: id 또는 (id, site))별 평균을 누적 계산합니다. 메모리는 행 수가 아니라 키 개수에 비례합니다.
+
+    pandas groupby().mean() 과 같은 Kahan 보정 합을 키마다 유지하고, 청크가 바뀌어도
+    행 순서대로 이어서 더하므로 전체를 한 번에 읽은 결과와 비트 단위까지 같습니다.
+    """
+
+    def __init__(self, key_columns: List[str], value_columns: List[str] = HARM_COLUMNS):
+        self.key_columns = key_columns
+        self.value_columns = value_columns
+        self.slots: Dict[Tuple, int] = {}
+        self.keys: List[Tuple] = []
+        width = len(value_columns)
+        self.sumx = np.zeros((0, width))
+        self.comp = np.zeros((0, width))
+        self.nobs = np.zeros((0, width), dtype=np.int64)
+
+    def _grow(self, size: int):
+        extra = size - len(self.sumx)
+        if extra <= 0:
+            return
+        capacity = max(size, 2 * len(self.sumx))
+        pad = capacity - len(self.sumx)
+        width = len(self.value_columns)
+        self.sumx = np.vstack([self.sumx, np.zeros((pad, width))])
+        self.comp = np.vstack([self.comp, np.zeros((pad, width))])
+        self.nobs = np.vstack([self.nobs, np.zeros((pad, width), dtype=np.int64)])
+
+    def update(self, chunk: pd.DataFrame):
+        chunk = chunk.dropna(subset=self.key_columns)
+        n = len(chunk)
+        if n == 0:
+            return
+
+        # 청크 내 키 → 전역 슬롯 번호
+        local = chunk.groupby(self.key_columns, sort=False).ngroup().to_numpy()
+        _, first_rows = np.unique(local, return_index=True)
+        key_frame = chunk[self.key_columns].iloc[first_rows]
+        local_to_slot = np.empty(len(first_rows), dtype=np.int64)
+        for code, key in enumerate(key_frame.itertuples(index=False, name=None)):
+            slot = self.slots.get(key)
+            if slot is None:
+                slot = self.slots[key] = len(self.keys)
+                self.keys.append(key)
+            local_to_slot[code] = slot
+        self._grow(len(self.keys))
+        slot_of_row = local_to_slot[local]
+
+        # 키마다 몇 번째 행인지(rank) 계산 → 같은 rank 끼리는 키가 겹치지 않으므로 한 번에 더할 수 있음
+        order = np.argsort(slot_of_row, kind="stable")
+        sorted_slots = slot_of_row[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_slots)) + 1]
+        rank = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+        by_rank = order[np.argsort(rank, kind="stable")]
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))]
+
+        values = chunk[self.value_columns].to_numpy(dtype=np.float64)
+        for r in range(len(bounds) - 1):
+            rows = by_rank[bounds[r]:bounds[r + 1]]
+            slots = slot_of_row[rows]
+            vals = values[rows]
+            mask = ~np.isnan(vals)
+            sumx, comp = self.sumx[slots], self.comp[slots]
+            y = vals - comp
+            t = sumx + y
+            new_comp = (t - sumx) - y
+            new_comp[np.isnan(new_comp)] = 0.0
+            self.sumx[slots] = np.where(mask, t, sumx)
+            self.comp[slots] = np.where(mask, new_comp, comp)
+            self.nobs[slots] += mask
+
+    def result(self) -> pd.DataFrame:
+        size = len(self.keys)
+        nobs = self.nobs[:size]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(nobs > 0, self.sumx[:size] / np.maximum(nobs, 1), np.nan)
+        out = pd.DataFrame(self.keys, columns=self.key_columns)
+        out[self.value_columns] = means
+        return out.sort_values(self.key_columns, kind="stable").reset_index(drop=True)
+
+    def means(self, key: Tuple) -> Optional[Dict[str, float]]:
+        """한 키의 카테고리별 평균 (값이 없는 카테고리는 NaN). 키가 없으면 None."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        nobs = self.nobs[slot]
+        return {
+            col: float(self.sumx[slot, j] / nobs[j]) if nobs[j] else float("nan")
+            for j, col in enumerate(self.value_columns)
+        }
+
+    def to_state(self) -> dict:
+        size = len(self.keys)
+        return {
+            "key_columns": self.key_columns,
+            "value_columns": self.value_columns,
+            "keys": [[v.item() if hasattr(v, "item") else v for v in key] for key in self.keys],
+            "sumx": self.sumx[:size].tolist(),
+            "comp": self.comp[:size].tolist(),
+            "nobs": self.nobs[:size].tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RunningMeanAggregator":
+        agg = cls(state["key_columns"], state["value_columns"])
+        agg.keys = [tuple(key) for key in state["keys"]]
+        agg.slots = {key: slot for slot, key in enumerate(agg.keys)}
+        width = len(agg.value_columns)
+        agg.sumx = np.array(state["sumx"], dtype=np.float64).reshape(-1, width)
+        agg.comp = np.array(state["comp"], dtype=np.float64).reshape(-1, width)
+        agg.nobs = np.array(state["nobs"], dtype=np.int64).reshape(-1, width)
+        return agg
@@ -1,24 +1,57 @@
-import os
 import sys
-import pandas as pd
+from typing import TYPE_CHECKING, Iterable, Optional
 
-RAW_CSV_PATH = "site_db.csv"
+try:
+    from .storage import CSV_PATHS, SITE_TABLE, get_storage
+except ImportError:
+    from storage import CSV_PATHS, SITE_TABLE, get_storage
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+RAW_CSV_PATH = CSV_PATHS[SITE_TABLE]
 AGG_CSV_PATH = "site_harmfulness_by_id.csv"
 
 HARM_COLUMNS = ["abuse", "censure", "discrimination", "hate", "sexual", "violence"]
+KEY_COLUMNS = ["id", "site"]
+
+
+def aggregate_in_chunks(chunks: Iterable["pd.DataFrame"]) -> "pd.DataFrame":
+    try:
+        from .running_aggregates import RunningMeanAggregator
+    except ImportError:
+        from running_aggregates import RunningMeanAggregator
+
+    aggregator = RunningMeanAggregator(KEY_COLUMNS)
+    for chunk in chunks:
+        _check_columns(chunk)
+        aggregator.update(chunk)
+    return aggregator.result()
 
-def load_and_aggregate() -> pd.DataFrame:
-    if not os.path.isfile(RAW_CSV_PATH):
-        print(f"Error: '{RAW_CSV_PATH}' 파일을 찾을 수 없습니다.", file=sys.stderr)
-        sys.exit(1)
 
-    df = pd.read_csv(RAW_CSV_PATH)
-    for col in ["id", "site"] + HARM_COLUMNS:
+def _check_columns(df: "pd.DataFrame"):
+    for col in KEY_COLUMNS + HARM_COLUMNS:
         if col not in df.columns:
             print(f"Error: '{col}' 컬럼이 없습니다.", file=sys.stderr)
             sys.exit(1)
 
-    agg = df.groupby(["id", "site"], as_index=False)[HARM_COLUMNS].mean()
+
+def load_and_aggregate(chunksize: Optional[int] = None) -> "pd.DataFrame":
+    """
+    site_db → id·site별 평균 유해도 계산 → site_harmfulness_by_id.csv 저장 → DataFrame 반환
+    chunksize 를 주면 파일 전체를 메모리에 올리지 않고 청크 단위로 스트리밍 집계합니다.
+    """
+    storage = get_storage()
+    if not storage.exists(SITE_TABLE):
+        print(f"Error: '{RAW_CSV_PATH}' 파일을 찾을 수 없습니다.", file=sys.stderr)
+        sys.exit(1)
+
+    if chunksize:
+        agg = aggregate_in_chunks(storage.read_table_chunks(SITE_TABLE, chunksize))
+    else:
+        df = storage.read_table(SITE_TABLE)
+        _check_columns(df)
+        agg = df.groupby(KEY_COLUMNS, as_index=False)[HARM_COLUMNS].mean()
+
     agg.to_csv(AGG_CSV_PATH, index=False, encoding="utf-8")
     return agg
-
@@ -1,7 +1,8 @@
-import openai
-import os
+try:
+    from .llm_gateway import get_gateway
+except ImportError:
+    from llm_gateway import get_gateway
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
 MODEL_NAME = "gpt-4o-mini"
 
 def make_prompt(uid: int, stat: dict) -> str:
@@ -20,11 +21,5 @@ def make_prompt(uid: int, stat: dict) -> str:
 
 def generate_user_report(uid: int, stat: dict) -> str:
     prompt = make_prompt(uid, stat)
-    response = openai.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=512
-    )
-    return response.choices[0].message.content.strip()
+    return get_gateway().complete(prompt, model=MODEL_NAME, temperature=0.7, max_tokens=512).strip()
 
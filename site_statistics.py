@@ -1,28 +1,79 @@
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 HARM_COLUMNS = ["abuse", "censure", "discrimination", "hate", "sexual", "violence"]
+TOP_K = 5
 
-def build_user_stats(agg_df: pd.DataFrame) -> dict[int, dict]:
-    stats = {}
-    for uid, sub in agg_df.groupby("id"):
-        uid = int(uid)
-        cat_means = sub[HARM_COLUMNS].mean()
-        highest_avg_cat = cat_means.idxmax()
-        highest_avg_val = float(cat_means.max())
-
-        tmp = sub.copy()
-        tmp["sum_harm"] = tmp[HARM_COLUMNS].sum(axis=1)
-        top5 = tmp.nlargest(5, "sum_harm")[["site", "sum_harm"]]
-        top5_list = [{"site": row["site"], "sum": float(row["sum_harm"])} for _, row in top5.iterrows()]
-        means_dict = {cat: float(cat_means[cat]) for cat in HARM_COLUMNS}
+def build_user_stats(agg_df: "pd.DataFrame", top_k: int = TOP_K) -> dict[int, dict]:
+    """
+    사용자별로 다음 통계를 계산하여 dict로 반환:
+      1) highest_avg_category: 카테고리별 평균이 가장 높은 항목
+      2) top5_sites_by_sum: 사이트별 유해성 합(sum_harm)이 가장 높은 사이트 top_k개 (키 이름은 호환을 위해 유지)
+      3) category_means: 6개 카테고리별 평균값
+
+    사용자 루프 없이 전체 사용자를 한 번에 계산합니다. id 로 안정 정렬해 사용자별 행을
+    연속 구간으로 만든 뒤, 평균은 구간 길이별로 묶은 합으로,
+    top_k 는 (id, -sum_harm) 안정 정렬 후 사용자별 앞쪽 k개로 구합니다.
+    동점은 nlargest(keep="first") 처럼 원래 행 순서를 따릅니다.
+    """
+    import numpy as np
+
+    df = agg_df.dropna(subset=["id"])
+    if df.empty:
+        return {}
+
+    # 1) 사용자별 연속 구간 (groupby("id") 와 같은 id 오름차순, 구간 안은 원래 순서)
+    order = np.argsort(df["id"].to_numpy(), kind="stable")
+    ids = df["id"].to_numpy()[order]
+    starts = np.r_[0, np.flatnonzero(ids[1:] != ids[:-1]) + 1]
+    uids = ids[starts].astype(np.int64).tolist()
 
+    # 2) 카테고리별 평균 (NaN 제외) → 최댓값 카테고리
+    values = df[HARM_COLUMNS].to_numpy(dtype=np.float64)[order].T.copy()
+    missing = np.isnan(values)
+    values[missing] = 0.0
+    counts = np.add.reduceat(~missing, starts, axis=1).T
+    # 길이가 같은 구간끼리 (6, 사용자 수, 길이) 배열로 모아 마지막 축으로 합산:
+    # 구간마다 np.sum 을 부르는 것과 같은 pairwise 합이라 pandas 평균과 비트 단위까지 같음
+    lengths = np.diff(np.r_[starts, len(df)])
+    sums = np.empty((len(starts), len(HARM_COLUMNS)))
+    for length in np.unique(lengths):
+        users = np.flatnonzero(lengths == length)
+        rows = starts[users][:, None] + np.arange(length)
+        sums[users] = np.ascontiguousarray(values[:, rows]).sum(axis=2).T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    best = np.argmax(np.where(np.isnan(means), -np.inf, means), axis=1)
+    best_val = np.nanmax(np.where(np.isnan(means), -np.inf, means), axis=1)
+    best_val[np.isnan(means).all(axis=1)] = np.nan
+
+    # 3) 사이트별 유해성 합(sum_harm) → 사용자별 top_k
+    sum_harm = df[HARM_COLUMNS].sum(axis=1).to_numpy()
+    user_codes = np.empty(len(df), dtype=np.int64)
+    user_codes[order] = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(df)]))
+    ranked = np.lexsort((-sum_harm, user_codes))
+    ranked_codes = user_codes[ranked]
+    group_start = np.r_[0, np.flatnonzero(ranked_codes[1:] != ranked_codes[:-1]) + 1]
+    rank = np.arange(len(ranked)) - np.repeat(group_start, np.diff(np.r_[group_start, len(ranked)]))
+    top = ranked[rank < top_k]
+    top_sites = df["site"].to_numpy()[top].tolist()
+    top_sums = sum_harm[top].tolist()
+    top_bounds = np.r_[0, np.cumsum(np.bincount(user_codes[top], minlength=len(starts)))].tolist()
+
+    stats = {}
+    for i, uid in enumerate(uids):
         stats[uid] = {
             "highest_avg_category": {
-                "category": highest_avg_cat,
-                "average": highest_avg_val
+                "category": HARM_COLUMNS[best[i]],
+                "average": float(best_val[i])
             },
-            "top5_sites_by_sum": top5_list,
-            "category_means": means_dict
+            "top5_sites_by_sum": [
+                {"site": site, "sum": float(total)}
+                for site, total in zip(top_sites[top_bounds[i]:top_bounds[i + 1]],
+                                       top_sums[top_bounds[i]:top_bounds[i + 1]])
+            ],
+            "category_means": dict(zip(HARM_COLUMNS, means[i].tolist()))
         }
     return stats
-
@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+"""
+storage.py
+
+chat_db / site_db 저장소 추상화.
+
+- CsvBackend   : 기존 chat_db.csv / site_db.csv (호환용 기본값)
+- SqliteBackend: 내장 SQLite 저장소. chat(id), site(id), site(id, site) 인덱스로
+                 사용자별 조회·추가가 전체 스캔 없이 로그 시간에 처리됩니다.
+
+백엔드 선택: 환경변수 KITTY_STORAGE_BACKEND=csv|sqlite, KITTY_SQLITE_PATH=kitty.db
+
+기존 CSV → SQLite 가져오기:
+    python storage.py import --db kitty.db --chat chat_db.csv --site site_db.csv
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import sqlite3
+import sys
+import threading
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .csv_records import read_header
+    from .file_lock import file_lock
+except ImportError:
+    from csv_records import read_header
+    from file_lock import file_lock
+
+# pandas 와 색인 · 집계 모듈은 처음 쓰는 메서드에서 import (append 헬퍼 import 를 가볍게 유지)
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from harmful_words import WordTable
+    from harmfulness_aggregates import CsvHarmfulnessAggregates
+
+STORAGE_BACKEND = os.getenv("KITTY_STORAGE_BACKEND", "csv")
+SQLITE_PATH = os.getenv("KITTY_SQLITE_PATH", "kitty.db")
+
+CHAT_TABLE = "chat"
+SITE_TABLE = "site"
+CSV_PATHS = {CHAT_TABLE: "chat_db.csv", SITE_TABLE: "site_db.csv"}
+# 두 테이블 공통의 유해성 카테고리 컬럼
+HARM_COLUMNS = ["abuse", "censure", "discrimination", "hate", "sexual", "violence"]
+
+# Materialized harmfulness aggregates kept per table
+AGGREGATE_KEYS = {
+    CHAT_TABLE: [("id",)],
+    SITE_TABLE: [("id",), ("id", "site")],
+}
+
+# Harmful word table kept by the SQLite backend next to chat (see SqliteBackend._ensure_words)
+WORDS_TABLE = f"{CHAT_TABLE}_words"
+VOCAB_TABLE = f"{CHAT_TABLE}_vocab"
+WORDS_STATE_TABLE = f"{CHAT_TABLE}_words_state"
+
+# Per-table indexes created by the SQLite backend
+SQLITE_INDEXES = {
+    CHAT_TABLE: [("id",), ("id", "ai_harmfulness")],
+    SITE_TABLE: [("id",), ("id", "site")],
+}
+IMPORT_CHUNK_SIZE = 50_000
+
+
+class StorageBackend:
+    """저장소 공통 인터페이스. table 은 "chat" 또는 "site" 입니다."""
+
+    def exists(self, table: str) -> bool:
+        raise NotImplementedError
+
+    def columns(self, table: str) -> List[str]:
+        raise NotImplementedError
+
+    def append_rows(self, table: str, rows: List[dict]):
+        raise NotImplementedError
+
+    def read_table(self, table: str) -> "pd.DataFrame":
+        raise NotImplementedError
+
+    def read_table_chunks(self, table: str, chunksize: int) -> Iterator["pd.DataFrame"]:
+        """테이블을 chunksize 행씩 나눠 읽습니다(전체를 메모리에 올리지 않음)."""
+        raise NotImplementedError
+
+    def harmfulness_means(self, table: str, user_id: int) -> Optional[Dict[str, float]]:
+        """id 별 6개 유해성 카테고리 평균(항상 최신 데이터 기준). 해당 id 가 없으면 None."""
+        raise NotImplementedError
+
+    def harmfulness_table(self, table: str, key_columns: Tuple[str, ...] = ("id",)) -> "pd.DataFrame":
+        """key_columns(("id",) 또는 ("id", "site"))별 카테고리 평균 테이블."""
+        raise NotImplementedError
+
+    def harmful_words(self) -> "WordTable":
+        """chat 테이블의 harmful_words 를 (행 번호, 사용자 id, 단어 id) 로 펼친 테이블."""
+        raise NotImplementedError
+
+    def data_version(self, table: str) -> Optional[Tuple]:
+        """테이블 내용이 바뀌면 달라지는 값(파일 크기·수정 시각). 캐시 무효화에 씁니다."""
+        raise NotImplementedError
+
+    def user_harmful_count(self, user_id: int) -> int:
+        raise NotImplementedError
+
+    def user_harmful_rows(self, user_id: int) -> "pd.DataFrame":
+        """사용자의 유해 채팅 행. index 는 추가 순서대로 증가하는 행 키입니다."""
+        raise NotImplementedError
+
+
+def check_columns(columns: List[str], new_data: dict):
+    """헤더(스키마)에 없는 컬럼이 있으면 ValueError. 헤더가 아직 없으면 통과합니다."""
+    if not columns:
+        return
+    missing_cols = set(new_data.keys()) - set(columns)
+    if missing_cols:
+        raise ValueError(f"[ERROR] 존재하지 않는 컬럼: {missing_cols}")
+
+
+# ─── CSV ──────────────────────────────────────────────────────────────────────
+
+def _csv_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return value
+
+
+def append_csv_rows(path: str, rows: List[dict]):
+    """
+    파일을 다시 읽지 않고 append 모드로 행을 추가합니다(헤더 한 줄만 읽음).
+    행은 헤더 순서에 맞춰 쓰고, 없는 컬럼은 빈 값으로 둡니다. 파일이 없으면 첫 행의 키로 헤더를 만듭니다.
+    """
+    with file_lock(path):
+        columns = read_header(path)[0]
+        write_header = not columns
+        if write_header:
+            columns = list(dict.fromkeys(c for row in rows for c in row))
+
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        if write_header:
+            writer.writerow(columns)
+        writer.writerows([_csv_value(row.get(c)) for c in columns] for row in rows)
+        data = buf.getvalue().encode("utf-8")
+
+        with open(path, "a+b") as f:
+            if not write_header and f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+
+
+def _stat_version(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class CsvBackend(StorageBackend):
+    def __init__(self, paths: Optional[Dict[str, str]] = None):
+        self.paths = dict(CSV_PATHS, **(paths or {}))
+        self._aggregates: Dict[str, "CsvHarmfulnessAggregates"] = {}
+        self._aggregates_lock = threading.Lock()
+
+    def _aggregates_for(self, table: str) -> "CsvHarmfulnessAggregates":
+        try:
+            from .harmfulness_aggregates import CsvHarmfulnessAggregates
+        except ImportError:
+            from harmfulness_aggregates import CsvHarmfulnessAggregates
+
+        with self._aggregates_lock:
+            aggregates = self._aggregates.get(table)
+            if aggregates is None:
+                keys = [list(k) for k in AGGREGATE_KEYS[table]]
+                aggregates = self._aggregates[table] = CsvHarmfulnessAggregates(self.paths[table], keys)
+            return aggregates
+
+    def exists(self, table: str) -> bool:
+        return os.path.isfile(self.paths[table])
+
+    def columns(self, table: str) -> List[str]:
+        return read_header(self.paths[table])[0]
+
+    def append_rows(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        path = self.paths[table]
+        if table == CHAT_TABLE:
+            try:
+                from .chat_index import get_chat_index
+                from .chat_wal import get_append_log
+                from .harmful_words import get_word_index
+            except ImportError:
+                from chat_index import get_chat_index
+                from chat_wal import get_append_log
+                from harmful_words import get_word_index
+
+            get_append_log(path).append(rows)
+            get_chat_index(path).refresh()
+            get_word_index(path).refresh()
+        else:
+            append_csv_rows(path, rows)
+        # Fold just the appended tail into the materialized aggregates
+        self._aggregates_for(table).refresh()
+
+    def read_table(self, table: str) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.read_csv(self.paths[table])
+
+    def read_table_chunks(self, table: str, chunksize: int) -> Iterator["pd.DataFrame"]:
+        import pandas as pd
+
+        with pd.read_csv(self.paths[table], chunksize=chunksize) as reader:
+            yield from reader
+
+    def harmfulness_means(self, table: str, user_id: int) -> Optional[Dict[str, float]]:
+        if not self.exists(table):
+            return None
+        return self._aggregates_for(table).means(("id",), (user_id,))
+
+    def harmfulness_table(self, table: str, key_columns: Tuple[str, ...] = ("id",)) -> "pd.DataFrame":
+        return self._aggregates_for(table).table(tuple(key_columns))
+
+    def harmful_words(self) -> "WordTable":
+        try:
+            from .harmful_words import get_word_index
+        except ImportError:
+            from harmful_words import get_word_index
+
+        return get_word_index(self.paths[CHAT_TABLE]).table()
+
+    def data_version(self, table: str) -> Optional[Tuple]:
+        return _stat_version(self.paths[table])
+
+    def user_harmful_count(self, user_id: int) -> int:
+        try:
+            from .chat_index import get_chat_index
+        except ImportError:
+            from chat_index import get_chat_index
+
+        if not self.exists(CHAT_TABLE):
+            return 0
+        return get_chat_index(self.paths[CHAT_TABLE]).harmful_count(user_id)
+
+    def user_harmful_rows(self, user_id: int) -> "pd.DataFrame":
+        """행 키는 chat_db.csv 안의 바이트 오프셋입니다."""
+        import pandas as pd
+        try:
+            from .chat_index import get_chat_index
+        except ImportError:
+            from chat_index import get_chat_index
+
+        if not self.exists(CHAT_TABLE):
+            return pd.DataFrame()
+        return get_chat_index(self.paths[CHAT_TABLE]).read_harmful_rows(user_id)
+
+
+# ─── SQLite ───────────────────────────────────────────────────────────────────
+
+def _sql_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):  # numpy scalar
+        return value.item()
+    return value
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteBackend(StorageBackend):
+    """
+    테이블 컬럼은 가져온 CSV 헤더(또는 첫 추가 행)를 따르며, 선언 타입 없이 값을 그대로 저장합니다.
+    새 컬럼이 들어오면 ALTER TABLE 로 추가합니다. 행 키는 SQLite rowid 입니다.
+    chat 의 harmful_words 는 chat_words / chat_vocab 테이블에 펼쳐 저장하고, 행을 추가할 때 함께 갱신합니다.
+    """
+
+    def __init__(self, db_path: str = SQLITE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def exists(self, table: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone()
+        return row is not None
+
+    def columns(self, table: str) -> List[str]:
+        return [row[1] for row in self._conn().execute(f"PRAGMA table_info({_quote(table)})")]
+
+    def _ensure_table(self, conn: sqlite3.Connection, table: str, columns: List[str]):
+        existing = self.columns(table)
+        if not existing:
+            cols = ", ".join(_quote(c) for c in columns)
+            conn.execute(f"CREATE TABLE {_quote(table)} ({cols})")
+            for index_cols in SQLITE_INDEXES.get(table, []):
+                if all(c in columns for c in index_cols):
+                    name = f"idx_{table}_{'_'.join(index_cols)}"
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} "
+                        f"({', '.join(_quote(c) for c in index_cols)})"
+                    )
+            return
+        for col in columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)}")
+
+    def append_rows(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        columns = list(dict.fromkeys(c for row in rows for c in row))
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders})"
+        conn = self._conn()
+        with self._write_lock, conn:
+            self._ensure_table(conn, table, columns)
+            self._ensure_aggregates(conn, table)
+            if table == CHAT_TABLE:
+                self._ensure_words(conn)
+            conn.executemany(sql, [[_sql_value(row.get(c)) for c in columns] for row in rows])
+            self._update_aggregates(conn, table, rows)
+            if table == CHAT_TABLE:
+                self._update_words(conn, rows)
+
+    # --- Materialized aggregates: {table}_agg_{keys}(keys..., sum_<cat>, n_<cat>) ---
+    @staticmethod
+    def _agg_table(table: str, key_columns: Tuple[str, ...]) -> str:
+        return f"{table}_agg_{'_'.join(key_columns)}"
+
+    def _ensure_aggregates(self, conn: sqlite3.Connection, table: str):
+        """집계 테이블이 없으면 만들고, 기존 행으로 한 번 채웁니다."""
+        base_columns = self.columns(table)
+        for key_columns in AGGREGATE_KEYS.get(table, []):
+            agg_table = self._agg_table(table, key_columns)
+            if self.columns(agg_table):
+                continue
+            keys = ", ".join(_quote(k) for k in key_columns)
+            value_defs = ", ".join(f"{_quote('sum_' + c)} REAL DEFAULT 0, {_quote('n_' + c)} INTEGER DEFAULT 0"
+                                   for c in HARM_COLUMNS)
+            conn.execute(f"CREATE TABLE {_quote(agg_table)} ({keys}, {value_defs}, PRIMARY KEY ({keys}))")
+            if not all(k in base_columns for k in key_columns):
+                continue
+            present = [c for c in HARM_COLUMNS if c in base_columns]
+            targets = ", ".join([keys] + [f"{_quote('sum_' + c)}, {_quote('n_' + c)}" for c in present])
+            selects = ", ".join([keys] + [f"TOTAL({_quote(c)}), COUNT({_quote(c)})" for c in present])
+            not_null = " AND ".join(f"{_quote(k)} IS NOT NULL" for k in key_columns)
+            conn.execute(
+                f"INSERT INTO {_quote(agg_table)} ({targets}) "
+                f"SELECT {selects} FROM {_quote(table)} WHERE {not_null} GROUP BY {keys}"
+            )
+
+    def _update_aggregates(self, conn: sqlite3.Connection, table: str, rows: List[dict]):
+        import pandas as pd
+
+        df = pd.DataFrame(rows)
+        if "id" not in df.columns:
+            return
+        df["id"] = pd.to_numeric(df["id"], errors="coerce")
+        for col in HARM_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce") if col in df.columns else float("nan")
+        for key_columns in AGGREGATE_KEYS.get(table, []):
+            if not all(k in df.columns for k in key_columns):
+                continue
+            grouped = df.dropna(subset=list(key_columns)).groupby(list(key_columns))[HARM_COLUMNS]
+            batch = pd.concat([grouped.sum().add_prefix("sum_"), grouped.count().add_prefix("n_")], axis=1)
+            agg_table = self._agg_table(table, key_columns)
+            value_columns = list(batch.columns)
+            all_columns = list(key_columns) + value_columns
+            updates = ", ".join(f"{_quote(c)} = {_quote(c)} + excluded.{_quote(c)}" for c in value_columns)
+            conn.executemany(
+                f"INSERT INTO {_quote(agg_table)} ({', '.join(_quote(c) for c in all_columns)}) "
+                f"VALUES ({', '.join('?' for _ in all_columns)}) "
+                f"ON CONFLICT ({', '.join(_quote(k) for k in key_columns)}) DO UPDATE SET {updates}",
+                [[_sql_value(v) for v in (key if isinstance(key, tuple) else (key,))] +
+                 [_sql_value(v) for v in values]
+                 for key, values in zip(batch.index, batch.itertuples(index=False, name=None))],
+            )
+
+    # --- Harmful words: chat_vocab(word_id, word), chat_words(row_num, user_id, word_id), chat_words_state(n_rows) ---
+    def _ensure_words(self, conn: sqlite3.Connection):
+        """유해 단어 테이블이 없으면 만들고, 기존 chat 행의 harmful_words 를 한 번 파싱해 채웁니다."""
+        if self.columns(WORDS_STATE_TABLE):
+            return
+        import pandas as pd
+        try:
+            from .harmful_words import HARMFUL_WORDS_COL, WordTableBuilder
+        except ImportError:
+            from harmful_words import HARMFUL_WORDS_COL, WordTableBuilder
+
+        builder = WordTableBuilder()
+        if self.exists(CHAT_TABLE):
+            # rowid 도 읽어 단어가 없는 행까지 행 번호에 셉니다
+            columns = self.columns(CHAT_TABLE)
+            selects = ", ".join(["rowid"] + [_quote(c) for c in ("id", HARMFUL_WORDS_COL) if c in columns])
+            for chunk in pd.read_sql_query(
+                f"SELECT {selects} FROM {_quote(CHAT_TABLE)} ORDER BY rowid", conn, chunksize=IMPORT_CHUNK_SIZE
+            ):
+                builder.add_frame(chunk)
+        table = builder.table()
+
+        conn.execute(f"CREATE TABLE {_quote(VOCAB_TABLE)} (word_id INTEGER PRIMARY KEY, word TEXT NOT NULL UNIQUE)")
+        conn.execute(f"CREATE TABLE {_quote(WORDS_TABLE)} "
+                     f"(row_num INTEGER NOT NULL, user_id INTEGER NOT NULL, word_id INTEGER NOT NULL)")
+        conn.execute(f"CREATE TABLE {_quote(WORDS_STATE_TABLE)} (n_rows INTEGER NOT NULL)")
+        conn.executemany(f"INSERT INTO {_quote(VOCAB_TABLE)} (word_id, word) VALUES (?, ?)", enumerate(table.vocab))
+        self._insert_words(conn, table.row_ids, table.user_ids, table.word_ids)
+        conn.execute(f"INSERT INTO {_quote(WORDS_STATE_TABLE)} (n_rows) VALUES (?)", (builder.n_rows,))
+
+    def _update_words(self, conn: sqlite3.Connection, rows: List[dict]):
+        """추가된 행의 단어만 파싱해 이어 붙입니다. 행 번호는 chat 의 rowid 순서(0부터)입니다."""
+        import numpy as np
+        import pandas as pd
+        try:
+            from .harmful_words import WordTableBuilder
+        except ImportError:
+            from harmful_words import WordTableBuilder
+
+        builder = WordTableBuilder()
+        builder.add_frame(pd.DataFrame(rows))
+        table = builder.table()
+        n_rows = conn.execute(f"SELECT n_rows FROM {_quote(WORDS_STATE_TABLE)}").fetchone()[0]
+        if table.vocab:
+            # 전체 파싱과 같은 사전이 되도록 배치에서 파싱한 단어는 모두 등록
+            word_ids = np.asarray(self._intern_words(conn, table.vocab), dtype=np.int64)
+            self._insert_words(conn, table.row_ids + n_rows, table.user_ids, word_ids[table.word_ids])
+        conn.execute(f"UPDATE {_quote(WORDS_STATE_TABLE)} SET n_rows = ?", (n_rows + builder.n_rows,))
+
+    @staticmethod
+    def _intern_words(conn: sqlite3.Connection, words: List[str]) -> List[int]:
+        """words 의 단어 id. 사전에 없는 단어는 다음 id(0부터 연속)로 추가합니다."""
+        ids: Dict[str, int] = {}
+        for start in range(0, len(words), 500):
+            batch = words[start:start + 500]
+            ids.update(conn.execute(
+                f"SELECT word, word_id FROM {_quote(VOCAB_TABLE)} WHERE word IN ({', '.join('?' for _ in batch)})",
+                batch,
+            ))
+        next_id = conn.execute(f"SELECT COALESCE(MAX(word_id) + 1, 0) FROM {_quote(VOCAB_TABLE)}").fetchone()[0]
+        new = []
+        for word in words:
+            if word not in ids:
+                ids[word] = next_id
+                new.append((next_id, word))
+                next_id += 1
+        conn.executemany(f"INSERT INTO {_quote(VOCAB_TABLE)} (word_id, word) VALUES (?, ?)", new)
+        return [ids[word] for word in words]
+
+    @staticmethod
+    def _insert_words(conn: sqlite3.Connection, row_ids, user_ids, word_ids):
+        conn.executemany(
+            f"INSERT INTO {_quote(WORDS_TABLE)} (row_num, user_id, word_id) VALUES (?, ?, ?)",
+            zip(row_ids.tolist(), user_ids.tolist(), word_ids.tolist()),
+        )
+
+    def _means_sql(self) -> str:
+        return ", ".join(f"{_quote('sum_' + c)} / NULLIF({_quote('n_' + c)}, 0) AS {_quote(c)}" for c in HARM_COLUMNS)
+
+    def harmfulness_means(self, table: str, user_id: int) -> Optional[Dict[str, float]]:
+        agg_table = self._agg_table(table, ("id",))
+        if not self.columns(agg_table):
+            if not self.exists(table):
+                return None
+            with self._write_lock, self._conn() as conn:
+                self._ensure_aggregates(conn, table)
+        row = self._conn().execute(
+            f"SELECT {self._means_sql()} FROM {_quote(agg_table)} WHERE id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {c: float("nan") if v is None else float(v) for c, v in zip(HARM_COLUMNS, row)}
+
+    def harmfulness_table(self, table: str, key_columns: Tuple[str, ...] = ("id",)) -> "pd.DataFrame":
+        import pandas as pd
+
+        agg_table = self._agg_table(table, tuple(key_columns))
+        if not self.columns(agg_table):
+            with self._write_lock, self._conn() as conn:
+                self._ensure_aggregates(conn, table)
+        keys = ", ".join(_quote(k) for k in key_columns)
+        return pd.read_sql_query(
+            f"SELECT {keys}, {self._means_sql()} FROM {_quote(agg_table)} ORDER BY {keys}", self._conn()
+        )
+
+    def read_table(self, table: str) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.read_sql_query(f"SELECT * FROM {_quote(table)} ORDER BY rowid", self._conn())
+
+    def read_table_chunks(self, table: str, chunksize: int) -> Iterator["pd.DataFrame"]:
+        import pandas as pd
+
+        yield from pd.read_sql_query(
+            f"SELECT * FROM {_quote(table)} ORDER BY rowid", self._conn(), chunksize=chunksize
+        )
+
+    def harmful_words(self) -> "WordTable":
+        """append_rows 가 함께 갱신하는 chat_words / chat_vocab 테이블을 읽습니다(처음 한 번은 전체 파싱)."""
+        import numpy as np
+        try:
+            from .harmful_words import WordTable, WordTableBuilder
+        except ImportError:
+            from harmful_words import WordTable, WordTableBuilder
+
+        if not self.exists(CHAT_TABLE):
+            return WordTableBuilder().table()
+        if not self.columns(WORDS_STATE_TABLE):
+            with self._write_lock, self._conn() as conn:
+                self._ensure_words(conn)
+
+        conn = self._conn()
+        # 단어 행을 먼저 읽음: 사전은 늘어나기만 하므로, 읽은 행의 word_id 는 모두 사전에 있음
+        words = np.array(conn.execute(
+            f"SELECT row_num, user_id, word_id FROM {_quote(WORDS_TABLE)} ORDER BY rowid"
+        ).fetchall(), dtype=np.int64).reshape(-1, 3)
+        vocab = [word for (word,) in conn.execute(f"SELECT word FROM {_quote(VOCAB_TABLE)} ORDER BY word_id")]
+        return WordTable(vocab, words[:, 0].copy(), words[:, 1].copy(), words[:, 2].copy())
+
+    def data_version(self, table: str) -> Optional[Tuple]:
+        # WAL 모드에서는 커밋이 -wal 파일에, 체크포인트가 본 파일에 기록됩니다.
+        return _stat_version(self.db_path), _stat_version(self.db_path + "-wal")
+
+    def user_harmful_count(self, user_id: int) -> int:
+        if not self.exists(CHAT_TABLE):
+            return 0
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM chat WHERE id = ? AND ai_harmfulness = 1", (user_id,)
+        ).fetchone()
+        return row[0]
+
+    def user_harmful_rows(self, user_id: int) -> "pd.DataFrame":
+        import pandas as pd
+
+        if not self.exists(CHAT_TABLE):
+            return pd.DataFrame()
+        df = pd.read_sql_query(
+            "SELECT rowid AS row_key, * FROM chat WHERE id = ? AND ai_harmfulness = 1 ORDER BY rowid",
+            self._conn(), params=(user_id,),
+        )
+        return df.set_index("row_key")
+
+    def import_csv(self, table: str, csv_path: str, replace: bool = True) -> int:
+        """CSV 를 청크 단위로 읽어 테이블에 넣습니다. 가져온 행 수를 반환합니다."""
+        import pandas as pd
+
+        conn = self._conn()
+        if replace:
+            with self._write_lock, conn:
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                for key_columns in AGGREGATE_KEYS.get(table, []):
+                    conn.execute(f"DROP TABLE IF EXISTS {_quote(self._agg_table(table, key_columns))}")
+                if table == CHAT_TABLE:
+                    for words_table in (WORDS_TABLE, VOCAB_TABLE, WORDS_STATE_TABLE):
+                        conn.execute(f"DROP TABLE IF EXISTS {_quote(words_table)}")
+        total = 0
+        for chunk in pd.read_csv(csv_path, chunksize=IMPORT_CHUNK_SIZE):
+            self.append_rows(table, chunk.to_dict("records"))
+            total += len(chunk)
+        return total
+
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if STORAGE_BACKEND == "sqlite":
+                _backend = SqliteBackend(SQLITE_PATH)
+            elif STORAGE_BACKEND == "csv":
+                _backend = CsvBackend()
+            else:
+                raise ValueError(f"[ERROR] 알 수 없는 저장소 백엔드: {STORAGE_BACKEND}")
+        return _backend
+
+
+def set_storage(backend: Optional[StorageBackend]):
+    """기본 백엔드를 교체합니다(None 이면 다음 호출 시 환경변수로 다시 생성)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="kitty 저장소 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="CSV 를 SQLite 로 가져오기")
+    imp.add_argument("--db", default=SQLITE_PATH)
+    imp.add_argument("--chat", default=CSV_PATHS[CHAT_TABLE])
+    imp.add_argument("--site", default=CSV_PATHS[SITE_TABLE])
+    args = parser.parse_args()
+
+    backend = SqliteBackend(args.db)
+    for table, path in [(CHAT_TABLE, args.chat), (SITE_TABLE, args.site)]:
+        if not os.path.isfile(path):
+            print(f"Error: '{path}' 파일을 찾을 수 없습니다.", file=sys.stderr)
+            continue
+        count = backend.import_csv(table, path)
+        print(f"[INFO] '{path}' → '{args.db}' {table} 테이블에 {count}행을 가져왔습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+synthetic_data.py
+
+벤치마크 · 부하 테스트용 chat_db.csv / site_db.csv 합성 데이터 생성기 (chat_db.py, site_db.py 와 같은 스키마).
+
+- seed 가 같으면 항상 같은 파일
+- 사용자 · 사이트 · 유해 단어 빈도는 Zipf 분포 (소수의 사용자 · 사이트 · 단어가 대부분을 차지)
+- 행은 청크 단위로 만들어 바로 파일에 이어 쓰므로 10M 행도 메모리에 한 번에 올리지 않음
+
+    python synthetic_data.py --rows 1m --out-dir bench_data/1m --seed 42
+"""
+
+import argparse
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+HARM_COLUMNS = ["abuse", "censure", "discrimination", "hate", "sexual", "violence"]
+CHAT_COLUMNS = [
+    "text", "intensity", "id", *HARM_COLUMNS,
+    "prior_harmfulness", "ai_harmfulness", "harmful_words",
+    "replacement_format", "replacement_text", "spend_receive",
+]
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+CHUNK_ROWS = 500_000
+ZIPF_EXPONENT = 1.1
+# chat_db.csv 의 ai_harmfulness 비율과 비슷하게
+HARMFUL_RATE = 0.6
+
+BASE_WORDS = [
+    "연락해", "여자가", "짐승만도 못한", "쓰레기 같은", "혀 짤린", "꼬라보는", "빡침", "초딩", "호갱", "노처녀",
+    "하수구", "짱깨", "쓸데없는", "멍청하게", "범죄자", "일베", "좌좀", "더러운 인상", "토쏠리지", "니같은 ㅅㄲ",
+    "난리치는 것들", "노인네", "거지", "돌", "자식",
+]
+WORD_SUFFIXES = ["", "들", "이", "야", "같은"]
+CLEAN_TEXTS = [
+    "배가 아파", "그건 좀 ㅋㅋ", "예쁘면 됐지 뭐", "오늘 뭐 먹을까", "숙제 다 했어?", "내일 학교에서 봐",
+    "게임 한 판 할래?", "방금 그 영상 봤어?", "주말에 뭐 해", "ㅇㅈ 나도 그렇게 생각해",
+]
+HARMFUL_TEXTS = [
+    "진짜 {w} 왜 저래", "어우 {w} 인간!", "걍.. {w} 사람 같음", "{w} 주제에 평가질 오지게 하네",
+    "너 {w} 맞지?ㅋㅋ", "{w} 사라졌으면 좋겠다",
+]
+REPLACEMENT_FORMATS = [
+    "감정은 유지하되, 소통을 더욱 긍정적인 방향으로 전환",
+    "비난의 감정을 유지하되, 인신공격적인 표현을 완화된 어조로 변경",
+    "모욕적인 표현을 피하고, 좀 더 친근한 질문으로 변경",
+]
+
+
+def parse_rows(value: str) -> int:
+    """'10k' · '1m' · '10m' 또는 정수."""
+    value = value.lower()
+    if value in SIZES:
+        return SIZES[value]
+    for suffix, scale in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * scale)
+    return int(value)
+
+
+def zipf_weights(n: int, exponent: float = ZIPF_EXPONENT) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def n_users_for(rows: int) -> int:
+    return max(10, rows // 200)
+
+
+def vocabulary(n_words: int) -> np.ndarray:
+    """실제 데이터의 유해 단어와 그 변형(조사 · 복수형), 부족하면 '욕설N' 으로 채운 단어 목록 (빈도순)."""
+    words = [base + suffix for suffix in WORD_SUFFIXES for base in BASE_WORDS]
+    words += [f"욕설{i}" for i in range(max(0, n_words - len(words)))]
+    return np.array(words[:n_words], dtype=object)
+
+
+def _format_words(words: np.ndarray, counts: np.ndarray) -> list:
+    return ["[" + ", ".join(f"'{w}'" for w in row[:k]) + "]" for row, k in zip(words, counts)]
+
+
+def chat_chunk(rng: np.random.Generator, n: int, user_p: np.ndarray, vocab: np.ndarray,
+               vocab_p: np.ndarray) -> pd.DataFrame:
+    harmful = rng.random(n) < HARMFUL_RATE
+    n_harmful = int(harmful.sum())
+    counts = rng.choice([1, 2, 3], size=n_harmful, p=[0.7, 0.2, 0.1])
+    words = vocab[rng.choice(len(vocab), size=(n_harmful, 3), p=vocab_p)]
+
+    text = np.array(CLEAN_TEXTS, dtype=object)[rng.integers(0, len(CLEAN_TEXTS), n)]
+    templates = np.array(HARMFUL_TEXTS, dtype=object)[rng.integers(0, len(HARMFUL_TEXTS), n_harmful)]
+    text[harmful] = [t.format(w=w) for t, w in zip(templates, words[:, 0])]
+
+    df = pd.DataFrame({
+        "text": text,
+        "intensity": np.where(harmful, rng.integers(1, 4, n), 0),
+        "id": rng.choice(len(user_p), size=n, p=user_p),
+    })
+    for col, rate in zip(HARM_COLUMNS, (0.05, 0.6, 0.1, 0.2, 0.08, 0.06)):
+        df[col] = (harmful & (rng.random(n) < rate)).astype(np.int64)
+    df["prior_harmfulness"] = (harmful & (rng.random(n) < 0.45)).astype(np.int64)
+    df["ai_harmfulness"] = harmful.astype(np.int64)
+
+    harmful_words = np.full(n, None, dtype=object)
+    harmful_words[harmful] = _format_words(words, counts)
+    df["harmful_words"] = harmful_words
+    replacement_format = np.full(n, None, dtype=object)
+    replacement_format[harmful] = np.array(REPLACEMENT_FORMATS, dtype=object)[
+        rng.integers(0, len(REPLACEMENT_FORMATS), n_harmful)]
+    df["replacement_format"] = replacement_format
+    replacement_text = np.full(n, None, dtype=object)
+    replacement_text[harmful] = "좀 더 부드럽게 말해 볼까?"
+    df["replacement_text"] = replacement_text
+    df["spend_receive"] = rng.integers(0, 2, n)
+    return df[CHAT_COLUMNS]
+
+
+def site_chunk(rng: np.random.Generator, n: int, user_p: np.ndarray, site_p: np.ndarray,
+               site_harm: np.ndarray) -> pd.DataFrame:
+    sites = rng.choice(len(site_p), size=n, p=site_p)
+    df = pd.DataFrame({
+        "id": rng.choice(len(user_p), size=n, p=user_p),
+        "site": [f"www.example{s}.com" for s in sites],
+    })
+    # site_db.py 와 같은 지수분포(중앙값 약 0.2)에 사이트별 유해 수준을 곱함
+    scale = 0.2 / np.log(2)
+    for i, col in enumerate(HARM_COLUMNS):
+        values = rng.exponential(scale=scale, size=n) * site_harm[sites, i]
+        df[col] = np.clip(values, 0, 1).round(4)
+    return df
+
+
+def generate(table: str, rows: int, path: str, seed: int = 42, chunk_rows: int = CHUNK_ROWS):
+    """table('chat' | 'site') 합성 데이터 rows 행을 path 에 씁니다."""
+    # 테이블마다 다른 난수열, seed 가 같으면 같은 파일
+    rng = np.random.default_rng([seed, 0 if table == "chat" else 1])
+    user_p = zipf_weights(n_users_for(rows))
+    if table == "chat":
+        vocab = vocabulary(max(len(BASE_WORDS) * len(WORD_SUFFIXES), rows // 500))
+        vocab_p = zipf_weights(len(vocab))
+    else:
+        n_sites = max(20, rows // 100)
+        site_p = zipf_weights(n_sites)
+        site_harm = rng.lognormal(0, 0.5, size=(n_sites, len(HARM_COLUMNS)))
+
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        if table == "chat":
+            chunk = chat_chunk(rng, n, user_p, vocab, vocab_p)
+        else:
+            chunk = site_chunk(rng, n, user_p, site_p, site_harm)
+        chunk.to_csv(tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False, encoding="utf-8")
+    os.replace(tmp_path, path)
+    print(f"[INFO] {table} 합성 데이터 {rows:,}행을 '{path}'에 저장했습니다.")
+
+
+def generate_dataset(rows: int, out_dir: str, seed: int = 42, table: Optional[str] = None):
+    """out_dir 에 chat_db.csv · site_db.csv (table 을 주면 그 하나만)를 만듭니다."""
+    for name in ([table] if table else ["chat", "site"]):
+        generate(name, rows, os.path.join(out_dir, f"{name}_db.csv"), seed=seed)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="chat_db / site_db 합성 데이터 생성")
+    parser.add_argument("--rows", default="10k", help="행 수: 10k | 1m | 10m 또는 정수 (기본: 10k)")
+    parser.add_argument("--out-dir", default="bench_data", help="출력 디렉터리 (기본: bench_data)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--table", choices=["chat", "site"], default=None, help="한 테이블만 생성")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    generate_dataset(parse_rows(args.rows), args.out_dir, seed=args.seed, table=args.table)
+
+
+if __name__ == "__main__":
+    main()
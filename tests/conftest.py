@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The repo is a flat set of modules; make them importable by name regardless of the pytest invocation directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,144 @@
+import os
+
+import pandas as pd
+import pytest
+
+from chat_index import ChatIndex
+
+COLUMNS = ["text", "id", "ai_harmfulness", "harmful_words"]
+
+
+def chat_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        # Commas, quotes and newlines inside fields span one CSV record over several lines
+        "text": [f'말 {seed}-{i}, "인용"\n둘째 줄' if i % 3 == 0 else f"문장 {seed}-{i}" for i in range(rows)],
+        "id": [i % 4 + 1 for i in range(rows)],
+        "ai_harmfulness": [int(i % 2 == 0) for i in range(rows)],
+        "harmful_words": [f"['단어{i}']" if i % 2 == 0 else None for i in range(rows)],
+    })
+
+
+def expected_rows(path, user_id: int) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    return df[(df["id"] == user_id) & (df["ai_harmfulness"] == 1)].reset_index(drop=True)
+
+
+def assert_matches_full_read(index: ChatIndex, path):
+    for user_id in range(1, 6):
+        expected = expected_rows(path, user_id)
+        assert index.harmful_count(user_id) == len(expected)
+        rows = index.read_harmful_rows(user_id)
+        if expected.empty:
+            assert rows.empty
+            continue
+        pd.testing.assert_frame_equal(rows.reset_index(drop=True), expected)
+
+
+@pytest.fixture
+def chat_csv(tmp_path):
+    path = tmp_path / "chat_db.csv"
+    chat_frame(20).to_csv(path, index=False)
+    return path
+
+
+def rebuilt(capsys) -> bool:
+    return "Rebuilding chat index" in capsys.readouterr().out
+
+
+def test_builds_missing_index_and_fetches_spans(chat_csv, capsys):
+    index = ChatIndex(str(chat_csv))
+    assert_matches_full_read(index, chat_csv)
+    assert rebuilt(capsys)
+    assert os.path.isfile(index.index_path)
+
+    # Row keys are the byte offsets of the records
+    rows = index.read_harmful_rows(1)
+    with open(chat_csv, "rb") as f:
+        for offset, text in zip(rows.index, rows["text"]):
+            prefix = ('"' + text[:3]) if any(c in text for c in ',"\n') else text[:3]
+            f.seek(offset)
+            assert f.read(len(prefix.encode("utf-8"))).decode("utf-8") == prefix
+
+
+def test_persisted_index_is_reused_and_tail_is_scanned(chat_csv, capsys):
+    ChatIndex(str(chat_csv)).refresh()
+    capsys.readouterr()
+
+    # Another writer appends rows; a fresh process loads the .idx log and scans only the tail
+    chat_frame(7, seed=1).to_csv(chat_csv, mode="a", header=False, index=False)
+    index = ChatIndex(str(chat_csv))
+    assert_matches_full_read(index, chat_csv)
+    assert not rebuilt(capsys)
+
+
+def test_rebuilds_when_index_file_is_deleted(chat_csv, capsys):
+    index = ChatIndex(str(chat_csv))
+    index.refresh()
+    os.remove(index.index_path)
+    capsys.readouterr()
+
+    fresh = ChatIndex(str(chat_csv))
+    assert_matches_full_read(fresh, chat_csv)
+    assert rebuilt(capsys)
+
+
+def test_rebuilds_when_header_changes(chat_csv, capsys):
+    index = ChatIndex(str(chat_csv))
+    index.refresh()
+    capsys.readouterr()
+
+    # Same rows, different column order: every span and the header checksum change
+    chat_frame(20)[list(reversed(COLUMNS))].to_csv(chat_csv, index=False)
+    assert_matches_full_read(index, chat_csv)
+    assert rebuilt(capsys)
+    assert_matches_full_read(ChatIndex(str(chat_csv)), chat_csv)
+
+
+def test_rebuilds_when_only_the_header_changes(chat_csv, capsys):
+    index = ChatIndex(str(chat_csv))
+    index.refresh()
+    capsys.readouterr()
+
+    # A same-length rename keeps every record at the same offset; only the header checksum differs
+    chat_frame(20).rename(columns={"text": "body"}).to_csv(chat_csv, index=False)
+    assert index.harmful_count(1) == len(expected_rows(chat_csv, 1))
+    assert rebuilt(capsys)
+    assert index.columns[0] == "body"
+
+
+def test_rebuilds_when_last_record_changes_in_place(chat_csv, capsys):
+    df = chat_frame(21)
+    df.to_csv(chat_csv, index=False)
+    index = ChatIndex(str(chat_csv))
+    index.refresh()
+    size = os.path.getsize(chat_csv)
+    capsys.readouterr()
+
+    # Rewrite with the same size and header but a different last record (harmful flag cleared)
+    df.loc[df.index[-1], "ai_harmfulness"] = 0
+    df.to_csv(chat_csv, index=False)
+    assert os.path.getsize(chat_csv) == size
+
+    assert_matches_full_read(index, chat_csv)
+    assert rebuilt(capsys)
+    assert_matches_full_read(ChatIndex(str(chat_csv)), chat_csv)
+
+
+def test_rebuilds_when_csv_is_truncated(chat_csv, capsys):
+    index = ChatIndex(str(chat_csv))
+    index.refresh()
+    capsys.readouterr()
+
+    chat_frame(9).to_csv(chat_csv, index=False)
+    assert_matches_full_read(index, chat_csv)
+    assert rebuilt(capsys)
+
+
+def test_rewritten_csv_with_more_rows_is_not_read_as_a_tail(chat_csv, capsys):
+    index = ChatIndex(str(chat_csv))
+    index.refresh()
+    capsys.readouterr()
+
+    chat_frame(30, seed=2).to_csv(chat_csv, index=False)
+    assert_matches_full_read(index, chat_csv)
+    assert rebuilt(capsys)
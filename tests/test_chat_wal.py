@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from append_to_chat_csv import append_row_to_chat_csv
+from bulk_appender import BulkAppender
+from chat_wal import ChatAppendLog, _encode_frame, _read_frames, get_append_log
+from storage import CHAT_TABLE, CsvBackend, set_storage
+
+HARM_COLUMNS = ["abuse", "censure", "discrimination", "hate", "sexual", "violence"]
+
+
+@pytest.fixture
+def chat_csv(tmp_path):
+    path = tmp_path / "chat_db.csv"
+    set_storage(CsvBackend({CHAT_TABLE: str(path)}))
+    yield path
+    set_storage(None)
+
+
+def frame_rows(user_id: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "text": ["어우 바보 같은", "안녕"],
+        "id": [user_id, user_id],
+        **{col: [1, 0] for col in HARM_COLUMNS},
+        "ai_harmfulness": [1, 0],
+        "harmful_words": ["['바보 같은']", None],
+        "score": [0.75, np.nan],
+    })
+
+
+def test_encode_frame_accepts_numpy_and_pandas_scalars():
+    row = {"id": np.int64(1), "flag": np.bool_(True), "score": np.float32(0.5),
+           "created": pd.Timestamp("2024-01-02 03:04:05"), "missing": pd.NaT}
+    frame = _encode_frame([row])
+    assert b'"id": 1' in frame and b'"flag": true' in frame and b'"missing": null' in frame
+
+
+def test_append_row_built_from_dataframe(chat_csv):
+    df = frame_rows(7)
+    # Values straight out of the frame are numpy scalars (np.int64, np.float64, ...)
+    for i in range(len(df)):
+        row = {col: df[col].to_numpy()[i] for col in df.columns}
+        assert isinstance(row["id"], np.integer)
+        append_row_to_chat_csv(row)
+
+    stored = pd.read_csv(chat_csv)
+    assert stored["id"].tolist() == [7, 7]
+    assert stored["ai_harmfulness"].tolist() == [1, 0]
+    assert stored["score"].tolist()[0] == 0.75 and np.isnan(stored["score"].tolist()[1])
+    assert CsvBackend({CHAT_TABLE: str(chat_csv)}).user_harmful_count(7) == 1
+
+    # The WAL frames decode back to the same plain values
+    with open(get_append_log(str(chat_csv)).wal_path, "rb") as f:
+        batches, _ = _read_frames(f, 0)
+    assert [row["id"] for batch in batches for row in batch] == [7, 7]
+
+
+def test_bulk_append_from_dataframe_records(chat_csv):
+    with BulkAppender(CHAT_TABLE) as appender:
+        for row in frame_rows(3).to_dict("records") + frame_rows(4).to_dict("records"):
+            appender.append({key: np.int64(value) if key == "id" else value for key, value in row.items()})
+
+    stored = pd.read_csv(chat_csv)
+    assert stored["id"].tolist() == [3, 3, 4, 4]
+
+
+def chat_rows(*texts: str) -> list:
+    return [{"text": text, "id": 1, "ai_harmfulness": 1} for text in texts]
+
+
+def stored_texts(path) -> list:
+    return pd.read_csv(path)["text"].tolist()
+
+
+def crash_after_wal_fsync(log: ChatAppendLog, rows: list) -> bytes:
+    """
+    Write a committed WAL frame the way _commit does, then stop before the CSV apply and checkpoint.
+    Returns the CSV bytes the apply would have written.
+    """
+    with open(log.wal_path, "ab") as wal:
+        wal.write(_encode_frame(rows))
+    return pd.DataFrame(rows).to_csv(header=False, index=False).encode("utf-8")
+
+
+def test_recover_truncates_torn_trailing_frame(tmp_path):
+    path = tmp_path / "chat_db.csv"
+    log = ChatAppendLog(str(path))
+    log.append(chat_rows("하나", "둘"))
+    wal_size = os.path.getsize(log.wal_path)
+    csv_before = path.read_bytes()
+
+    # Crash while writing the next frame: only part of it reached the disk, nothing was applied
+    with open(log.wal_path, "ab") as wal:
+        wal.write(_encode_frame(chat_rows("셋"))[:-7])
+
+    recovered = ChatAppendLog(str(path))
+    assert os.path.getsize(log.wal_path) == wal_size
+    assert path.read_bytes() == csv_before
+    assert recovered._read_checkpoint() == {"wal_offset": wal_size, "csv_size": len(csv_before)}
+
+    recovered.append(chat_rows("넷"))
+    assert stored_texts(path) == ["하나", "둘", "넷"]
+
+
+def test_recover_replays_frame_lost_between_wal_fsync_and_csv_apply(tmp_path):
+    path = tmp_path / "chat_db.csv"
+    log = ChatAppendLog(str(path))
+    log.append(chat_rows("하나"))
+    crash_after_wal_fsync(log, chat_rows("둘", "셋"))
+    assert stored_texts(path) == ["하나"]
+
+    recovered = ChatAppendLog(str(path))
+    assert stored_texts(path) == ["하나", "둘", "셋"]
+    assert recovered._read_checkpoint() == {"wal_offset": os.path.getsize(log.wal_path),
+                                            "csv_size": os.path.getsize(path)}
+
+    # Recovering again (another process starting) does not apply the frame twice
+    ChatAppendLog(str(path))
+    assert stored_texts(path) == ["하나", "둘", "셋"]
+
+
+def test_recover_cuts_partial_csv_row_before_replay(tmp_path):
+    path = tmp_path / "chat_db.csv"
+    log = ChatAppendLog(str(path))
+    log.append(chat_rows("하나"))
+    csv_size = os.path.getsize(path)
+
+    # Crash halfway through writing the frame's rows to the CSV
+    data = crash_after_wal_fsync(log, chat_rows("둘, 쉼표", "셋"))
+    with open(path, "ab") as f:
+        f.write(data[:len(data) // 2])
+    assert os.path.getsize(path) > csv_size
+
+    ChatAppendLog(str(path))
+    assert stored_texts(path) == ["하나", "둘, 쉼표", "셋"]
+    assert pd.read_csv(path)["id"].tolist() == [1, 1, 1]
+
+
+def test_commit_recovers_before_appending(tmp_path):
+    path = tmp_path / "chat_db.csv"
+    log = ChatAppendLog(str(path))
+    log.append(chat_rows("하나"))
+
+    # Another process committed a frame and died; this process's next commit replays it first
+    crash_after_wal_fsync(log, chat_rows("둘"))
+    log.append(chat_rows("셋"))
+    assert stored_texts(path) == ["하나", "둘", "셋"]
@@ -0,0 +1,36 @@
+import threading
+
+from job_manager import QUEUED, SUCCEEDED, JobManager
+
+
+def test_streamed_job_does_not_hide_queued_job():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    try:
+        # Occupy the only worker so the next job stays queued
+        manager.submit(1, release.wait)
+        queued = manager.submit(2, lambda: "report")
+        assert queued.status == QUEUED
+
+        streamed = manager.start(2)
+        assert manager.latest_for_user(2) is streamed
+        assert manager.submit(2, lambda: "report") is queued
+    finally:
+        release.set()
+        manager.shutdown(wait=True)
+
+    assert queued.status == SUCCEEDED
+
+
+def test_latest_success_is_bounded():
+    manager = JobManager(max_workers=1, max_jobs=2)
+    try:
+        for user_id in (1, 2, 1, 3):
+            manager.complete(manager.start(user_id), {"user_id": user_id})
+    finally:
+        manager.shutdown(wait=True)
+
+    # User 2 was updated least recently, so it is dropped when user 3 arrives
+    assert manager.latest_success_for_user(2) is None
+    assert manager.latest_success_for_user(1).result == {"user_id": 1}
+    assert manager.latest_success_for_user(3).result == {"user_id": 3}
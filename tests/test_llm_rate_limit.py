@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+
+from llm_rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class APIError(Exception):
+    def __init__(self, status: int, headers: dict = None):
+        super().__init__(f"status {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def make_limiter(clock: FakeClock, **kwargs) -> RateLimiter:
+    kwargs.setdefault("rpm", 0)
+    kwargs.setdefault("tpm", 0)
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def failing(errors: list, result: str = "ok"):
+    """fn raising errors[0], errors[1], ... on successive calls, then returning result."""
+    calls = []
+
+    def fn():
+        attempt = len(calls)
+        calls.append(attempt)
+        if attempt < len(errors):
+            raise errors[attempt]
+        return result
+
+    return fn, calls
+
+
+def test_rpm_bucket_allows_a_minute_of_requests_then_waits():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rpm=60)
+
+    for _ in range(60):
+        limiter.acquire(0)
+    assert clock.sleeps == []
+
+    limiter.acquire(0)
+    assert clock.sleeps == [pytest.approx(1.0)]
+    assert limiter.stats()["rate_limit_wait_seconds"] == pytest.approx(1.0)
+
+
+def test_tpm_bucket_waits_for_tokens_and_settles_actual_usage():
+    clock = FakeClock()
+    limiter = make_limiter(clock, tpm=600)  # 10 tokens/s
+
+    limiter.acquire(100)
+    limiter.settle(100, 400)  # 200 tokens left
+    assert clock.sleeps == []
+
+    limiter.acquire(300)
+    assert clock.sleeps == [pytest.approx(10.0)]
+
+
+def test_request_larger_than_the_bucket_passes_when_full():
+    clock = FakeClock()
+    limiter = make_limiter(clock, tpm=600)
+
+    limiter.acquire(5000)
+    assert clock.sleeps == []
+    limiter.acquire(1)
+    assert sum(clock.sleeps) > 0
+
+
+@pytest.mark.parametrize("headers, delay", [
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "600"}, 60.0),  # capped at backoff_max
+])
+def test_retry_after_is_honored(headers, delay):
+    clock = FakeClock()
+    limiter = make_limiter(clock, rpm=60, backoff_max=60.0)
+    fn, calls = failing([APIError(429, headers)])
+
+    assert limiter.call(fn, 0) == "ok"
+    assert len(calls) == 2
+    assert clock.sleeps == [pytest.approx(delay)]
+    assert limiter.retries == 1
+
+
+def test_429_pauses_other_callers():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    limiter.pause(5.0)
+
+    limiter.acquire(0)
+    assert clock.sleeps == [pytest.approx(5.0)]
+
+
+def test_retries_stop_at_max_attempts():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_attempts=3, backoff_base=1.0)
+    fn, calls = failing([APIError(503)] * 5)
+
+    with pytest.raises(APIError):
+        limiter.call(fn, 0)
+    assert len(calls) == 3
+    assert limiter.retries == 2
+    # Full jitter: attempt n waits at most base * 2^(n-1)
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1.0
+    assert 0 <= clock.sleeps[1] <= 2.0
+
+
+def test_non_retryable_error_is_raised_at_once():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    fn, calls = failing([APIError(400)])
+
+    with pytest.raises(APIError):
+        limiter.call(fn, 0)
+    assert len(calls) == 1
+    assert clock.sleeps == []
@@ -0,0 +1,18 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("KITTY_LLM_BACKEND", "fake")
+    import main
+
+    monkeypatch.setattr(main, "API_KEY", "test-key")
+    return TestClient(main.app)
+
+
+def test_batch_body_that_is_not_utf8_is_rejected(client):
+    response = client.post("/process_chat_data/batch", content=b"\xff\xfe[", headers={"x-api-key": "test-key"})
+
+    assert response.status_code == 400
+    assert "not valid UTF-8" in response.json()["detail"]
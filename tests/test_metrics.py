@@ -0,0 +1,30 @@
+from metrics import Counter, Histogram, Registry
+
+
+def test_unlabeled_metrics_render_zero_samples():
+    registry = Registry()
+    registry.register(Counter("test_retries_total", "retries"))
+    registry.register(Counter("test_calls_total", "calls", ["outcome"]))
+    registry.register(Histogram("test_seconds", "duration", buckets=(0.1, 1.0)))
+
+    lines = registry.render().splitlines()
+    assert "test_retries_total 0" in lines
+    assert [line for line in lines if line.startswith("test_seconds")] == [
+        'test_seconds_bucket{le="0.1"} 0',
+        'test_seconds_bucket{le="1"} 0',
+        'test_seconds_bucket{le="+Inf"} 0',
+        "test_seconds_sum 0",
+        "test_seconds_count 0",
+    ]
+    # Labeled series only appear once observed
+    assert not any(line.startswith("test_calls_total") for line in lines)
+
+
+def test_unlabeled_histogram_observe():
+    histogram = Histogram("test_seconds", "duration", buckets=(0.1, 1.0))
+    histogram.observe(0.5)
+
+    assert histogram.count() == 1
+    assert 'test_seconds_bucket{le="0.1"} 0' in histogram.render()
+    assert 'test_seconds_bucket{le="1"} 1' in histogram.render()
+    assert "test_seconds_count 1" in histogram.render()
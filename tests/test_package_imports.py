@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_in_parent_dir(code: str) -> dict:
+    """Run code with only the repo's parent directory on sys.path, so the repo is imported as a package."""
+    parent, name = os.path.split(REPO_DIR)
+    env = dict(os.environ, PYTHONPATH=parent, KITTY_LLM_BACKEND="fake")
+    result = subprocess.run(
+        [sys.executable, "-c", f"PACKAGE = {name!r}\n{code}"],
+        cwd=parent, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    out = run_in_parent_dir(
+        "import importlib, json, sys\n"
+        "package = importlib.import_module(PACKAGE)\n"
+        "print(json.dumps({m: m in sys.modules for m in ('pandas', 'numpy', 'openai')}))\n"
+    )
+    assert out == {"pandas": False, "numpy": False, "openai": False}
+
+
+def test_every_export_resolves_from_parent_directory():
+    out = run_in_parent_dir(
+        "import importlib, json, sys\n"
+        "package = importlib.import_module(PACKAGE)\n"
+        "resolved = {name: getattr(package, name).__module__ for name in package._EXPORTS}\n"
+        "print(json.dumps({'resolved': resolved, 'all': sorted(package.__all__),"
+        " 'top_level': sorted(m for m in ('storage', 'llm_gateway', 'harmful_categories') if m in sys.modules)}))\n"
+    )
+    name = os.path.basename(REPO_DIR)
+    assert sorted(out["resolved"]) == out["all"]
+    for export, module in out["resolved"].items():
+        assert module.startswith(f"{name}."), (export, module)
+    # Siblings are loaded as package submodules, not as separate top-level copies
+    assert out["top_level"] == []
@@ -0,0 +1,33 @@
+import threading
+
+from llm_backend import FakeBackend
+from llm_gateway import LLMGateway
+from quiz_generator import QuizGenerator
+from quiz_library import QuizLibrary
+
+PAIRS = [("너 진짜 바보야", "바보"), ("멍청이 같은 소리", "멍청이"), ("바보들아", "바보들")]
+
+
+def test_concurrent_packed_jobs_generate_each_word_once(tmp_path):
+    generator = QuizGenerator(QuizLibrary(str(tmp_path / "quiz_library.json")))
+    generator.gateway = LLMGateway(backend=FakeBackend(latency_ms=200, error_rate=0), use_cache=False)
+
+    barrier = threading.Barrier(2)
+    results = []
+
+    def job():
+        barrier.wait()
+        results.append(generator.generate_quizzes(PAIRS, pack_size=8))
+
+    threads = [threading.Thread(target=job) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The second job waits on the word locks and reuses the first job's entries
+    assert generator.gateway.calls == 1
+    assert results[0] == results[1]
+    assert [r["bad_word"] for r in results[0]] == ["바보", "멍청이", "바보들"]
+    assert all(r["reason"] and r["quiz"] for r in results[0])
+    assert len(generator.library) == 2
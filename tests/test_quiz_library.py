@@ -0,0 +1,33 @@
+import pytest
+
+from quiz_library import QuizLibrary, normalize_word
+
+
+@pytest.mark.parametrize("word, key", [
+    ("짱깨들", "짱깨"),
+    ("짱깨들이", "짱깨"),
+    ("짱깨가", "짱깨"),
+    ("찐따들을", "찐따"),
+    ("새끼야", "새끼"),
+    ("새끼로", "새끼"),
+    ("병신아", "병신"),
+    ("또라이야", "또라이"),
+    ("짐승만도 못한", "짐승만도못한"),
+    ("  Bad_Word! ", "badword"),
+])
+def test_particles_and_plural_are_stripped(word, key):
+    assert normalize_word(word) == key
+
+
+@pytest.mark.parametrize("word", ["노인네", "할머니", "또라이", "바보", "개"])
+def test_word_endings_are_kept(word):
+    assert normalize_word(word) == word
+
+
+def test_distinct_words_do_not_share_an_entry(tmp_path):
+    library = QuizLibrary(str(tmp_path / "quiz_library.json"))
+    library.put("노인네", "reason", "quiz")
+
+    assert library.get("노인네들") == {"word": "노인네", "reason": "reason", "quiz": "quiz"}
+    assert library.get("노인") is None
+    assert library.get("할머") is None
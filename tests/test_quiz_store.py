@@ -0,0 +1,69 @@
+import pytest
+
+from chat_data_manager import ProcessedTextRequest, append_chat_data_batch, get_user_harmful_chat_data
+from quiz_store import QuizStore
+from storage import CHAT_TABLE, CsvBackend, SqliteBackend, set_storage
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "csv":
+        backend = CsvBackend({CHAT_TABLE: str(tmp_path / "chat_db.csv")})
+    else:
+        backend = SqliteBackend(str(tmp_path / "kitty.db"))
+    set_storage(backend)
+    yield backend
+    set_storage(None)
+
+
+def ingest(*texts_by_user):
+    append_chat_data_batch([
+        ProcessedTextRequest(user_id=user_id, original_text=text,
+                             processed_text=f"문장 중 유해한 단어들: ['{text}']")
+        for user_id, text in texts_by_user
+    ])
+
+
+def run_generation(store: QuizStore, user_id: int, sent: list) -> list:
+    """The generate_quiz_and_report quiz step, with a stand-in for the LLM that records what it is sent."""
+    with store.user_lock(user_id):
+        state = store.load(user_id)
+        new_rows = store.pending_rows(state, get_user_harmful_chat_data(user_id))
+        texts = new_rows["original_text"].tolist() if not new_rows.empty else []
+        sent.append(texts)
+        return store.advance(user_id, state, new_rows, [{"bad_word": text} for text in texts])
+
+
+def test_only_new_rows_are_sent(backend, tmp_path):
+    store = QuizStore(str(tmp_path / "quiz_store"))
+    sent = []
+
+    ingest((1, "바보"), (2, "멍청이"), (1, "병신"))
+    assert run_generation(store, 1, sent) == [{"bad_word": "바보"}, {"bad_word": "병신"}]
+
+    ingest((2, "또라이"), (1, "찐따"), (1, "새끼"))
+    quizzes = run_generation(store, 1, sent)
+    # Nothing new since the last run
+    assert run_generation(store, 1, sent) == quizzes
+
+    assert sent == [["바보", "병신"], ["찐따", "새끼"], []]
+    assert [q["bad_word"] for q in quizzes] == ["바보", "병신", "찐따", "새끼"]
+    state = store.load(1)
+    assert state["rows"] == 4
+    assert state["watermark"] == int(get_user_harmful_chat_data(1).index.max())
+
+
+def test_stale_watermark_regenerates_everything(backend, tmp_path):
+    store = QuizStore(str(tmp_path / "quiz_store"))
+    sent = []
+    ingest((1, "바보"), (1, "병신"))
+    run_generation(store, 1, sent)
+
+    # Keys no longer line up with the rows the watermark covered
+    state = store.load(1)
+    state["rows"] = 1
+    store.save(1, state)
+    run_generation(store, 1, sent)
+
+    assert sent == [["바보", "병신"], ["바보", "병신"]]
+    assert len(store.load(1)["quizzes"]) == 2
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import harmful_words
+from harmful_words import word_table_from_frame
+from storage import CHAT_TABLE, WORDS_STATE_TABLE, WORDS_TABLE, VOCAB_TABLE, SqliteBackend
+
+
+def chat_rows(start: int, n: int) -> list:
+    values = ["['바보', '멍청이']", "[]", None, "짱깨, 바보", "['새끼']", f"['단어{start}']"]
+    return [{"text": f"문장 {start + i}", "id": (start + i) % 3 + 1, "ai_harmfulness": 1,
+             "harmful_words": values[(start + i) % len(values)]} for i in range(n)]
+
+
+def assert_same_table(table, expected):
+    assert table.vocab == expected.vocab
+    np.testing.assert_array_equal(table.row_ids, expected.row_ids)
+    np.testing.assert_array_equal(table.user_ids, expected.user_ids)
+    np.testing.assert_array_equal(table.word_ids, expected.word_ids)
+
+
+def full_parse(backend: SqliteBackend):
+    return word_table_from_frame(backend.read_table(CHAT_TABLE))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "kitty.db")
+
+
+def test_word_table_is_maintained_on_append(db_path):
+    backend = SqliteBackend(db_path)
+    for start in range(0, 40, 7):
+        backend.append_rows(CHAT_TABLE, chat_rows(start, 7))
+        assert_same_table(backend.harmful_words(), full_parse(backend))
+    # Rows without a user id count as rows but contribute no words
+    backend.append_rows(CHAT_TABLE, [{"text": "익명", "id": None, "ai_harmfulness": 1, "harmful_words": "['새단어']"}])
+    backend.append_rows(CHAT_TABLE, chat_rows(42, 3))
+    assert_same_table(backend.harmful_words(), full_parse(backend))
+
+    table = backend.harmful_words()
+    assert table.word_counts(1)["바보"] > 0
+    assert backend._conn().execute(f"SELECT n_rows FROM {WORDS_STATE_TABLE}").fetchone()[0] == 46
+
+
+def test_persisted_word_table_is_read_without_parsing(db_path, monkeypatch):
+    SqliteBackend(db_path).append_rows(CHAT_TABLE, chat_rows(0, 20))
+    expected = full_parse(SqliteBackend(db_path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("harmful_words was re-parsed")
+
+    monkeypatch.setattr(harmful_words.WordTableBuilder, "add_frame", fail)
+    assert_same_table(SqliteBackend(db_path).harmful_words(), expected)
+
+
+def test_existing_database_is_built_once(db_path):
+    backend = SqliteBackend(db_path)
+    backend.append_rows(CHAT_TABLE, chat_rows(0, 12))
+    # A database written before the word tables existed
+    with backend._conn() as conn:
+        for table in (WORDS_TABLE, VOCAB_TABLE, WORDS_STATE_TABLE):
+            conn.execute(f"DROP TABLE {table}")
+
+    fresh = SqliteBackend(db_path)
+    assert_same_table(fresh.harmful_words(), full_parse(fresh))
+    fresh.append_rows(CHAT_TABLE, chat_rows(12, 5))
+    assert_same_table(fresh.harmful_words(), full_parse(fresh))
+
+
+def test_import_csv_replaces_word_table(db_path, tmp_path):
+    backend = SqliteBackend(db_path)
+    backend.append_rows(CHAT_TABLE, chat_rows(100, 10))
+
+    csv_path = tmp_path / "chat_db.csv"
+    pd.DataFrame(chat_rows(0, 15)).to_csv(csv_path, index=False)
+    backend.import_csv(CHAT_TABLE, str(csv_path))
+
+    assert_same_table(backend.harmful_words(), word_table_from_frame(pd.read_csv(csv_path)))
+
+
+def test_missing_chat_table_gives_empty_word_table(db_path):
+    table = SqliteBackend(db_path).harmful_words()
+    assert table.vocab == [] and len(table.word_ids) == 0